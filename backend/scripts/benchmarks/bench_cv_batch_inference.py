@@ -0,0 +1,91 @@
+# scripts/benchmarks/bench_cv_batch_inference.py
+# Benchmark: CV classification throughput (images/sec) on CPU by micro-batch size
+#
+# Runs cv_inference_code's decode -> resize -> model -> post-process pipeline
+# over synthetic drone frames held in memory, so only CPU work is measured.
+# Uses the NumPy test model unless --model points at a YOLOv8 ONNX export
+# (requires onnxruntime).
+#
+# Usage (from backend/):
+#   python3 scripts/benchmarks/bench_cv_batch_inference.py [--images 128] [--batch-sizes 1,4,8,16,32]
+
+import argparse
+import io
+import os
+import sys
+
+import numpy as np
+from PIL import Image
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'terraform', 'modules', 'lambda')
+sys.path.insert(0, os.path.abspath(os.path.join(LAMBDA_DIR, 'cv_inference_code')))
+
+import inference  # noqa: E402
+import model as cv_model  # noqa: E402
+
+
+def draw_frame(rng, width, height, lesions):
+    """JPEG of a green canopy with brown lesion patches at the given (x, y, w, h) boxes"""
+    pixels = np.empty((height, width, 3), dtype=np.uint8)
+    pixels[...] = (60, 140, 50)
+    pixels = np.clip(pixels + rng.integers(-25, 26, (height, width, 3)), 0, 255).astype(np.uint8)
+    for x, y, w, h in lesions:
+        pixels[y:y + h, x:x + w] = (130, 85, 40)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format='JPEG', quality=85)
+    return buffer.getvalue()
+
+
+def random_lesions(rng, width, height, count, min_size, max_size):
+    """count random (x, y, w, h) lesion boxes with sides in [min_size, max_size)"""
+    lesions = []
+    for _ in range(count):
+        w, h = (int(side) for side in rng.integers(min_size, max_size, 2))
+        lesions.append((int(rng.integers(0, width - w)), int(rng.integers(0, height - h)), w, h))
+    return lesions
+
+
+def synthetic_frame(rng, width, height, lesions):
+    """JPEG of a green canopy with a few brown lesion patches"""
+    return draw_frame(rng, width, height, random_lesions(rng, width, height, lesions, width // 40, width // 8))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='CV batch inference throughput benchmark')
+    parser.add_argument('--images', type=int, default=128, help='Frames per run')
+    parser.add_argument('--width', type=int, default=1600, help='Frame width in pixels')
+    parser.add_argument('--height', type=int, default=1200, help='Frame height in pixels')
+    parser.add_argument('--batch-sizes', default='1,4,8,16,32', help='Comma-separated micro-batch sizes')
+    parser.add_argument('--workers', type=int, default=inference.DECODE_WORKERS, help='Decode threads')
+    parser.add_argument('--model', default='', help="YOLOv8 ONNX export, or 'test' for the NumPy test model (default: test)")
+    parser.add_argument('--seed', type=int, default=7)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    frames = {
+        f"frame_{n:04d}": synthetic_frame(rng, args.width, args.height, int(rng.integers(0, 4)))
+        for n in range(args.images)
+    }
+    model = cv_model.load_model(args.model or cv_model.TEST_MODEL_PATH)
+    loaders = {name: (lambda data=data: data) for name, data in frames.items()}
+
+    print(f"▶️  {args.images} frames of {args.width}x{args.height}, model input {model.input_size}, "
+          f"{args.workers} decode workers, model {model.version}")
+    # Warm-up so imports, allocator and thread-pool start-up are not measured
+    inference.classify(model, dict(list(loaders.items())[:4]), batch_size=4, workers=args.workers)
+
+    print(f"{'batch':>6} {'images/s':>10} {'infer s':>9} {'ms/image':>9} {'diseased':>9}")
+    for batch_size in [int(size) for size in args.batch_sizes.split(',')]:
+        results, stats = inference.classify(model, loaders, batch_size=batch_size, workers=args.workers)
+        diseased = sum(1 for fields in results.values() if fields.get('classification') == 'diseased')
+        ms_per_image = 1000 / stats['images_per_second'] if stats['images_per_second'] else float('inf')
+        print(f"{batch_size:>6} {stats['images_per_second']:>10.1f} {stats['inference_seconds']:>9.2f} "
+              f"{ms_per_image:>9.1f} {diseased:>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+# scripts/benchmarks/bench_cv_preprocess.py
+# Benchmark: CV preprocessing latency and peak memory, previous vs current pipeline
+#
+# previous: full-resolution decode, a float32 tensor per image, np.stack per batch
+# current:  cv_inference_code/preprocess.py (JPEG draft-mode decode, uint8
+#           pixels per image, normalized in place into a reused batch buffer)
+#
+# Each pipeline runs in its own subprocess over the same JPEGs (written to a
+# temp dir first), using DECODE_WORKERS threads and micro-batches like
+# inference.classify(). Peak memory is the process's VmHWM (Linux) after
+# resetting it post warm-up; the peak at the production worker count, plus
+# the model, is what the cv_inference memory_size has to hold.
+#
+# Usage (from backend/):
+#   python3 scripts/benchmarks/bench_cv_preprocess.py [--images 48] [--width 4000 --height 3000] [--tiled]
+
+import argparse
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from bench_cv_batch_inference import synthetic_frame
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'terraform', 'modules', 'lambda')
+sys.path.insert(0, os.path.abspath(os.path.join(LAMBDA_DIR, 'cv_inference_code')))
+
+import inference  # noqa: E402
+import preprocess  # noqa: E402
+
+
+def previous_prepare(data, size):
+    """The pipeline before draft decoding: full decode, float32 array per image"""
+    image = Image.open(io.BytesIO(data)).convert('RGB')
+    resized = image.resize((size, size), Image.BILINEAR)
+    return np.asarray(resized, dtype=np.float32).transpose(2, 0, 1) / 255.0
+
+
+def previous_prepare_tiles(data, size, tile, overlap):
+    image = Image.open(io.BytesIO(data)).convert('RGB')
+    boxes = [
+        (x, y, min(x + tile, image.width), min(y + tile, image.height))
+        for y in preprocess.tile_origins(image.height, tile, overlap)
+        for x in preprocess.tile_origins(image.width, tile, overlap)
+    ]
+    resized = [image.crop(box).resize((size, size), Image.BILINEAR) for box in boxes]
+    return np.stack([np.asarray(tile_image, dtype=np.float32).transpose(2, 0, 1) / 255.0 for tile_image in resized])
+
+
+def run_previous(frames, size, batch_size, workers, tiling):
+    def load(data):
+        if tiling:
+            return previous_prepare_tiles(data, size, tiling.size, tiling.overlap)
+        return previous_prepare(data, size)[None]
+
+    pending = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for arrays in pool.map(load, frames):
+            pending.extend(arrays)
+            while len(pending) >= batch_size:
+                np.stack(pending[:batch_size]).sum()
+                pending = pending[batch_size:]
+        if pending:
+            np.stack(pending).sum()
+
+
+def run_current(frames, size, batch_size, workers, tiling):
+    def load(data):
+        if tiling:
+            return preprocess.prepare_tiles(data, size, tiling.size, tiling.overlap)[0]
+        return preprocess.prepare(data, size)[0][None]
+
+    buffer = inference.batch_buffer(batch_size, size)
+
+    def flush(pending):
+        batch = buffer[:len(pending)]
+        for slot, pixels in zip(batch, pending):
+            preprocess.normalize_into(pixels, slot)
+        batch.sum()
+
+    pending = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for pixels in pool.map(load, frames):
+            pending.extend(pixels)
+            while len(pending) >= batch_size:
+                flush(pending[:batch_size])
+                pending = pending[batch_size:]
+        if pending:
+            flush(pending)
+
+
+def memory_mb(field):
+    """VmRSS / VmHWM of this process from /proc/self/status, in MB"""
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError(f"{field} not in /proc/self/status (Linux only)")
+
+
+def reset_peak_memory():
+    # Writing 5 to clear_refs resets VmHWM to the current RSS
+    with open('/proc/self/clear_refs', 'w') as clear_refs:
+        clear_refs.write('5')
+
+
+def child(args):
+    """Run one pipeline over the frames in args.frames_dir; print ms/image, latency ms, peak MB, growth MB"""
+    frames = [
+        open(os.path.join(args.frames_dir, name), 'rb').read() for name in sorted(os.listdir(args.frames_dir))
+    ]
+    tiling = inference.DEFAULT_TILING if args.tiled else None
+    pipeline = run_current if args.pipeline == 'current' else run_previous
+    # Warm-up
+    pipeline(frames[:2], args.size, args.batch_size, args.workers, tiling)
+    resident = memory_mb('VmRSS')
+    reset_peak_memory()
+
+    started = time.perf_counter()
+    pipeline(frames, args.size, args.batch_size, args.workers, tiling)
+    elapsed = time.perf_counter() - started
+
+    # Single-image latency: one frame at a time, one worker
+    latency_started = time.perf_counter()
+    for data in frames[:args.latency_samples]:
+        pipeline([data], args.size, args.batch_size, 1, tiling)
+    latency = (time.perf_counter() - latency_started) / min(len(frames), args.latency_samples)
+
+    peak = memory_mb('VmHWM')
+    print(f"{elapsed / len(frames) * 1000:.2f} {latency * 1000:.2f} {peak:.1f} {peak - resident:.1f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='CV preprocessing latency / peak memory benchmark')
+    parser.add_argument('--images', type=int, default=48, help='Frames per pipeline')
+    parser.add_argument('--width', type=int, default=4000, help='Frame width in pixels')
+    parser.add_argument('--height', type=int, default=3000, help='Frame height in pixels')
+    parser.add_argument('--size', type=int, default=320, help='Model input size')
+    parser.add_argument('--batch-size', type=int, default=inference.INFERENCE_BATCH_SIZE)
+    parser.add_argument('--workers', type=int, default=inference.DECODE_WORKERS, help='Decode threads')
+    parser.add_argument('--tiled', action='store_true', help='Tiled preprocessing (TILE_SIZE / TILE_OVERLAP)')
+    parser.add_argument('--latency-samples', type=int, default=8, help='Frames timed one at a time')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--pipeline', choices=['previous', 'current'], help=argparse.SUPPRESS)
+    parser.add_argument('--frames-dir', help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.pipeline:
+        child(args)
+        return 0
+
+    rng = np.random.default_rng(args.seed)
+    with tempfile.TemporaryDirectory() as frames_dir:
+        for n in range(args.images):
+            with open(os.path.join(frames_dir, f"frame_{n:04d}.jpg"), 'wb') as f:
+                f.write(synthetic_frame(rng, args.width, args.height, int(rng.integers(0, 4))))
+
+        mode = f"tiled {inference.DEFAULT_TILING.size}/{inference.DEFAULT_TILING.overlap}" if args.tiled else 'whole-frame'
+        print(f"▶️  {args.images} frames of {args.width}x{args.height} -> {args.size}px, {mode}, "
+              f"batch {args.batch_size}, {args.workers} decode workers")
+        print(f"{'pipeline':>10} {'ms/image':>9} {'latency ms':>11} {'peak MB':>8} {'growth MB':>10}")
+        for pipeline in ('previous', 'current'):
+            command = [
+                sys.executable, os.path.abspath(__file__), '--pipeline', pipeline, '--frames-dir', frames_dir,
+                '--size', str(args.size), '--batch-size', str(args.batch_size), '--workers', str(args.workers),
+                '--latency-samples', str(args.latency_samples),
+            ] + (['--tiled'] if args.tiled else [])
+            output = subprocess.run(command, check=True, capture_output=True, text=True).stdout.split()
+            per_image, latency, peak, growth = (float(value) for value in output[-4:])
+            print(f"{pipeline:>10} {per_image:>9.1f} {latency:>11.1f} {peak:>8.0f} {growth:>10.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
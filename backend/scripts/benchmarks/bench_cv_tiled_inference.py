@@ -0,0 +1,124 @@
+# scripts/benchmarks/bench_cv_tiled_inference.py
+# Benchmark: tiled vs whole-frame CV classification, latency and accuracy
+#
+# Synthetic full-resolution drone frames with known lesion boxes (small ones
+# included) go through cv_inference_code's classify() once whole-frame and
+# once per tile configuration. Reports per-image latency, throughput, frame
+# accuracy (diseased vs healthy), lesion recall (share of ground-truth
+# lesions whose centre lies in a reported region) and the error of
+# affected_area_percentage against the true lesion coverage.
+# Uses the NumPy test model unless --model points at a YOLOv8 ONNX export.
+#
+# Usage (from backend/):
+#   python3 scripts/benchmarks/bench_cv_tiled_inference.py [--images 24] [--tiles 640:0.2,960:0.2]
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from bench_cv_batch_inference import draw_frame, random_lesions
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'terraform', 'modules', 'lambda')
+sys.path.insert(0, os.path.abspath(os.path.join(LAMBDA_DIR, 'cv_inference_code')))
+
+import inference  # noqa: E402
+import model as cv_model  # noqa: E402
+
+
+def true_coverage(lesions, width, height):
+    mask = np.zeros((height, width), dtype=bool)
+    for x, y, w, h in lesions:
+        mask[y:y + h, x:x + w] = True
+    return float(mask.mean() * 100)
+
+
+def recalled(lesions, regions):
+    """Lesions whose centre falls inside at least one reported region"""
+    found = 0
+    for x, y, w, h in lesions:
+        cx, cy = x + w / 2, y + h / 2
+        if any(r['x'] <= cx <= r['x'] + r['width'] and r['y'] <= cy <= r['y'] + r['height'] for r in regions):
+            found += 1
+    return found
+
+
+def evaluate(model, frames, truth, tiling, batch_size, workers, latency_samples):
+    loaders = {name: (lambda data=data: data) for name, data in frames.items()}
+    results, stats = inference.classify(model, loaders, batch_size=batch_size, workers=workers, tiling=tiling)
+
+    latencies = []
+    for name in list(frames)[:latency_samples]:
+        started = time.perf_counter()
+        inference.classify(model, {name: loaders[name]}, batch_size=batch_size, workers=1, tiling=tiling)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    correct = lesions_total = lesions_found = 0
+    area_errors = []
+    for name, fields in results.items():
+        lesions, coverage = truth[name]
+        correct += (fields['classification'] == 'diseased') == bool(lesions)
+        lesions_total += len(lesions)
+        lesions_found += recalled(lesions, fields['regions'])
+        area_errors.append(abs(fields['affected_area_percentage'] - coverage))
+
+    return {
+        'latency_ms': float(np.mean(latencies)),
+        'images_per_second': stats['images_per_second'],
+        'tiles': stats.get('tiles', stats['images']),
+        'accuracy': correct / len(results) * 100,
+        'recall': lesions_found / lesions_total * 100 if lesions_total else 100.0,
+        'area_error': float(np.mean(area_errors)),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Tiled vs whole-frame CV inference benchmark')
+    parser.add_argument('--images', type=int, default=24, help='Frames per configuration')
+    parser.add_argument('--width', type=int, default=2400, help='Frame width in pixels')
+    parser.add_argument('--height', type=int, default=1800, help='Frame height in pixels')
+    parser.add_argument('--min-lesion', type=int, default=24, help='Smallest lesion side in pixels')
+    parser.add_argument('--max-lesion', type=int, default=160, help='Largest lesion side in pixels')
+    parser.add_argument('--tiles', default='640:0.2,960:0.2', help='Comma-separated tile_size:overlap configurations')
+    parser.add_argument('--batch-size', type=int, default=inference.INFERENCE_BATCH_SIZE)
+    parser.add_argument('--workers', type=int, default=inference.DECODE_WORKERS, help='Decode threads')
+    parser.add_argument('--latency-samples', type=int, default=4, help='Frames timed one at a time')
+    parser.add_argument('--model', default='', help="YOLOv8 ONNX export, or 'test' for the NumPy test model (default: test)")
+    parser.add_argument('--seed', type=int, default=11)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    frames, truth = {}, {}
+    for n in range(args.images):
+        # A quarter of the frames are healthy
+        count = int(rng.integers(1, 8)) if n % 4 else 0
+        lesions = random_lesions(rng, args.width, args.height, count, args.min_lesion, args.max_lesion)
+        frames[f"frame_{n:04d}"] = draw_frame(rng, args.width, args.height, lesions)
+        truth[f"frame_{n:04d}"] = (lesions, true_coverage(lesions, args.width, args.height))
+
+    model = cv_model.load_model(args.model or cv_model.TEST_MODEL_PATH)
+    configurations = [('whole-frame', None)] + [
+        (f"tiles {size}/{overlap}", inference.Tiling(int(size), float(overlap)))
+        for size, overlap in (pair.split(':') for pair in args.tiles.split(','))
+    ]
+
+    print(f"▶️  {args.images} frames of {args.width}x{args.height}, lesions {args.min_lesion}-{args.max_lesion}px, "
+          f"model input {model.input_size}, model {model.version}")
+    # Warm-up so imports, allocator and thread-pool start-up are not measured
+    inference.classify(model, {'warmup': lambda: next(iter(frames.values()))}, batch_size=args.batch_size)
+
+    print(f"{'mode':>16} {'tiles':>6} {'ms/image':>9} {'images/s':>9} {'accuracy':>9} {'recall':>7} {'area err':>9}")
+    for label, tiling in configurations:
+        row = evaluate(model, frames, truth, tiling, args.batch_size, args.workers, args.latency_samples)
+        print(f"{label:>16} {row['tiles']:>6} {row['latency_ms']:>9.1f} {row['images_per_second']:>9.2f} "
+              f"{row['accuracy']:>8.1f}% {row['recall']:>6.1f}% {row['area_error']:>8.2f}pp")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
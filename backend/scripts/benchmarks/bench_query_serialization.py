@@ -0,0 +1,78 @@
+# scripts/benchmarks/bench_query_serialization.py
+# Micro-benchmark: query Lambda response serialization, old path vs serialization.py
+#
+# Old path: boto3 resource deserializes wire items to Decimals, then
+# json.dumps(cls=DecimalEncoder). New path: serialization.item_from_wire + dumps.
+#
+# Usage (from backend/): python3 scripts/benchmarks/bench_query_serialization.py [--repeat 50]
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from decimal import Decimal
+
+from boto3.dynamodb.types import TypeDeserializer
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'terraform', 'modules', 'lambda')
+sys.path.insert(0, os.path.abspath(os.path.join(LAMBDA_DIR, 'query_lambda_code')))
+sys.path.insert(0, os.path.abspath(os.path.join(LAMBDA_DIR, 'sensor_lambda_code')))
+
+import serialization  # noqa: E402
+import synthetic  # noqa: E402
+
+_deserializer = TypeDeserializer()
+
+
+class DecimalEncoder(json.JSONEncoder):
+    """The encoder the query Lambdas used before serialization.py"""
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return float(obj)
+        return super(DecimalEncoder, self).default(obj)
+
+
+def wire_page(dataset, size):
+    """size items in DynamoDB wire format, as the low-level client returns them"""
+    rng = synthetic.make_rng(42, dataset, size)
+    if dataset == 'sensor_data':
+        sensors = [{'sensor_id': f"soil_sensor_{n:02d}", 'field_zone': synthetic.ZONES[n % 3]} for n in range(9)]
+        sensors.append({'sensor_id': 'weather_station_main', 'field_zone': 'Central'})
+        timestamps = range(1700000000, 1700000000 + 900 * (size // len(sensors) + 1), 900)
+        return synthetic.sensor_readings(rng, 'NL_Farm_001', sensors, timestamps)[:size]
+    if dataset == 'cv_results':
+        return synthetic.cv_results(rng, 'NL_Farm_001', 0, 1700000000, size)
+    drones = [f"drone_{n:04d}" for n in range(size)]
+    return synthetic.flight_logs(rng, 'NL_Farm_001', drones, 1700000000, 'morning')
+
+
+def old_path(page):
+    items = [{k: _deserializer.deserialize(v) for k, v in item.items()} for item in page]
+    return json.dumps({'items': items, 'count': len(items)}, cls=DecimalEncoder)
+
+
+def new_path(page):
+    items = [serialization.item_from_wire(item) for item in page]
+    return serialization.dumps({'items': items, 'count': len(items)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark query Lambda response serialization')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    encoder = 'orjson' if serialization.USE_ORJSON else 'json (C encoder)'
+    print(f"Encoder: {encoder}")
+    print(f"{'dataset':<12} {'items':>6} {'old ms':>9} {'new ms':>9} {'speedup':>8}  identical")
+    for dataset in ('sensor_data', 'cv_results', 'flights'):
+        for size in (100, 1000):
+            page = wire_page(dataset, size)
+            old = timeit.timeit(lambda: old_path(page), number=args.repeat) / args.repeat * 1000
+            new = timeit.timeit(lambda: new_path(page), number=args.repeat) / args.repeat * 1000
+            identical = old_path(page) == new_path(page)
+            print(f"{dataset:<12} {size:>6} {old:>9.2f} {new:>9.2f} {old / new:>7.1f}x  {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# scripts/coverage/build_coverage_layers.py
+# Precompute the merged per-zoom coverage layers GET /coverage serves
+#
+# The coverage_query Lambda builds a range's layers on the first request for
+# it; run this after a flight backfill, or ahead of the season, so the ranges
+# the frontend asks for (e.g. the season to date, the last 30 days) are
+# already in the reports bucket. Layers whose flights have not changed are
+# left alone unless --force is given.
+#
+# Usage (from backend/):
+#   python3 scripts/coverage/build_coverage_layers.py NL_Farm_001 2026-03-01 2026-10-31
+#   [--reports-bucket agridrone-demo-reports] [--flights-table agridrone-demo-flight-logs]
+#   [--endpoint-url http://localhost:9000] [--dynamodb-endpoint-url http://localhost:8000] [--force]
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import boto3
+
+QUERY_LAMBDA_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    '..', '..', 'terraform', 'modules', 'lambda', 'query_lambda_code'
+)
+sys.path.insert(0, os.path.abspath(QUERY_LAMBDA_DIR))
+
+from coverage_geometry import MAX_ZOOM  # noqa: E402
+from coverage_layer import (  # noqa: E402
+    build_layers, fingerprint, flights_in_range, layer_key, load_stored, store_layers
+)
+from serialization import RawTable  # noqa: E402
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Precompute merged coverage layers for a farm and date range')
+    parser.add_argument('farm_id')
+    parser.add_argument('start', type=parse_date, help='First flight date (YYYY-MM-DD)')
+    parser.add_argument('end', type=parse_date, help='Last flight date (YYYY-MM-DD, inclusive)')
+    parser.add_argument('--reports-bucket', default='agridrone-demo-reports')
+    parser.add_argument('--flights-table', default='agridrone-demo-flight-logs')
+    parser.add_argument('--workers', type=int, default=16, help='Concurrent coverage-file GETs')
+    parser.add_argument('--endpoint-url', help='S3 endpoint (MinIO / moto server)')
+    parser.add_argument('--dynamodb-endpoint-url', help='DynamoDB endpoint (DynamoDB Local / moto server)')
+    parser.add_argument('--force', action='store_true', help='Rebuild even if the stored layers are current')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.end < args.start:
+        print("❌ end must not be before start")
+        return 1
+    s3 = boto3.client('s3', endpoint_url=args.endpoint_url)
+    table = RawTable(boto3.client('dynamodb', endpoint_url=args.dynamodb_endpoint_url), args.flights_table)
+
+    flights = flights_in_range(table, args.farm_id, args.start, args.end)
+    source_fingerprint = fingerprint(flights)
+    print(f"▶️  {len(flights)} flights with coverage maps for {args.farm_id} {args.start}..{args.end}")
+
+    # Layers are written together, so the most detailed one being current means all are
+    newest = layer_key(args.farm_id, args.start, args.end, MAX_ZOOM)
+    if not args.force and load_stored(s3, args.reports_bucket, newest, source_fingerprint) is not None:
+        print("✅ Stored layers are current (use --force to rebuild)")
+        return 0
+
+    started = time.perf_counter()
+    layers = build_layers(s3, flights, args.farm_id, args.start, args.end, args.workers)
+    missing = layers[MAX_ZOOM]['properties']['missing_flights']
+    stored = store_layers(
+        s3, args.reports_bucket, args.farm_id, args.start, args.end, layers, fingerprint(flights, missing)
+    )
+    for zoom, (body, _) in sorted(stored.items()):
+        print(f"   z{zoom}: {len(layers[zoom]['features'])} features, {len(body) / 1024:.1f} KB")
+    if missing:
+        print(f"⚠️  {len(missing)} flights had no readable coverage map; these layers will be rebuilt on request")
+    print(f"✅ Built {len(stored)} layers in {time.perf_counter() - started:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
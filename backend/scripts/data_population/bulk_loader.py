@@ -0,0 +1,305 @@
+# scripts/data_population/bulk_loader.py
+# Parallel, resumable bulk loader for the demo DynamoDB tables
+#
+# Usage (from backend/):
+#   python3 scripts/data_population/bulk_loader.py                      # 7 days, 1 farm, all datasets
+#   python3 scripts/data_population/bulk_loader.py sensors --farms 50 --days 365 --workers 32
+#   python3 scripts/data_population/bulk_loader.py --endpoint-url http://localhost:8000   # DynamoDB Local / moto server
+#   python3 scripts/data_population/bulk_loader.py --farms 200 --days 30 --dry-run        # generation throughput only
+
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+# The synthetic data engine lives with the mock sensor Lambda, which uses it too
+SENSOR_LAMBDA_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    '..', '..', 'terraform', 'modules', 'lambda', 'sensor_lambda_code'
+)
+sys.path.insert(0, os.path.abspath(SENSOR_LAMBDA_DIR))
+
+import synthetic  # noqa: E402
+
+CONFIG_PATH = 'scripts/config.json'
+
+# Dataset name -> module defining TABLE_KEY and generate_partition()
+DATASETS = {
+    'sensors': 'populate_sensors',
+    'cv_results': 'populate_cv_results',
+    'flights': 'populate_flights',
+}
+
+DEFAULT_TABLES = {
+    'cv_results': 'agridrone-demo-cv-results',
+    'sensor_data': 'agridrone-demo-sensor-data',
+    'flight_logs': 'agridrone-demo-flight-logs',
+}
+
+BATCH_SIZE = 25  # BatchWriteItem maximum
+MAX_BATCH_ATTEMPTS = 10
+THROTTLE_ERRORS = ('ProvisionedThroughputExceededException', 'ThrottlingException', 'RequestLimitExceeded')
+
+_client = None
+_client_pid = None
+
+
+def load_config(allow_defaults=False):
+    """scripts/config.json written by deploy_aws_infra.sh; optional for local endpoints and dry runs"""
+    try:
+        with open(CONFIG_PATH, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        if not allow_defaults:
+            print(f"❌ Error loading config: {e}")
+            print("Ensure you are running from the backend directory and scripts/config.json exists")
+            sys.exit(1)
+        return {'aws_region': 'eu-west-1', 'dynamodb_tables': DEFAULT_TABLES, 'farm_id': 'NL_Farm_001'}
+
+
+def get_client(region, endpoint_url=None):
+    """One low-level client per process (clients are thread-safe but must not cross a fork)"""
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        _client = boto3.client(
+            'dynamodb',
+            region_name=region,
+            endpoint_url=endpoint_url,
+            config=Config(max_pool_connections=64, retries={'max_attempts': 1, 'mode': 'standard'})
+        )
+        _client_pid = os.getpid()
+    return _client
+
+
+def write_batch(client, table_name, requests):
+    """
+    Write up to 25 put requests, retrying UnprocessedItems and throttling
+    errors with jittered exponential backoff.
+    Returns (written, throttled_retries).
+    """
+    pending = requests
+    throttled = 0
+
+    for attempt in range(MAX_BATCH_ATTEMPTS):
+        try:
+            response = client.batch_write_item(RequestItems={table_name: pending})
+            pending = response.get('UnprocessedItems', {}).get(table_name, [])
+        except ClientError as e:
+            if e.response['Error']['Code'] not in THROTTLE_ERRORS:
+                raise
+
+        if not pending:
+            return len(requests), throttled
+
+        throttled += 1
+        time.sleep(min(5.0, 0.05 * (2 ** attempt)) * random.uniform(0.5, 1.0))
+
+    raise RuntimeError(f"{len(pending)} items still unprocessed after {MAX_BATCH_ATTEMPTS} attempts")
+
+
+def write_items(client, table_name, items):
+    """Batch-write items already in DynamoDB wire format; returns (written, throttled_retries)"""
+    written = 0
+    throttled = 0
+    requests = [{'PutRequest': {'Item': item}} for item in items]
+    for offset in range(0, len(requests), BATCH_SIZE):
+        w, t = write_batch(client, table_name, requests[offset:offset + BATCH_SIZE])
+        written += w
+        throttled += t
+    return written, throttled
+
+
+def farm_ids(primary_farm_id, count):
+    """The configured demo farm plus simulated farms (same naming as the mock sensor Lambda)"""
+    return [primary_farm_id] + [f"SIM_Farm_{n:04d}" for n in range(1, count)]
+
+
+def partition_id(dataset, farm_id, day_offset):
+    return f"{dataset}/{farm_id}/{day_offset}"
+
+
+def load_partition(task):
+    """Generate and write one (dataset, farm, day) partition; runs in a worker thread or process"""
+    module = importlib.import_module(DATASETS[task['dataset']])
+    rng = synthetic.make_rng(task['options']['seed'], task['partition_id'])
+    items = module.generate_partition(
+        task['farm_id'], task['qualify'], task['day_offset'], task['anchor'], task['options'], rng
+    )
+    if task['dry_run']:
+        return task['partition_id'], len(items), 0
+    client = get_client(task['region'], task['endpoint_url'])
+    written, throttled = write_items(client, task['table_name'], items)
+    return task['partition_id'], written, throttled
+
+
+class Checkpoint:
+    """Completed partitions plus the run's time anchor and seed, so a resumed run regenerates identical data"""
+
+    def __init__(self, path, anchor, seed, options):
+        self.path = path
+        self.anchor = anchor
+        self.seed = seed
+        self.options = options
+        self.done = set()
+        self._last_flush = 0.0
+
+        if path and os.path.exists(path):
+            with open(path, 'r') as f:
+                state = json.load(f)
+            if state['options'] != options:
+                raise SystemExit(
+                    f"❌ Checkpoint {path} was written with different options; rerun with --fresh to discard it"
+                )
+            self.anchor = state['anchor']
+            self.seed = state['seed']
+            self.done = set(state['done'])
+
+    def mark_done(self, pid):
+        self.done.add(pid)
+        # Flush at most every 2 seconds; a lost tail only means re-writing a few idempotent partitions
+        if time.time() - self._last_flush > 2:
+            self.flush()
+
+    def flush(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'anchor': self.anchor, 'seed': self.seed, 'options': self.options, 'done': sorted(self.done)}, f)
+        os.replace(tmp_path, self.path)
+        self._last_flush = time.time()
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Bulk-load demo data into DynamoDB')
+    parser.add_argument('datasets', nargs='*', metavar='dataset',
+                        help=f"Datasets to load: {', '.join(DATASETS)} (default: all)")
+    parser.add_argument('--farms', type=int, default=1, help='Number of farms (default: 1)')
+    parser.add_argument('--days', type=int, default=7, help='Days of history (default: 7)')
+    parser.add_argument('--sensors-per-farm', type=int, default=5)
+    parser.add_argument('--sensor-interval', type=int, default=900, help='Seconds between readings (default: 900)')
+    parser.add_argument('--cv-per-day', type=int, default=30, help='CV results per farm per day (default: 30)')
+    parser.add_argument('--drones-per-farm', type=int, default=2)
+    parser.add_argument('--workers', type=int, default=16, help='Partitions loaded in parallel (default: 16)')
+    parser.add_argument('--processes', action='store_true',
+                        help='Use worker processes instead of threads (for CPU-bound generation)')
+    parser.add_argument('--checkpoint', default='.bulk_load_checkpoint.json',
+                        help='Checkpoint file for resuming (default: .bulk_load_checkpoint.json)')
+    parser.add_argument('--fresh', action='store_true', help='Ignore and overwrite an existing checkpoint')
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible data (default: random)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Generate every partition but write nothing (benchmarks the generator)')
+    parser.add_argument('--endpoint-url', help='DynamoDB endpoint (DynamoDB Local / moto server)')
+    args = parser.parse_args(argv)
+    unknown = set(args.datasets) - set(DATASETS)
+    if unknown:
+        parser.error(f"unknown dataset(s): {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    config = load_config(bool(args.endpoint_url or args.dry_run))
+    datasets = args.datasets or list(DATASETS)
+
+    options = {
+        'datasets': datasets,
+        'farms': args.farms,
+        'days': args.days,
+        'sensors_per_farm': args.sensors_per_farm,
+        'sensor_interval': args.sensor_interval,
+        'cv_per_day': args.cv_per_day,
+        'drones_per_farm': args.drones_per_farm,
+        'seed': args.seed,
+    }
+
+    # A dry run neither resumes nor records progress
+    checkpoint_path = None if args.dry_run else args.checkpoint
+    if args.fresh and checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    checkpoint = Checkpoint(checkpoint_path, int(time.time()), seed, options)
+    partition_options = {**options, 'seed': checkpoint.seed}
+
+    farms = farm_ids(config.get('farm_id', 'NL_Farm_001'), args.farms)
+    tasks = []
+    for dataset in datasets:
+        table_name = config['dynamodb_tables'][importlib.import_module(DATASETS[dataset]).TABLE_KEY]
+        for index, farm_id in enumerate(farms):
+            for day_offset in range(args.days):
+                pid = partition_id(dataset, farm_id, day_offset)
+                if pid in checkpoint.done:
+                    continue
+                tasks.append({
+                    'partition_id': pid,
+                    'dataset': dataset,
+                    'farm_id': farm_id,
+                    'qualify': index > 0,
+                    'day_offset': day_offset,
+                    'anchor': checkpoint.anchor,
+                    'options': partition_options,
+                    'dry_run': args.dry_run,
+                    'table_name': table_name,
+                    'region': config['aws_region'],
+                    'endpoint_url': args.endpoint_url,
+                })
+
+    skipped = len(checkpoint.done)
+    print(f"🚀 Loading {len(tasks)} partitions ({skipped} already done) with {args.workers} "
+          f"{'processes' if args.processes else 'threads'}...")
+
+    executor_class = ProcessPoolExecutor if args.processes else ThreadPoolExecutor
+    written = 0
+    throttled = 0
+    failed = 0
+    started = time.perf_counter()
+    last_report = started
+
+    with executor_class(max_workers=args.workers) as executor:
+        futures = [executor.submit(load_partition, task) for task in tasks]
+        for future in as_completed(futures):
+            try:
+                pid, w, t = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"  ✗ Partition failed: {str(e)}")
+                continue
+
+            checkpoint.mark_done(pid)
+            written += w
+            throttled += t
+
+            now = time.perf_counter()
+            if now - last_report > 5:
+                rate = written / (now - started)
+                print(f"  Progress: {len(checkpoint.done) - skipped}/{len(tasks)} partitions, "
+                      f"{written:,} items ({rate:,.0f} items/sec), {throttled} throttled retries")
+                last_report = now
+
+    checkpoint.flush()
+    elapsed = time.perf_counter() - started
+    rate = written / elapsed if elapsed > 0 else 0
+
+    print(f"✅ {'Generated' if args.dry_run else 'Inserted'} {written:,} items in {elapsed:.1f}s ({rate:,.0f} items/sec), "
+          f"{throttled} throttled retries, {failed} failed partitions")
+    if failed:
+        if checkpoint_path:
+            print(f"⚠️  Rerun the same command to resume from {checkpoint_path}")
+        return 1
+
+    # A completed run needs no resume state
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
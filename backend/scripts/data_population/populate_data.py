@@ -1,9 +1,16 @@
 # scripts/data_population/populate_data.py
 # Master script to populate all demo data
+#
+# Usage (from backend/): python3 scripts/data_population/populate_data.py [bulk_loader options]
 
+import os
 import subprocess
 import sys
 
+import bulk_loader
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
 def run_script(script_name):
     """Run a population script and handle errors"""
     print(f"\n{'='*60}")
@@ -12,7 +19,7 @@ def run_script(script_name):
     
     try:
         result = subprocess.run(
-            [sys.executable, f"scripts/{script_name}"],
+            [sys.executable, os.path.join(SCRIPT_DIR, script_name)],
             check=True,
             capture_output=True,
             text=True
@@ -25,13 +32,23 @@ def run_script(script_name):
         print(e.stderr)
         return False
 
+def run_bulk_load(argv):
+    """Load all DynamoDB datasets in one parallel, resumable pass"""
+    print(f"\n{'='*60}")
+    print(f"Running: bulk_loader ({', '.join(bulk_loader.DATASETS)})")
+    print('='*60)
+    
+    if bulk_loader.main(argv) == 0:
+        print("✅ bulk_loader completed successfully")
+        return True
+    print("❌ bulk_loader finished with failed partitions")
+    return False
+
 def main():
-    """Run all data population scripts in sequence"""
-    scripts = [
-        "populate_images.py",
-        "populate_cv_results.py",
-        "populate_sensors.py",
-        "populate_flights.py",
+    """Upload images, then bulk-load CV results, sensor data and flight logs"""
+    steps = [
+        lambda: run_script("populate_images.py"),
+        lambda: run_bulk_load(sys.argv[1:]),
         # "populate_legal_docs.py",
         # "generate_past_reports.py"
     ]
@@ -39,20 +56,20 @@ def main():
     print("🚀 Starting data population for AgriDrone Demo...")
     
     success_count = 0
-    for script in scripts:
-        if run_script(script):
+    for step in steps:
+        if step():
             success_count += 1
     
     print(f"\n{'='*60}")
-    print(f"✅ Completed {success_count}/{len(scripts)} scripts successfully")
+    print(f"✅ Completed {success_count}/{len(steps)} steps successfully")
     print('='*60)
     
-    if success_count == len(scripts):
+    if success_count == len(steps):
         print("\n🎉 All data populated! Demo environment ready.")
         return 0
     else:
-        print("\n⚠️  Some scripts failed. Check output above.")
+        print("\n⚠️  Some steps failed. Check output above.")
         return 1
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
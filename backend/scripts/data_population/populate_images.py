@@ -31,17 +31,19 @@ DATASET_URLS = {
 def download_and_upload_image(url, category, filename):
     """Download image from URL and upload to S3"""
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        
-        # Upload to S3 with appropriate prefix
-        s3_key = f"2026-01-17/{category}/{filename}"
-        s3.put_object(
-            Bucket=BUCKET_NAME,
-            Key=s3_key,
-            Body=response.content,
-            ContentType='image/jpeg'
-        )
+        # Stream the download straight into the upload instead of holding the whole image in memory
+        with requests.get(url, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+
+            # Upload to S3 with appropriate prefix
+            s3_key = f"2026-01-17/{category}/{filename}"
+            s3.upload_fileobj(
+                response.raw,
+                BUCKET_NAME,
+                s3_key,
+                ExtraArgs={'ContentType': 'image/jpeg'}
+            )
         
         print(f"✓ Uploaded: {s3_key}")
         return s3_key
@@ -64,11 +64,12 @@ ECR_URI="${AWS_ACCOUNT_ID}.dkr.ecr.${AWS_REGION}.amazonaws.com/${ECR_REPO_NAME}"
 # Note: ECR repository is created by Terraform, not here
 # We'll build and push the Docker image after Terraform creates the ECR repo
 
-if [ -d "lambda/cv_inference" ]; then
+CV_CODE_DIR="${TERRAFORM_DIR}/modules/lambda/cv_inference_code"
+if [ -f "${CV_CODE_DIR}/Dockerfile" ]; then
     echo -e "${BLUE}ℹ️  CV inference Docker directory found. Will build after Terraform creates ECR.${NC}"
     BUILD_CV_IMAGE=true
 else
-    echo -e "${YELLOW}⚠ lambda/cv_inference directory not found. Skipping Docker build.${NC}"
+    echo -e "${YELLOW}⚠ ${CV_CODE_DIR}/Dockerfile not found. Skipping Docker build.${NC}"
     BUILD_CV_IMAGE=false
 fi
 echo ""
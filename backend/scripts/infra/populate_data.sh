@@ -41,6 +41,7 @@ boto3>=1.28.0
 requests>=2.31.0
 python-dotenv>=1.0.0
 Pillow>=10.0.0
+numpy>=1.24.0
 EOF
 fi
 
@@ -63,6 +64,7 @@ run_script() {
     local script=$1
     local description=$2
     local step=$3
+    shift 3
     
     echo -e "${YELLOW}[${step}/7] ${description}...${NC}"
     
@@ -77,7 +79,7 @@ run_script() {
         # Let's check where they expect to be. If they import from 'scripts', they should be run from backend root.
         
         # Let's run from backend root to be safe
-        (cd "${BACKEND_SCRIPTS_DIR}/.." && python3 "scripts/data_population/${script}")
+        (cd "${BACKEND_SCRIPTS_DIR}/.." && python3 "scripts/data_population/${script}" "$@")
         
         echo -e "${GREEN}✓ ${description} complete${NC}"
     else
@@ -87,9 +89,9 @@ run_script() {
 }
 
 # run_script "populate_images.py" "Uploading crop images to S3" "2"
-run_script "populate_cv_results.py" "Generating CV classification results" "3"
-run_script "populate_sensors.py" "Generating historical sensor data" "4"
-run_script "populate_flights.py" "Creating flight logs" "5"
+# CV results, sensor history and flight logs are written in parallel by one resumable loader;
+# extra arguments are passed through, e.g. populate_data.sh --farms 50 --days 365 --workers 32
+run_script "bulk_loader.py" "Generating CV results, sensor data and flight logs" "3-5" "$@"
 # run_script "populate_legal_docs.py" "Uploading legal documents" "6"
 # run_script "generate_past_reports.py" "Generating past agent reports" "7"
 
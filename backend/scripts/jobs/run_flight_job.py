@@ -0,0 +1,124 @@
+# scripts/jobs/run_flight_job.py
+# Run a flight classification job end to end locally: jobs_api submits it,
+# an in-process queue stands in for SQS, and worker threads run jobs_worker
+#
+# Usage (from backend/, with DynamoDB Local / MinIO holding the tables, images and flight):
+#   python3 scripts/jobs/run_flight_job.py flight_drone_001_2026-01-17_morning \
+#       --dynamodb-endpoint-url http://localhost:8000 --s3-endpoint-url http://localhost:9000 [--workers 4]
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'terraform', 'modules', 'lambda')
+
+DEFAULT_ENV = {
+    'AWS_DEFAULT_REGION': 'eu-west-1',
+    'S3_BUCKET_IMAGES': 'agridrone-demo-images',
+    'DYNAMODB_TABLE_CV': 'agridrone-demo-cv-results',
+    'DYNAMODB_TABLE_FLIGHTS': 'agridrone-demo-flight-logs',
+    'DYNAMODB_TABLE_JOBS': 'agridrone-demo-classification-jobs',
+    # Run the NumPy test model when no ONNX export is at MODEL_PATH
+    'ALLOW_TEST_MODEL': '1',
+}
+
+
+class LocalQueue:
+    """SQS stand-in: messages are JSON-round-tripped and redelivered (with a receive count) on failure"""
+
+    def __init__(self):
+        self.messages = queue.Queue()
+
+    def send(self, messages):
+        for message in messages:
+            self.messages.put((json.dumps(message), 1))
+
+    def work(self, worker, max_attempts):
+        while True:
+            item = self.messages.get()
+            if item is None:
+                return
+            body, receive_count = item
+            try:
+                worker.process_message(json.loads(body), receive_count)
+            except Exception as e:
+                print(f"   chunk failed (delivery {receive_count}): {str(e)}")
+                if receive_count < max_attempts:
+                    self.messages.put((body, receive_count + 1))
+            finally:
+                self.messages.task_done()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Run a flight classification job locally')
+    parser.add_argument('flight_id', help='flight_id in the flight logs table')
+    parser.add_argument('--rerun', action='store_true', help='Start a new run of an existing job')
+    parser.add_argument('--workers', type=int, default=2, help='Worker threads (stand-in for Lambda concurrency)')
+    parser.add_argument('--dynamodb-endpoint-url', help='DynamoDB endpoint (DynamoDB Local / moto server)')
+    parser.add_argument('--s3-endpoint-url', help='S3 endpoint (MinIO / moto server)')
+    parser.add_argument('--env', action='append', default=[], metavar='NAME=VALUE',
+                        help='Extra environment variables, e.g. table names (repeatable)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Endpoints and table names must be in place before the Lambda modules are imported
+    for name, value in DEFAULT_ENV.items():
+        os.environ.setdefault(name, value)
+    if args.dynamodb_endpoint_url:
+        os.environ['DYNAMODB_ENDPOINT_URL'] = args.dynamodb_endpoint_url
+    if args.s3_endpoint_url:
+        os.environ['S3_ENDPOINT_URL'] = args.s3_endpoint_url
+    for pair in args.env:
+        name, _, value = pair.partition('=')
+        os.environ[name] = value
+
+    sys.path.insert(0, os.path.abspath(os.path.join(LAMBDA_DIR, 'query_lambda_code')))
+    sys.path.insert(0, os.path.abspath(os.path.join(LAMBDA_DIR, 'cv_inference_code')))
+    import jobs_api
+    import jobs_worker
+
+    local_queue = LocalQueue()
+    jobs_api.queue = local_queue
+
+    response = jobs_api.handler({
+        'requestContext': {'http': {'method': 'POST'}},
+        'body': json.dumps({'flight_id': args.flight_id, 'rerun': args.rerun})
+    }, None)
+    job = json.loads(response['body'])
+    if response['statusCode'] >= 400:
+        print(f"❌ {job['message']}")
+        return 1
+    print(f"▶️  {job['job_id']} run {job['run']}: {job['total_images']} images in {job['chunks_total']} chunks "
+          f"({job['status']})")
+
+    threads = [
+        threading.Thread(target=local_queue.work, args=(jobs_worker, jobs_worker.JOB_MAX_ATTEMPTS), daemon=True)
+        for _ in range(args.workers)
+    ]
+    for thread in threads:
+        thread.start()
+
+    status = {'pathParameters': {'job_id': job['job_id']}}
+    while local_queue.messages.unfinished_tasks:
+        time.sleep(1)
+        job = json.loads(jobs_api.handler(status, None)['body'])
+        print(f"   {job['progress_percentage']:5.1f}%  completed {job['completed']}  failed {job['failed']}  "
+              f"skipped {job['skipped']}  {job['images_per_second'] or 0:.1f} images/s")
+    local_queue.messages.join()
+    for _ in threads:
+        local_queue.messages.put(None)
+
+    job = json.loads(jobs_api.handler(status, None)['body'])
+    print(f"✅ {job['status']}: {job['completed']} completed, {job['failed']} failed, {job['skipped']} skipped")
+    return 0 if job['status'] == 'completed' else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
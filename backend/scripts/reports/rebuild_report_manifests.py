@@ -0,0 +1,84 @@
+# scripts/reports/rebuild_report_manifests.py
+# Build (or repair) the reports bucket's monthly manifests from a LIST of daily/
+#
+# The report indexer Lambda only sees reports written after it was deployed;
+# run this once to index older reports, or to repair a manifest by hand.
+#
+# Usage (from backend/):
+#   python3 scripts/reports/rebuild_report_manifests.py agridrone-demo-reports [--farm-id NL_Farm_001]
+#   [--endpoint-url http://localhost:9000] [--dry-run]
+
+import argparse
+import os
+import sys
+from collections import defaultdict
+
+import boto3
+
+QUERY_LAMBDA_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    '..', '..', 'terraform', 'modules', 'lambda', 'query_lambda_code'
+)
+sys.path.insert(0, os.path.abspath(QUERY_LAMBDA_DIR))
+
+from report_manifest import (  # noqa: E402
+    MAX_UPDATE_ATTEMPTS, apply_event, empty_manifest, load_manifest, parse_report_key, write_manifest
+)
+
+def list_reports(client, bucket, prefix):
+    """{(farm_id, year, month): [(key, event_name, size, etag, last_modified, sequencer)]} from a LIST"""
+    months = defaultdict(list)
+    for page in client.get_paginator('list_objects_v2').paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get('Contents', []):
+            parsed = parse_report_key(obj['Key'])
+            if parsed is None:
+                continue
+            farm_id, year, month, _, _ = parsed
+            months[(farm_id, year, month)].append((
+                obj['Key'],
+                'ObjectCreated:Put',
+                obj['Size'],
+                obj['ETag'],
+                obj['LastModified'].strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z',
+                None
+            ))
+    return months
+
+def rebuild_month(client, bucket, farm_id, year, month):
+    """Replace one month's manifest with what LIST shows, retrying if the indexer writes concurrently"""
+    prefix = f"daily/{farm_id}/{year:04d}/{month:02d}/"
+    for _ in range(MAX_UPDATE_ATTEMPTS):
+        _, etag = load_manifest(client, bucket, farm_id, year, month)
+        manifest = empty_manifest(farm_id, year, month)
+        for event in list_reports(client, bucket, prefix).get((farm_id, year, month), []):
+            apply_event(manifest, *event)
+        if write_manifest(client, bucket, manifest, etag):
+            return manifest
+    raise RuntimeError(f"Could not rebuild {prefix} after {MAX_UPDATE_ATTEMPTS} attempts")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Rebuild monthly report manifests from the bucket contents')
+    parser.add_argument('bucket', help='Reports bucket name')
+    parser.add_argument('--farm-id', help='Only rebuild this farm (default: every farm under daily/)')
+    parser.add_argument('--endpoint-url', help='S3 endpoint (MinIO / moto server)')
+    parser.add_argument('--dry-run', action='store_true', help='List what would be indexed without writing')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    client = boto3.client('s3', endpoint_url=args.endpoint_url)
+    prefix = f"daily/{args.farm_id}/" if args.farm_id else 'daily/'
+
+    months = list_reports(client, args.bucket, prefix)
+    print(f"▶️  {sum(len(events) for events in months.values())} reports in {len(months)} farm-months under {prefix}")
+
+    for farm_id, year, month in sorted(months):
+        if args.dry_run:
+            print(f"   {farm_id} {year:04d}-{month:02d}: {len(months[(farm_id, year, month)])} reports")
+            continue
+        manifest = rebuild_month(client, args.bucket, farm_id, year, month)
+        print(f"✅ {farm_id} {year:04d}-{month:02d}: {len(manifest['reports'])} days indexed")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -72,6 +72,16 @@ module "lambda_functions" {
   dynamodb_flight_table = module.dynamodb_tables.flight_logs_table_name
   farm_id               = var.farm_id
   deploy_cv_lambda      = var.deploy_cv_lambda
+
+  dynamodb_sensor_latest_table  = module.dynamodb_tables.sensor_latest_table_name
+  dynamodb_sensor_stream_arn    = module.dynamodb_tables.sensor_data_stream_arn
+  dynamodb_sensor_rollups_table = module.dynamodb_tables.sensor_rollups_table_name
+  dynamodb_cache_versions_table = module.dynamodb_tables.cache_versions_table_name
+  dynamodb_jobs_table           = module.dynamodb_tables.classification_jobs_table_name
+  dynamodb_classify_cache_table = module.dynamodb_tables.classification_cache_table_name
+  dynamodb_sensor_anomaly_table = module.dynamodb_tables.sensor_anomaly_state_table_name
+  disease_alert_topic_arn       = module.monitoring.disease_alert_topic_arn
+  dynamodb_disease_risk_table   = module.dynamodb_tables.disease_risk_table_name
 }
 
 # API Gateway
@@ -90,14 +100,22 @@ module "api_gateway" {
   cv_lambda_deployed          = var.deploy_cv_lambda
 
   # Query Lambda variables
-  cv_results_query_invoke_arn     = module.lambda_functions.cv_results_query_invoke_arn
-  sensor_data_query_invoke_arn    = module.lambda_functions.sensor_data_query_invoke_arn
-  flights_query_invoke_arn        = module.lambda_functions.flights_query_invoke_arn
-  reports_query_invoke_arn        = module.lambda_functions.reports_query_invoke_arn
-  cv_results_query_function_name  = module.lambda_functions.cv_results_query_function_name
-  sensor_data_query_function_name = module.lambda_functions.sensor_data_query_function_name
-  flights_query_function_name     = module.lambda_functions.flights_query_function_name
-  reports_query_function_name     = module.lambda_functions.reports_query_function_name
+  cv_results_query_invoke_arn      = module.lambda_functions.cv_results_query_invoke_arn
+  sensor_data_query_invoke_arn     = module.lambda_functions.sensor_data_query_invoke_arn
+  flights_query_invoke_arn         = module.lambda_functions.flights_query_invoke_arn
+  reports_query_invoke_arn         = module.lambda_functions.reports_query_invoke_arn
+  cv_results_query_function_name   = module.lambda_functions.cv_results_query_function_name
+  sensor_data_query_function_name  = module.lambda_functions.sensor_data_query_function_name
+  flights_query_function_name      = module.lambda_functions.flights_query_function_name
+  reports_query_function_name      = module.lambda_functions.reports_query_function_name
+  jobs_api_invoke_arn              = module.lambda_functions.jobs_api_invoke_arn
+  jobs_api_function_name           = module.lambda_functions.jobs_api_function_name
+  fleet_analytics_invoke_arn       = module.lambda_functions.fleet_analytics_invoke_arn
+  fleet_analytics_function_name    = module.lambda_functions.fleet_analytics_function_name
+  coverage_query_invoke_arn        = module.lambda_functions.coverage_query_invoke_arn
+  coverage_query_function_name     = module.lambda_functions.coverage_query_function_name
+  disease_risk_query_invoke_arn    = module.lambda_functions.disease_risk_query_invoke_arn
+  disease_risk_query_function_name = module.lambda_functions.disease_risk_query_function_name
 }
 
 # CloudWatch & SNS
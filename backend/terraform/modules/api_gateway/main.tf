@@ -26,6 +26,14 @@ variable "cv_results_query_function_name" { type = string }
 variable "sensor_data_query_function_name" { type = string }
 variable "flights_query_function_name" { type = string }
 variable "reports_query_function_name" { type = string }
+variable "jobs_api_invoke_arn" { type = string }
+variable "jobs_api_function_name" { type = string }
+variable "fleet_analytics_invoke_arn" { type = string }
+variable "fleet_analytics_function_name" { type = string }
+variable "coverage_query_invoke_arn" { type = string }
+variable "coverage_query_function_name" { type = string }
+variable "disease_risk_query_invoke_arn" { type = string }
+variable "disease_risk_query_function_name" { type = string }
 
 # HTTP API (cheaper than REST API)
 resource "aws_apigatewayv2_api" "main" {
@@ -33,10 +41,11 @@ resource "aws_apigatewayv2_api" "main" {
   protocol_type = "HTTP"
 
   cors_configuration {
-    allow_origins = ["http://localhost:3000"]
-    allow_methods = ["GET", "POST", "OPTIONS"]
-    allow_headers = ["Content-Type", "Authorization"]
-    max_age       = 3600
+    allow_origins  = ["http://localhost:3000"]
+    allow_methods  = ["GET", "POST", "OPTIONS"]
+    allow_headers  = ["Content-Type", "Authorization", "If-None-Match", "If-Modified-Since"]
+    expose_headers = ["ETag", "Last-Modified", "X-Cache"]
+    max_age        = 3600
   }
 }
 
@@ -172,6 +181,12 @@ resource "aws_apigatewayv2_route" "sensor_data" {
   target    = "integrations/${aws_apigatewayv2_integration.sensor_data_query.id}"
 }
 
+resource "aws_apigatewayv2_route" "sensor_data_latest" {
+  api_id    = aws_apigatewayv2_api.main.id
+  route_key = "GET /sensor-data/latest"
+  target    = "integrations/${aws_apigatewayv2_integration.sensor_data_query.id}"
+}
+
 resource "aws_lambda_permission" "api_gateway_sensor_data" {
   statement_id  = "AllowAPIGatewayInvokeSensorData"
   action        = "lambda:InvokeFunction"
@@ -216,6 +231,13 @@ resource "aws_apigatewayv2_route" "reports" {
   target    = "integrations/${aws_apigatewayv2_integration.reports_query.id}"
 }
 
+# Multi-day bundle: /reports?farm_id=&from=&to=
+resource "aws_apigatewayv2_route" "reports_bundle" {
+  api_id    = aws_apigatewayv2_api.main.id
+  route_key = "GET /reports"
+  target    = "integrations/${aws_apigatewayv2_integration.reports_query.id}"
+}
+
 resource "aws_lambda_permission" "api_gateway_reports" {
   statement_id  = "AllowAPIGatewayInvokeReports"
   action        = "lambda:InvokeFunction"
@@ -224,6 +246,100 @@ resource "aws_lambda_permission" "api_gateway_reports" {
   source_arn    = "${aws_apigatewayv2_api.main.execution_arn}/*/*"
 }
 
+# Integration: Flight Classification Jobs
+resource "aws_apigatewayv2_integration" "jobs_api" {
+  api_id                 = aws_apigatewayv2_api.main.id
+  integration_type       = "AWS_PROXY"
+  integration_uri        = var.jobs_api_invoke_arn
+  payload_format_version = "2.0"
+}
+
+resource "aws_apigatewayv2_route" "jobs_submit" {
+  api_id    = aws_apigatewayv2_api.main.id
+  route_key = "POST /jobs"
+  target    = "integrations/${aws_apigatewayv2_integration.jobs_api.id}"
+}
+
+resource "aws_apigatewayv2_route" "jobs_status" {
+  api_id    = aws_apigatewayv2_api.main.id
+  route_key = "GET /jobs/{job_id}"
+  target    = "integrations/${aws_apigatewayv2_integration.jobs_api.id}"
+}
+
+resource "aws_lambda_permission" "api_gateway_jobs" {
+  statement_id  = "AllowAPIGatewayInvokeJobs"
+  action        = "lambda:InvokeFunction"
+  function_name = var.jobs_api_function_name
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${aws_apigatewayv2_api.main.execution_arn}/*/*"
+}
+
+# Integration: Fleet Analytics
+resource "aws_apigatewayv2_integration" "fleet_analytics" {
+  api_id                 = aws_apigatewayv2_api.main.id
+  integration_type       = "AWS_PROXY"
+  integration_uri        = var.fleet_analytics_invoke_arn
+  payload_format_version = "2.0"
+}
+
+resource "aws_apigatewayv2_route" "fleet_analytics" {
+  api_id    = aws_apigatewayv2_api.main.id
+  route_key = "GET /fleet/analytics"
+  target    = "integrations/${aws_apigatewayv2_integration.fleet_analytics.id}"
+}
+
+resource "aws_lambda_permission" "api_gateway_fleet_analytics" {
+  statement_id  = "AllowAPIGatewayInvokeFleetAnalytics"
+  action        = "lambda:InvokeFunction"
+  function_name = var.fleet_analytics_function_name
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${aws_apigatewayv2_api.main.execution_arn}/*/*"
+}
+
+# Integration: Coverage Layers
+resource "aws_apigatewayv2_integration" "coverage_query" {
+  api_id                 = aws_apigatewayv2_api.main.id
+  integration_type       = "AWS_PROXY"
+  integration_uri        = var.coverage_query_invoke_arn
+  payload_format_version = "2.0"
+}
+
+resource "aws_apigatewayv2_route" "coverage" {
+  api_id    = aws_apigatewayv2_api.main.id
+  route_key = "GET /coverage"
+  target    = "integrations/${aws_apigatewayv2_integration.coverage_query.id}"
+}
+
+resource "aws_lambda_permission" "api_gateway_coverage" {
+  statement_id  = "AllowAPIGatewayInvokeCoverage"
+  action        = "lambda:InvokeFunction"
+  function_name = var.coverage_query_function_name
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${aws_apigatewayv2_api.main.execution_arn}/*/*"
+}
+
+# Integration: Disease Risk
+resource "aws_apigatewayv2_integration" "disease_risk_query" {
+  api_id                 = aws_apigatewayv2_api.main.id
+  integration_type       = "AWS_PROXY"
+  integration_uri        = var.disease_risk_query_invoke_arn
+  payload_format_version = "2.0"
+}
+
+resource "aws_apigatewayv2_route" "disease_risk" {
+  api_id    = aws_apigatewayv2_api.main.id
+  route_key = "GET /disease-risk"
+  target    = "integrations/${aws_apigatewayv2_integration.disease_risk_query.id}"
+}
+
+resource "aws_lambda_permission" "api_gateway_disease_risk" {
+  statement_id  = "AllowAPIGatewayInvokeDiseaseRisk"
+  action        = "lambda:InvokeFunction"
+  function_name = var.disease_risk_query_function_name
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${aws_apigatewayv2_api.main.execution_arn}/*/*"
+}
+
 # Outputs
 output "api_gateway_url" {
   value = aws_apigatewayv2_stage.default.invoke_url
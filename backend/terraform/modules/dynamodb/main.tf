@@ -60,6 +60,33 @@ resource "aws_dynamodb_table" "sensor_data" {
     type = "N"
   }
 
+  attribute {
+    name = "farm_id"
+    type = "S"
+  }
+
+  # "{farm_id}#{field_zone}", written by the sensor generators
+  attribute {
+    name = "farm_zone"
+    type = "S"
+  }
+
+  # Farm-wide time-ordered reads (dashboard, /sensor-data?farm_id=)
+  global_secondary_index {
+    name            = "farm_id-timestamp-index"
+    hash_key        = "farm_id"
+    range_key       = "timestamp"
+    projection_type = "ALL"
+  }
+
+  # Zone-scoped time-ordered reads (/sensor-data?farm_id=&field_zone=)
+  global_secondary_index {
+    name            = "farm_zone-timestamp-index"
+    hash_key        = "farm_zone"
+    range_key       = "timestamp"
+    projection_type = "ALL"
+  }
+
   stream_enabled   = true
   stream_view_type = "NEW_IMAGE"
 
@@ -72,6 +99,155 @@ resource "aws_dynamodb_table" "sensor_data" {
   }
 }
 
+# Sensor Latest State Table
+# One row per sensor holding its most recent reading; maintained from the
+# sensor_data stream so "current value of every sensor" is a single-partition read
+resource "aws_dynamodb_table" "sensor_latest" {
+  name         = "${var.project_name}-sensor-latest"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "farm_id"
+  range_key    = "sensor_id"
+
+  attribute {
+    name = "farm_id"
+    type = "S"
+  }
+
+  attribute {
+    name = "sensor_id"
+    type = "S"
+  }
+
+  tags = {
+    Name = "${var.project_name}-sensor-latest"
+  }
+}
+
+# Sensor Rollups Table
+# Hourly/daily min/max/mean/count per sensor, zone and farm series, written by
+# the sensor_rollup Lambda. series_key is "{entity_type}#{entity_id}#{resolution}"
+resource "aws_dynamodb_table" "sensor_rollups" {
+  name         = "${var.project_name}-sensor-rollups"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "series_key"
+  range_key    = "bucket_start"
+
+  attribute {
+    name = "series_key"
+    type = "S"
+  }
+
+  attribute {
+    name = "bucket_start"
+    type = "N"
+  }
+
+  # "{farm_id}#{resolution}", lets the day rollup read all hourly buckets of a farm at once
+  attribute {
+    name = "farm_resolution"
+    type = "S"
+  }
+
+  global_secondary_index {
+    name            = "farm_resolution-bucket_start-index"
+    hash_key        = "farm_resolution"
+    range_key       = "bucket_start"
+    projection_type = "ALL"
+  }
+
+  point_in_time_recovery {
+    enabled = true
+  }
+
+  tags = {
+    Name = "${var.project_name}-sensor-rollups"
+  }
+}
+
+# Sensor Anomaly State Table
+# Rolling statistics per sensor ("sensor#{sensor_id}", a packed binary state)
+# for the anomaly-detector stream consumer, plus its per-farm hourly alert
+# counters ("alerts#{farm_id}#{hour}"). Both expire through TTL
+resource "aws_dynamodb_table" "sensor_anomaly_state" {
+  name         = "${var.project_name}-sensor-anomaly-state"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "state_key"
+
+  attribute {
+    name = "state_key"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
+  tags = {
+    Name = "${var.project_name}-sensor-anomaly-state"
+  }
+}
+
+# Disease Risk Table
+# Hourly late-blight risk per field zone, written by the disease_risk Lambda
+# from zone rollups and cv_results. zone_key is "{farm_id}#{field_zone}"
+resource "aws_dynamodb_table" "disease_risk" {
+  name         = "${var.project_name}-disease-risk"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "zone_key"
+  range_key    = "hour_start"
+
+  attribute {
+    name = "zone_key"
+    type = "S"
+  }
+
+  attribute {
+    name = "hour_start"
+    type = "N"
+  }
+
+  attribute {
+    name = "farm_id"
+    type = "S"
+  }
+
+  # Every zone of a farm by hour (the crop-health series and the scorer's previous hour)
+  global_secondary_index {
+    name            = "farm_id-hour_start-index"
+    hash_key        = "farm_id"
+    range_key       = "hour_start"
+    projection_type = "ALL"
+  }
+
+  point_in_time_recovery {
+    enabled = true
+  }
+
+  tags = {
+    Name = "${var.project_name}-disease-risk"
+  }
+}
+
+# Cache Versions Table
+# Per-partition version counters ("sensor_data#{farm_id}") bumped by the
+# latest-state stream consumer; the query Lambdas' response caches drop
+# entries filled under an older version
+resource "aws_dynamodb_table" "cache_versions" {
+  name         = "${var.project_name}-cache-versions"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "partition"
+
+  attribute {
+    name = "partition"
+    type = "S"
+  }
+
+  tags = {
+    Name = "${var.project_name}-cache-versions"
+  }
+}
+
 # Flight Logs Table
 resource "aws_dynamodb_table" "flight_logs" {
   name         = "${var.project_name}-flight-logs"
@@ -88,12 +264,43 @@ resource "aws_dynamodb_table" "flight_logs" {
     type = "S"
   }
 
+  attribute {
+    name = "drone_id"
+    type = "S"
+  }
+
+  attribute {
+    name = "farm_id"
+    type = "S"
+  }
+
+  attribute {
+    name = "flight_start"
+    type = "N"
+  }
+
   global_secondary_index {
     name            = "flight_date-index"
     hash_key        = "flight_date"
     projection_type = "ALL"
   }
 
+  # A drone's flights in time order (maintenance history, per-drone windows)
+  global_secondary_index {
+    name            = "drone_id-flight_start-index"
+    hash_key        = "drone_id"
+    range_key       = "flight_start"
+    projection_type = "ALL"
+  }
+
+  # A farm's flights in time order
+  global_secondary_index {
+    name            = "farm_id-flight_start-index"
+    hash_key        = "farm_id"
+    range_key       = "flight_start"
+    projection_type = "ALL"
+  }
+
   point_in_time_recovery {
     enabled = true
   }
@@ -103,6 +310,55 @@ resource "aws_dynamodb_table" "flight_logs" {
   }
 }
 
+# Classification Jobs Table (flight-level CV jobs; progress counters and chunk checkpoints)
+resource "aws_dynamodb_table" "classification_jobs" {
+  name         = "${var.project_name}-classification-jobs"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "job_id"
+
+  attribute {
+    name = "job_id"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
+  tags = {
+    Name = "${var.project_name}-classification-jobs"
+  }
+}
+
+# Classification Cache Table (inference results by image content hash, model version and inference settings)
+resource "aws_dynamodb_table" "classification_cache" {
+  name         = "${var.project_name}-classification-cache"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "content_hash"
+  range_key    = "variant"
+
+  attribute {
+    name = "content_hash"
+    type = "S"
+  }
+
+  # "{model_version}|{settings}": whole-frame and tiled results of one image are kept side by side
+  attribute {
+    name = "variant"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
+  tags = {
+    Name = "${var.project_name}-classification-cache"
+  }
+}
+
 # Agent Outputs Table
 resource "aws_dynamodb_table" "agent_outputs" {
   name         = "${var.project_name}-agent-outputs"
@@ -150,6 +406,46 @@ output "sensor_data_stream_arn" {
   value = aws_dynamodb_table.sensor_data.stream_arn
 }
 
+output "sensor_latest_table_name" {
+  value = aws_dynamodb_table.sensor_latest.name
+}
+
+output "sensor_latest_table_arn" {
+  value = aws_dynamodb_table.sensor_latest.arn
+}
+
+output "sensor_rollups_table_name" {
+  value = aws_dynamodb_table.sensor_rollups.name
+}
+
+output "sensor_rollups_table_arn" {
+  value = aws_dynamodb_table.sensor_rollups.arn
+}
+
+output "sensor_anomaly_state_table_name" {
+  value = aws_dynamodb_table.sensor_anomaly_state.name
+}
+
+output "sensor_anomaly_state_table_arn" {
+  value = aws_dynamodb_table.sensor_anomaly_state.arn
+}
+
+output "disease_risk_table_name" {
+  value = aws_dynamodb_table.disease_risk.name
+}
+
+output "disease_risk_table_arn" {
+  value = aws_dynamodb_table.disease_risk.arn
+}
+
+output "cache_versions_table_name" {
+  value = aws_dynamodb_table.cache_versions.name
+}
+
+output "cache_versions_table_arn" {
+  value = aws_dynamodb_table.cache_versions.arn
+}
+
 output "flight_logs_table_name" {
   value = aws_dynamodb_table.flight_logs.name
 }
@@ -158,6 +454,22 @@ output "flight_logs_table_arn" {
   value = aws_dynamodb_table.flight_logs.arn
 }
 
+output "classification_jobs_table_name" {
+  value = aws_dynamodb_table.classification_jobs.name
+}
+
+output "classification_jobs_table_arn" {
+  value = aws_dynamodb_table.classification_jobs.arn
+}
+
+output "classification_cache_table_name" {
+  value = aws_dynamodb_table.classification_cache.name
+}
+
+output "classification_cache_table_arn" {
+  value = aws_dynamodb_table.classification_cache.arn
+}
+
 output "agent_outputs_table_name" {
   value = aws_dynamodb_table.agent_outputs.name
 }
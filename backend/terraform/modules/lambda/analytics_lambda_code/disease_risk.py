@@ -0,0 +1,372 @@
+# terraform/modules/lambda/analytics_lambda_code/disease_risk.py
+# Hourly late-blight risk per field zone from zone sensor rollups and cv_results
+#
+# For every zone and hour a feature frame joins the zone's hourly rollup
+# (temperature, leaf wetness; humidity from the zone or, for soil-only zones,
+# the farm's weather station) with the zone's cv_results of that hour (images
+# and diseased classifications). Two accumulators turn it into a risk index:
+# - blight units: an hour is wet at humidity >= 90% or leaf wetness >= 6 h;
+#   from the 7th consecutive wet hour on, each wet hour adds units by its
+#   temperature band (none below 3 or from 28 degrees C, most at 8-22),
+#   Simcast-style. The units are summed with a 72-hour half-life.
+# - detections: the diseased share of the zone's recent images (sums with a
+#   7-day half-life), fading with the same half-life after the last survey.
+# Every accumulator is carried on the stored row, so scoring an hour needs
+# only the previous hour's rows: each run scores the hours since the newest
+# stored one and never rereads or recomputes history.
+
+import json
+import os
+import time
+import boto3
+import numpy as np
+from boto3.dynamodb.conditions import Attr, Key
+from decimal import Decimal
+
+dynamodb = boto3.resource('dynamodb', endpoint_url=os.environ.get('DYNAMODB_ENDPOINT_URL'))
+rollup_table = dynamodb.Table(os.environ['DYNAMODB_TABLE_SENSOR_ROLLUPS'])
+cv_table = dynamodb.Table(os.environ['DYNAMODB_TABLE_CV'])
+risk_table = dynamodb.Table(os.environ['DYNAMODB_TABLE_DISEASE_RISK'])
+default_farm_ids = [f for f in os.environ.get('FARM_IDS', '').split(',') if f]
+
+HOUR = 3600
+
+ROLLUP_INDEX = 'farm_resolution-bucket_start-index'
+CV_INDEX = 'farm_id-timestamp-index'
+RISK_INDEX = 'farm_id-hour_start-index'
+
+# sensor_rollup refreshes the previous and current hour every 15 minutes, so
+# an hour is final shortly after the next one ends
+SETTLE_SECONDS = 1800
+# A farm without stored risk starts this far back, so the accumulators are warm
+BOOTSTRAP_HOURS = 7 * 24
+# Hours read and scored at a time on long catch-ups
+CHUNK_HOURS = 7 * 24
+# Zones without sensor readings or images for this long stop getting rows
+STALE_ZONE_HOURS = 14 * 24
+
+WET_HUMIDITY = 90.0
+WET_LEAF_WETNESS = 6.0
+MIN_WET_RUN = 7
+# Blight units per wet hour by temperature band: edges in degrees C, one more unit value than edges
+TEMPERATURE_EDGES = np.array([3.0, 8.0, 23.0, 28.0])
+BLIGHT_UNITS = np.array([0.0, 0.25, 0.4, 0.25, 0.0])
+BLIGHT_HALF_LIFE_HOURS = 72
+# Accumulated units at which the weather part of the index is at its maximum
+BLIGHT_UNIT_THRESHOLD = 30.0
+
+SURVEY_HALF_LIFE_HOURS = 7 * 24
+# Share of the index given to weather; the rest to detections
+WEATHER_WEIGHT = 0.6
+RISK_LEVELS = ((60, 'high'), (30, 'moderate'), (0, 'low'))
+
+FEATURES = ('temperature_celsius', 'humidity_percentage', 'leaf_wetness_duration_hours')
+# Per-zone accumulators carried from one hour's row to the next
+STATE_FIELDS = ('wet_run', 'blight_pressure', 'recent_images', 'recent_diseased', 'last_survey', 'last_seen')
+# Carried values that are whole hours or epoch seconds
+COUNTER_FIELDS = ('wet_run', 'last_survey', 'last_seen')
+# Accumulators are rounded to what a row stores every hour, so scores do not depend on where runs split
+STATE_DECIMALS = 6
+
+
+def zone_key(farm_id, field_zone):
+    return f"{farm_id}#{field_zone}"
+
+
+def query_all(table, kwargs):
+    items = []
+    while True:
+        response = table.query(**kwargs)
+        items.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return items
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def read_rollups(farm_id, start, end):
+    """Zone and farm hourly rollups of [start, end), feature metrics only"""
+    return query_all(rollup_table, {
+        'IndexName': ROLLUP_INDEX,
+        'KeyConditionExpression': Key('farm_resolution').eq(f"{farm_id}#hour")
+        & Key('bucket_start').between(start, end - 1),
+        'FilterExpression': Attr('entity_type').is_in(['zone', 'farm']),
+        'ProjectionExpression': 'entity_type, entity_id, bucket_start, ' + ', '.join(FEATURES),
+    })
+
+
+def read_detections(farm_id, start, end):
+    """cv_results of [start, end): zone, time and classification only"""
+    return query_all(cv_table, {
+        'IndexName': CV_INDEX,
+        'KeyConditionExpression': Key('farm_id').eq(farm_id) & Key('timestamp').between(start, end - 1),
+        'ProjectionExpression': 'field_zone, #ts, classification',
+        'ExpressionAttributeNames': {'#ts': 'timestamp'},
+    })
+
+
+def read_risk_hour(farm_id, hour_start):
+    """Stored rows of one farm and hour, keyed by zone"""
+    items = query_all(risk_table, {
+        'IndexName': RISK_INDEX,
+        'KeyConditionExpression': Key('farm_id').eq(farm_id) & Key('hour_start').eq(hour_start),
+    })
+    return {item['field_zone']: item for item in items}
+
+
+def latest_risk_hour(farm_id):
+    """Newest scored hour of a farm, None before its first run"""
+    response = risk_table.query(
+        IndexName=RISK_INDEX,
+        KeyConditionExpression=Key('farm_id').eq(farm_id),
+        ScanIndexForward=False,
+        Limit=1,
+        ProjectionExpression='hour_start',
+    )
+    items = response.get('Items', [])
+    return int(items[0]['hour_start']) if items else None
+
+
+def initial_state(zones, stored):
+    """Accumulator arrays over zones from stored rows (zero for zones without one)"""
+    state = {name: np.zeros(len(zones)) for name in STATE_FIELDS}
+    for z, zone in enumerate(zones):
+        row = stored.get(zone)
+        if row:
+            for name in STATE_FIELDS:
+                state[name][z] = float(row.get(name, 0))
+    return state
+
+
+def feature_frame(zones, start, n_hours, rollups, detections):
+    """
+    Time-aligned [hour, zone] arrays: the FEATURES (NaN where a zone has no
+    reading that hour; humidity falls back to the farm's) plus images,
+    diseased images and whether the zone reported sensor data
+    """
+    zone_index = {zone: z for z, zone in enumerate(zones)}
+    shape = (n_hours, len(zones))
+    frame = {name: np.full(shape, np.nan) for name in FEATURES}
+    farm_humidity = np.full(n_hours, np.nan)
+    reported = np.zeros(shape, dtype=bool)
+
+    for item in rollups:
+        h = (int(item['bucket_start']) - start) // HOUR
+        if item['entity_type'] == 'farm':
+            stats = item.get('humidity_percentage')
+            if stats:
+                farm_humidity[h] = float(stats['mean'])
+            continue
+        z = zone_index.get(item['entity_id'].split('#', 1)[1])
+        if z is None:
+            continue
+        reported[h, z] = True
+        for name in FEATURES:
+            stats = item.get(name)
+            if stats:
+                frame[name][h, z] = float(stats['mean'])
+
+    humidity = frame['humidity_percentage']
+    missing = np.isnan(humidity)
+    humidity[missing] = np.broadcast_to(farm_humidity[:, None], shape)[missing]
+
+    images = np.zeros(shape)
+    diseased = np.zeros(shape)
+    rows, columns, sick = [], [], []
+    for item in detections:
+        z = zone_index.get(item.get('field_zone'))
+        if z is None:
+            continue
+        rows.append((int(item['timestamp']) - start) // HOUR)
+        columns.append(z)
+        sick.append(item.get('classification') == 'diseased')
+    if rows:
+        np.add.at(images, (rows, columns), 1.0)
+        np.add.at(diseased, (rows, columns), np.array(sick, dtype=np.float64))
+
+    frame.update(images=images, diseased=diseased, reported=reported)
+    return frame
+
+
+def score(frame, state, start):
+    """
+    Advance the accumulators hour by hour (all zones at once); returns per-hour
+    output arrays and updates state in place
+    """
+    blight_decay = 0.5 ** (1 / BLIGHT_HALF_LIFE_HOURS)
+    survey_decay = 0.5 ** (1 / SURVEY_HALF_LIFE_HOURS)
+    n_hours = frame['images'].shape[0]
+    outputs = {name: [] for name in ('wet', 'blight_units', 'diseased_share', 'weather_score', 'detection_score',
+                                     'risk_index', *STATE_FIELDS)}
+
+    for h in range(n_hours):
+        hour = start + h * HOUR
+        # NaN compares False: an hour without readings is dry
+        with np.errstate(invalid='ignore'):
+            wet = (frame['humidity_percentage'][h] >= WET_HUMIDITY) | (
+                frame['leaf_wetness_duration_hours'][h] >= WET_LEAF_WETNESS)
+        state['wet_run'] = np.where(wet, state['wet_run'] + 1, 0)
+        # NaN temperatures sort past the last edge, into the zero band
+        band_units = BLIGHT_UNITS[np.searchsorted(TEMPERATURE_EDGES, frame['temperature_celsius'][h], side='right')]
+        units = np.where(wet & (state['wet_run'] >= MIN_WET_RUN), band_units, 0.0)
+        state['blight_pressure'] = state['blight_pressure'] * blight_decay + units
+
+        images, diseased = frame['images'][h], frame['diseased'][h]
+        state['recent_images'] = state['recent_images'] * survey_decay + images
+        state['recent_diseased'] = state['recent_diseased'] * survey_decay + diseased
+        for name in ('blight_pressure', 'recent_images', 'recent_diseased'):
+            state[name] = np.round(state[name], STATE_DECIMALS)
+        state['last_survey'] = np.where(images > 0, hour, state['last_survey'])
+        state['last_seen'] = np.where(frame['reported'][h] | (images > 0), hour, state['last_seen'])
+
+        share = np.divide(state['recent_diseased'], state['recent_images'],
+                          out=np.zeros_like(images), where=state['recent_images'] > 0)
+        freshness = np.where(
+            state['last_survey'] > 0,
+            0.5 ** ((hour - state['last_survey']) / HOUR / SURVEY_HALF_LIFE_HOURS),
+            0.0
+        )
+        weather = np.minimum(1.0, state['blight_pressure'] / BLIGHT_UNIT_THRESHOLD)
+        detection = share * freshness
+
+        outputs['wet'].append(wet)
+        outputs['blight_units'].append(units)
+        outputs['diseased_share'].append(share)
+        outputs['weather_score'].append(weather)
+        outputs['detection_score'].append(detection)
+        outputs['risk_index'].append(np.rint(100 * (WEATHER_WEIGHT * weather + (1 - WEATHER_WEIGHT) * detection)))
+        for name in STATE_FIELDS:
+            outputs[name].append(state[name].copy())
+
+    return {name: np.array(values) for name, values in outputs.items()}
+
+
+def risk_level(index):
+    for floor, level in RISK_LEVELS:
+        if index >= floor:
+            return level
+    return 'low'
+
+
+def _decimal(value, decimals=3):
+    return Decimal(str(round(float(value), decimals)))
+
+
+def to_items(farm_id, zones, start, frame, scored):
+    """One row per zone and hour: features, this hour's inputs, scores and the carried accumulators"""
+    items = []
+    for h in range(scored['risk_index'].shape[0]):
+        hour = start + h * HOUR
+        for z, zone in enumerate(zones):
+            risk_index = int(scored['risk_index'][h, z])
+            item = {
+                'zone_key': zone_key(farm_id, zone),
+                'hour_start': hour,
+                'farm_id': farm_id,
+                'field_zone': zone,
+                'wet': bool(scored['wet'][h, z]),
+                'blight_units': _decimal(scored['blight_units'][h, z]),
+                'images': int(frame['images'][h, z]),
+                'diseased_images': int(frame['diseased'][h, z]),
+                'diseased_share': _decimal(scored['diseased_share'][h, z]),
+                'weather_score': _decimal(scored['weather_score'][h, z]),
+                'detection_score': _decimal(scored['detection_score'][h, z]),
+                'risk_index': risk_index,
+                'risk_level': risk_level(risk_index),
+            }
+            for name in FEATURES:
+                value = frame[name][h, z]
+                if not np.isnan(value):
+                    item[name] = _decimal(value)
+            for name in STATE_FIELDS:
+                value = scored[name][h, z]
+                item[name] = int(value) if name in COUNTER_FIELDS else _decimal(value, STATE_DECIMALS)
+            items.append(item)
+    return items
+
+
+def write_items(items):
+    with risk_table.batch_writer(overwrite_by_pkeys=['zone_key', 'hour_start']) as batch:
+        for item in items:
+            batch.put_item(Item=item)
+
+
+def score_chunk(farm_id, start, end, stored):
+    """
+    Score the hours of [start, end) from the rows of the hour before (stored,
+    by zone); returns (the chunk's last rows by zone, items written)
+    """
+    n_hours = (end - start) // HOUR
+    rollups = read_rollups(farm_id, start, end)
+    detections = read_detections(farm_id, start, end)
+
+    seen = {item['entity_id'].split('#', 1)[1] for item in rollups if item['entity_type'] == 'zone'}
+    seen.update(item['field_zone'] for item in detections if item.get('field_zone'))
+    # Carried zones stay until they have been silent for STALE_ZONE_HOURS
+    carried = {
+        zone for zone, row in stored.items()
+        if start - float(row.get('last_seen', 0)) < STALE_ZONE_HOURS * HOUR
+    }
+    zones = sorted(seen | carried)
+    if not zones:
+        return {}, 0
+
+    frame = feature_frame(zones, start, n_hours, rollups, detections)
+    scored = score(frame, initial_state(zones, stored), start)
+    items = to_items(farm_id, zones, start, frame, scored)
+    write_items(items)
+
+    last_hour = end - HOUR
+    return {item['field_zone']: item for item in items if item['hour_start'] == last_hour}, len(items)
+
+
+def handler(event, context):
+    """
+    Scheduled (hourly) or ad-hoc rescoring run.
+    Event fields (all optional):
+    - farm_ids: farms to score (default: FARM_IDS environment variable)
+    - start: Unix epoch hour to rescore from, continuing from the rows of the
+      hour before (e.g. after late classifications or a rollup backfill)
+    - end: Unix epoch; hours ending by then are scored (default: now minus SETTLE_SECONDS)
+    Without start, a farm continues after its newest stored hour (or starts
+    BOOTSTRAP_HOURS back), so a run only scores hours that are new.
+    """
+    event = event or {}
+    started = time.perf_counter()
+
+    end = int(event.get('end', time.time() - SETTLE_SECONDS))
+    end -= end % HOUR
+    farm_ids = event.get('farm_ids') or default_farm_ids
+
+    totals = {'hours': 0, 'rows': 0}
+    for farm_id in farm_ids:
+        if 'start' in event:
+            start = int(event['start'])
+            start -= start % HOUR
+            stored = read_risk_hour(farm_id, start - HOUR)
+        else:
+            latest = latest_risk_hour(farm_id)
+            if latest is None:
+                start, stored = end - BOOTSTRAP_HOURS * HOUR, {}
+            else:
+                start, stored = latest + HOUR, read_risk_hour(farm_id, latest)
+
+        chunk_start = start
+        while chunk_start < end:
+            chunk_end = min(end, chunk_start + CHUNK_HOURS * HOUR)
+            stored, rows = score_chunk(farm_id, chunk_start, chunk_end, stored)
+            totals['hours'] += (chunk_end - chunk_start) // HOUR
+            totals['rows'] += rows
+            chunk_start = chunk_end
+
+    summary = {
+        'farm_ids': farm_ids,
+        'end': end,
+        **totals,
+        'elapsed_seconds': round(time.perf_counter() - started, 3),
+    }
+    print(json.dumps(summary))
+
+    return {
+        'statusCode': 200,
+        'body': json.dumps(summary)
+    }
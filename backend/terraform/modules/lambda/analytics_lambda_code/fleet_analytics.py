@@ -0,0 +1,313 @@
+# terraform/modules/lambda/analytics_lambda_code/fleet_analytics.py
+# Lambda function for GET /fleet/analytics: per-drone battery and utilization trends
+#
+# Reads only the flight_logs attributes the analytics need (via the farm's
+# flight_start index) and computes every drone at once: flights are grouped
+# by drone with np.unique and all sums, weekly series and least-squares fits
+# are np.bincount reductions over that grouping, so the cost is a few passes
+# over the flight arrays however many drones there are. Results are cached
+# per UTC day in the reports bucket (and in the warm container), so the
+# fleet page loads a few KB instead of every flight item.
+
+import json
+import math
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import boto3
+import numpy as np
+from boto3.dynamodb.conditions import Key, Attr
+from botocore.exceptions import ClientError
+
+dynamodb = boto3.resource('dynamodb', endpoint_url=os.environ.get('DYNAMODB_ENDPOINT_URL'))
+flights_table = dynamodb.Table(os.environ['DYNAMODB_TABLE_FLIGHTS'])
+s3 = boto3.client('s3', endpoint_url=os.environ.get('S3_ENDPOINT_URL'))
+cache_bucket = os.environ.get('S3_BUCKET_REPORTS')
+
+DAY = 86400
+WEEK = 7 * DAY
+DEFAULT_DAYS = 90
+MAX_DAYS = 365
+FARM_INDEX = 'farm_id-flight_start-index'
+CACHE_PREFIX = 'fleet-analytics/'
+
+# A battery is due for replacement once a flight is projected to end below this charge
+REPLACEMENT_END_PERCENTAGE = float(os.environ.get('BATTERY_REPLACEMENT_END_PERCENTAGE', 20))
+# Fewer flights than this (or no spread in cycles/time) leave a drone's trend fields null
+MIN_TREND_FLIGHTS = 5
+# Replacement projections further out than this are reported as null
+MAX_PROJECTION_DAYS = 5 * 365
+
+FLIGHT_PROJECTION = (
+    'drone_id, flight_start, flight_end, battery_start_percentage, battery_end_percentage, '
+    'battery_cycles, coverage_percentage, images_captured, maintenance_alert'
+)
+
+# Warm-container copy of today's results, keyed like the S3 cache objects
+_memo = {}
+
+
+def response(status_code, body, headers=None):
+    return {
+        'statusCode': status_code,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*',
+            **(headers or {})
+        },
+        'body': json.dumps(body)
+    }
+
+
+def read_flights(farm_id, start):
+    """Flights starting at or after start, projected to the analytics attributes"""
+    kwargs = {'ProjectionExpression': FLIGHT_PROJECTION}
+    if farm_id:
+        kwargs['IndexName'] = FARM_INDEX
+        kwargs['KeyConditionExpression'] = Key('farm_id').eq(farm_id) & Key('flight_start').gte(start)
+        operation = flights_table.query
+    else:
+        kwargs['FilterExpression'] = Attr('flight_start').gte(start)
+        operation = flights_table.scan
+
+    items = []
+    while True:
+        page = operation(**kwargs)
+        items.extend(page.get('Items', []))
+        if 'LastEvaluatedKey' not in page:
+            return items
+        kwargs['ExclusiveStartKey'] = page['LastEvaluatedKey']
+
+
+def flight_columns(items):
+    """Drone ids plus one float64 array per attribute (NaN where missing) and the drone index of each flight"""
+    def column(name, default=np.nan):
+        return np.array([float(item.get(name, default)) for item in items], dtype=np.float64)
+
+    drones, groups = np.unique(np.array([item['drone_id'] for item in items]), return_inverse=True)
+    start = column('flight_start')
+    columns = {
+        'start': start,
+        'hours': np.clip(column('flight_end') - start, 0, None) / 3600,
+        'battery_start': column('battery_start_percentage', 100),
+        'battery_end': column('battery_end_percentage'),
+        'cycles': column('battery_cycles'),
+        'coverage': column('coverage_percentage', 0),
+        'images': column('images_captured', 0),
+        'alert': np.array([bool(item.get('maintenance_alert')) for item in items], dtype=np.float64),
+    }
+    return drones, groups, columns
+
+
+def grouped_fit(groups, count, x, y):
+    """
+    Least-squares slope, intercept and r^2 of y on x per group in one pass
+    of bincounts; rows with NaN are ignored, and undetermined groups get NaN
+    """
+    valid = ~(np.isnan(x) | np.isnan(y))
+    g, x, y = groups[valid], x[valid], y[valid]
+    n = np.bincount(g, minlength=count).astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_x = np.bincount(g, x, count) / n
+        mean_y = np.bincount(g, y, count) / n
+        # Centred sums keep the fit exact for large x such as epoch seconds
+        dx, dy = x - mean_x[g], y - mean_y[g]
+        sxx = np.bincount(g, dx * dx, count)
+        sxy = np.bincount(g, dx * dy, count)
+        syy = np.bincount(g, dy * dy, count)
+        determined = (n >= MIN_TREND_FLIGHTS) & (sxx > 0)
+        slope = np.where(determined, sxy / sxx, np.nan)
+        intercept = np.where(determined, mean_y - slope * mean_x, np.nan)
+        r2 = np.where(determined & (syy > 0), sxy * sxy / (sxx * syy), np.nan)
+    return slope, intercept, r2
+
+
+def number(value, digits=2):
+    """JSON-safe rounded float (None for NaN/inf)"""
+    value = float(value)
+    return round(value, digits) if math.isfinite(value) else None
+
+
+def compute(items, window_start, now, days):
+    """Fleet summary and per-drone metrics, regressions and weekly series"""
+    if not items:
+        return {
+            'fleet': {
+                'drones': 0, 'flights': 0, 'flight_hours': 0.0, 'maintenance_alert_rate': None,
+                'battery_fade_per_cycle_median': None, 'replacements_due_30_days': 0, 'coverage_per_flight_hour': None,
+            },
+            'drones': [],
+        }
+
+    drones, groups, c = flight_columns(items)
+    count = len(drones)
+
+    def total(values):
+        return np.bincount(groups, np.nan_to_num(values), count)
+
+    flights = np.bincount(groups, minlength=count)
+    hours = total(c['hours'])
+    alerts = total(c['alert'])
+    battery_end_n = np.bincount(groups, ~np.isnan(c['battery_end']), count)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        battery_end_mean = total(c['battery_end']) / battery_end_n
+        drain_per_hour = total(c['battery_start'] - c['battery_end']) / hours
+        coverage_per_hour = total(c['coverage']) / hours
+        images_per_hour = total(c['images']) / hours
+
+    first = np.full(count, np.inf)
+    last = np.full(count, -np.inf)
+    np.minimum.at(first, groups, c['start'])
+    np.maximum.at(last, groups, c['start'])
+    cycles_now = np.full(count, -np.inf)
+    np.fmax.at(cycles_now, groups, c['cycles'])
+
+    # Battery fade: end-of-flight charge against charge cycles; cycle rate: cycles against days
+    fade, fade_intercept, fade_r2 = grouped_fit(groups, count, c['cycles'], c['battery_end'])
+    cycles_per_day, _, _ = grouped_fit(groups, count, c['start'] / DAY, c['cycles'])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        replacement_cycles = np.where(fade < 0, (REPLACEMENT_END_PERCENTAGE - fade_intercept) / fade, np.nan)
+        days_left = np.clip(replacement_cycles - cycles_now, 0, None) / np.where(cycles_per_day > 0, cycles_per_day, np.nan)
+
+    # Weekly series: one bincount over (drone, week) cells
+    weeks = int(math.ceil((now - window_start) / WEEK)) or 1
+    cell = groups * weeks + np.clip(((c['start'] - window_start) // WEEK).astype(np.int64), 0, weeks - 1)
+    cells = count * weeks
+    week_flights = np.bincount(cell, minlength=cells).reshape(count, weeks)
+    week_hours = np.bincount(cell, np.nan_to_num(c['hours']), cells).reshape(count, weeks)
+    week_alerts = np.bincount(cell, c['alert'], cells).reshape(count, weeks)
+    week_end_n = np.bincount(cell, ~np.isnan(c['battery_end']), cells).reshape(count, weeks)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        week_end = (np.bincount(cell, np.nan_to_num(c['battery_end']), cells).reshape(count, weeks) / week_end_n)
+
+    today = datetime.fromtimestamp(now, tz=timezone.utc).date()
+    results = []
+    for d, drone_id in enumerate(drones):
+        replacement = None
+        if math.isfinite(days_left[d]) and days_left[d] <= MAX_PROJECTION_DAYS:
+            replacement = (today + timedelta(days=int(days_left[d]))).isoformat()
+        results.append({
+            'drone_id': str(drone_id),
+            'flights': int(flights[d]),
+            'flight_hours': number(hours[d]),
+            'first_flight': int(first[d]),
+            'last_flight': int(last[d]),
+            'utilization_hours_per_day': number(hours[d] / days, 3),
+            'battery_cycles': int(cycles_now[d]) if math.isfinite(cycles_now[d]) else None,
+            'battery_end_mean': number(battery_end_mean[d], 1),
+            'battery_drain_per_hour': number(drain_per_hour[d], 1),
+            'battery_fade_per_cycle': number(fade[d], 4),
+            'battery_fade_r2': number(fade_r2[d], 3),
+            'cycles_per_day': number(cycles_per_day[d], 3),
+            'projected_replacement_date': replacement,
+            'maintenance_alerts': int(alerts[d]),
+            'maintenance_alert_rate': number(alerts[d] / flights[d], 3),
+            'coverage_per_flight_hour': number(coverage_per_hour[d], 1),
+            'images_per_flight_hour': number(images_per_hour[d], 1),
+            'weekly': [
+                {
+                    'week_start': int(window_start + w * WEEK),
+                    'flights': int(week_flights[d, w]),
+                    'flight_hours': number(week_hours[d, w]),
+                    'battery_end_mean': number(week_end[d, w], 1),
+                    'maintenance_alerts': int(week_alerts[d, w]),
+                }
+                for w in np.flatnonzero(week_flights[d])
+            ],
+        })
+
+    # Drones due soonest first; drones without a projection last
+    results.sort(key=lambda drone: (drone['projected_replacement_date'] is None, drone['projected_replacement_date'] or ''))
+    total_hours = float(hours.sum())
+    return {
+        'fleet': {
+            'drones': count,
+            'flights': int(flights.sum()),
+            'flight_hours': number(total_hours),
+            'maintenance_alert_rate': number(alerts.sum() / flights.sum(), 3),
+            'battery_fade_per_cycle_median': number(np.nanmedian(fade), 4) if np.isfinite(fade).any() else None,
+            'replacements_due_30_days': int(np.sum(days_left <= 30)),
+            'coverage_per_flight_hour': number(np.nansum(c['coverage']) / total_hours, 1) if total_hours else None,
+        },
+        'drones': results,
+    }
+
+
+def cache_key(farm_id, days, day):
+    return f"{CACHE_PREFIX}{farm_id or '_all'}/{days}d/{day}.json"
+
+
+def load_cached(key):
+    if key in _memo:
+        return _memo[key]
+    if not cache_bucket:
+        return None
+    try:
+        body = s3.get_object(Bucket=cache_bucket, Key=key)['Body'].read()
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+            return None
+        raise
+    _memo[key] = json.loads(body)
+    return _memo[key]
+
+
+def store_cached(key, result):
+    # Only today's entries are ever read again
+    for stale in [k for k in _memo if k.rsplit('/', 1)[-1] != key.rsplit('/', 1)[-1]]:
+        del _memo[stale]
+    _memo[key] = result
+    if cache_bucket:
+        s3.put_object(
+            Bucket=cache_bucket, Key=key, Body=json.dumps(result).encode('utf-8'), ContentType='application/json'
+        )
+
+
+def handler(event, context):
+    """
+    Lambda handler for GET /fleet/analytics
+    Query Parameters:
+    - farm_id (optional): Farm identifier (whole fleet when omitted)
+    - days (optional): Look-back window in days (default 90, max 365)
+    Results are computed once per UTC day and window, then served from cache.
+    """
+    try:
+        params = event.get('queryStringParameters') or {}
+        farm_id = params.get('farm_id')
+        try:
+            days = int(params.get('days', DEFAULT_DAYS))
+        except ValueError:
+            days = 0
+        if not 1 <= days <= MAX_DAYS:
+            return response(400, {'error': 'ValidationError', 'message': f'days must be an integer from 1 to {MAX_DAYS}'})
+
+        now = time.time()
+        today = datetime.fromtimestamp(now, tz=timezone.utc)
+        midnight = today.replace(hour=0, minute=0, second=0, microsecond=0)
+        key = cache_key(farm_id, days, midnight.date().isoformat())
+        # Clients and CDNs may keep the result until the next UTC day starts
+        headers = {'Cache-Control': f"public, max-age={int((midnight + timedelta(days=1) - today).total_seconds())}"}
+
+        result = load_cached(key)
+        if result is not None:
+            return response(200, result, {**headers, 'X-Cache': 'HIT'})
+
+        window_start = int(midnight.timestamp()) - days * DAY
+        started = time.perf_counter()
+        items = read_flights(farm_id, window_start)
+        result = {
+            'farm_id': farm_id,
+            'days': days,
+            'window_start': window_start,
+            'computed_at': int(now),
+            **compute(items, window_start, now, days),
+        }
+        print(f"Fleet analytics for {farm_id or 'all farms'}: {len(items)} flights in "
+              f"{time.perf_counter() - started:.2f}s")
+        store_cached(key, result)
+        return response(200, result, {**headers, 'X-Cache': 'MISS'})
+
+    except Exception as e:
+        print(f"Error computing fleet analytics: {str(e)}")
+        return response(500, {'error': 'InternalServerError', 'message': str(e)})
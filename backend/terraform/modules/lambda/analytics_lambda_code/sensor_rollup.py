@@ -0,0 +1,287 @@
+# terraform/modules/lambda/analytics_lambda_code/sensor_rollup.py
+# Hourly and daily sensor rollups (min/max/mean/count + anomaly counts)
+
+import json
+import os
+import time
+import boto3
+import numpy as np
+from boto3.dynamodb.conditions import Key
+from decimal import Decimal
+
+dynamodb = boto3.resource('dynamodb', endpoint_url=os.environ.get('DYNAMODB_ENDPOINT_URL'))
+sensor_table = dynamodb.Table(os.environ['DYNAMODB_TABLE_SENSORS'])
+rollup_table = dynamodb.Table(os.environ['DYNAMODB_TABLE_SENSOR_ROLLUPS'])
+default_farm_ids = [f for f in os.environ.get('FARM_IDS', '').split(',') if f]
+
+HOUR = 3600
+DAY = 86400
+
+ROLLUP_INDEX = 'farm_resolution-bucket_start-index'
+
+# Aggregated metrics; the NPK nutrients live in the nested NPK_values map
+METRICS = [
+    'moisture_percentage',
+    'pH_level',
+    'temperature_celsius',
+    'nitrogen',
+    'phosphorus',
+    'potassium',
+    'humidity_percentage',
+    'leaf_wetness_duration_hours',
+]
+NPK_METRICS = {'nitrogen', 'phosphorus', 'potassium'}
+
+# A reading outside any of these bounds counts as an anomaly
+# (moisture above 85% matches the spikes injected by the sensor generator)
+ANOMALY_BOUNDS = {
+    'moisture_percentage': (0.0, 85.0),
+    'pH_level': (5.5, 8.0),
+    'temperature_celsius': (-5.0, 35.0),
+}
+
+RAW_PROJECTION = (
+    'sensor_id, #ts, field_zone, moisture_percentage, pH_level, temperature_celsius, '
+    'NPK_values, humidity_percentage, leaf_wetness_duration_hours'
+)
+
+
+def series_key(entity, resolution):
+    """Partition key of a rollup series, e.g. 'zone#NL_Farm_001#Zone_3#hour'"""
+    return f"{entity}#{resolution}"
+
+
+def read_readings(farm_id, start, end):
+    """All raw readings of a farm in [start, end) via the farm/time index"""
+    kwargs = {
+        'IndexName': 'farm_id-timestamp-index',
+        'KeyConditionExpression': Key('farm_id').eq(farm_id) & Key('timestamp').between(start, end - 1),
+        'ProjectionExpression': RAW_PROJECTION,
+        'ExpressionAttributeNames': {'#ts': 'timestamp'},
+    }
+    items = []
+    while True:
+        response = sensor_table.query(**kwargs)
+        items.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return items
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def _metric_value(item, metric):
+    value = item.get('NPK_values', {}).get(metric) if metric in NPK_METRICS else item.get(metric)
+    return np.nan if value is None else float(value)
+
+
+def to_columns(farm_id, items):
+    """
+    Convert items into columnar arrays: (entity labels per row, timestamps, values[n, metrics]).
+    Every reading contributes to its sensor, zone and farm series, so rows are tripled.
+    """
+    n = len(items)
+    timestamps = np.fromiter((int(item['timestamp']) for item in items), dtype=np.int64, count=n)
+    values = np.empty((n, len(METRICS)), dtype=np.float64)
+    for column, metric in enumerate(METRICS):
+        values[:, column] = np.fromiter((_metric_value(item, metric) for item in items), dtype=np.float64, count=n)
+
+    sensors = np.array([f"sensor#{item['sensor_id']}" for item in items], dtype=object)
+    zones = np.array([f"zone#{farm_id}#{item.get('field_zone', '')}" for item in items], dtype=object)
+    farms = np.full(n, f"farm#{farm_id}", dtype=object)
+
+    entities = np.concatenate([sensors, zones, farms])
+    return entities, np.tile(timestamps, 3), np.tile(values, (3, 1))
+
+
+def anomaly_flags(values):
+    """1 for readings breaching any anomaly bound, else 0 (missing metrics never flag)"""
+    flags = np.zeros(values.shape[0], dtype=bool)
+    for metric, (low, high) in ANOMALY_BOUNDS.items():
+        column = values[:, METRICS.index(metric)]
+        with np.errstate(invalid='ignore'):
+            flags |= (column < low) | (column > high)
+    return flags.astype(np.int64)
+
+
+def group_reduce(entities, bucket_starts, mins, maxs, sums, counts, readings, anomalies):
+    """
+    Vectorized group-by over (entity, bucket) combining partial aggregates.
+    Raw readings are partials of one reading each; hourly rollups are partials
+    of the daily ones, so both levels share this reduction.
+    """
+    entity_labels, entity_index = np.unique(entities, return_inverse=True)
+    bucket_labels, bucket_index = np.unique(bucket_starts, return_inverse=True)
+    group_ids = entity_index.astype(np.int64) * len(bucket_labels) + bucket_index
+
+    order = np.argsort(group_ids, kind='stable')
+    unique_groups, starts = np.unique(group_ids[order], return_index=True)
+
+    def reduce(ufunc, column):
+        return ufunc.reduceat(column[order], starts, axis=0)
+
+    return {
+        'entity': entity_labels[unique_groups // len(bucket_labels)],
+        'bucket_start': bucket_labels[unique_groups % len(bucket_labels)],
+        'min': reduce(np.fmin, mins),
+        'max': reduce(np.fmax, maxs),
+        'sum': reduce(np.add, sums),
+        'count': reduce(np.add, counts),
+        'readings': reduce(np.add, readings),
+        'anomaly_count': reduce(np.add, anomalies),
+    }
+
+
+def rollup_raw(farm_id, items):
+    """Hourly aggregates straight from raw readings"""
+    entities, timestamps, values = to_columns(farm_id, items)
+    present = ~np.isnan(values)
+    return group_reduce(
+        entities,
+        timestamps - timestamps % HOUR,
+        values,
+        values,
+        np.where(present, values, 0.0),
+        present.astype(np.int64),
+        np.ones(len(entities), dtype=np.int64),
+        anomaly_flags(values),
+    )
+
+
+def rollup_hours(hour_items):
+    """Daily aggregates from hourly rollup items (no raw re-read)"""
+    n = len(hour_items)
+    shape = (n, len(METRICS))
+    mins, maxs, sums = np.full(shape, np.nan), np.full(shape, np.nan), np.zeros(shape)
+    counts = np.zeros(shape, dtype=np.int64)
+
+    for row, item in enumerate(hour_items):
+        for column, metric in enumerate(METRICS):
+            stats = item.get(metric)
+            if stats:
+                mins[row, column] = float(stats['min'])
+                maxs[row, column] = float(stats['max'])
+                sums[row, column] = float(stats['mean']) * int(stats['count'])
+                counts[row, column] = int(stats['count'])
+
+    entities = np.array([item['series_key'].rsplit('#', 1)[0] for item in hour_items], dtype=object)
+    bucket_starts = np.fromiter((int(item['bucket_start']) for item in hour_items), dtype=np.int64, count=n)
+    readings = np.fromiter((int(item['count']) for item in hour_items), dtype=np.int64, count=n)
+    anomalies = np.fromiter((int(item['anomaly_count']) for item in hour_items), dtype=np.int64, count=n)
+
+    return group_reduce(entities, bucket_starts - bucket_starts % DAY, mins, maxs, sums, counts, readings, anomalies)
+
+
+def _decimal(value):
+    return Decimal(str(round(float(value), 3)))
+
+
+def to_items(farm_id, resolution, groups):
+    """Turn reduced groups into rollup table items"""
+    items = []
+    for g in range(len(groups['entity'])):
+        entity = groups['entity'][g]
+        entity_type, _, entity_id = entity.partition('#')
+        item = {
+            'series_key': series_key(entity, resolution),
+            'bucket_start': int(groups['bucket_start'][g]),
+            'farm_id': farm_id,
+            'farm_resolution': f"{farm_id}#{resolution}",
+            'entity_type': entity_type,
+            'entity_id': entity_id,
+            'resolution': resolution,
+            'count': int(groups['readings'][g]),
+            'anomaly_count': int(groups['anomaly_count'][g]),
+        }
+        for column, metric in enumerate(METRICS):
+            count = int(groups['count'][g, column])
+            if count:
+                item[metric] = {
+                    'min': _decimal(groups['min'][g, column]),
+                    'max': _decimal(groups['max'][g, column]),
+                    'mean': _decimal(groups['sum'][g, column] / count),
+                    'count': count,
+                }
+        items.append(item)
+    return items
+
+
+def read_hour_rollups(farm_id, day_start):
+    """Stored hourly rollups of one farm and day, via the farm/resolution index"""
+    kwargs = {
+        'IndexName': ROLLUP_INDEX,
+        'KeyConditionExpression': Key('farm_resolution').eq(f"{farm_id}#hour")
+        & Key('bucket_start').between(day_start, day_start + DAY - 1),
+    }
+    items = []
+    while True:
+        response = rollup_table.query(**kwargs)
+        items.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return items
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def write_items(items):
+    with rollup_table.batch_writer(overwrite_by_pkeys=['series_key', 'bucket_start']) as batch:
+        for item in items:
+            batch.put_item(Item=item)
+
+
+def rollup_farm_day(farm_id, day_start, start, end):
+    """Recompute the hours of [start, end) within one day, then that day's daily rollup"""
+    readings = read_readings(farm_id, start, end)
+    hour_items = to_items(farm_id, 'hour', rollup_raw(farm_id, readings)) if readings else []
+    write_items(hour_items)
+
+    # The index is eventually consistent, so freshly written hours override what it returns
+    stored = {(i['series_key'], int(i['bucket_start'])): i for i in read_hour_rollups(farm_id, day_start)}
+    stored.update({(i['series_key'], i['bucket_start']): i for i in hour_items})
+    day_items = to_items(farm_id, 'day', rollup_hours(list(stored.values()))) if stored else []
+    write_items(day_items)
+
+    return len(readings), len(hour_items), len(day_items)
+
+
+def handler(event, context):
+    """
+    Scheduled (every 15 minutes) or ad-hoc backfill run.
+    Event fields (all optional):
+    - farm_ids: farms to roll up (default: FARM_IDS environment variable)
+    - start / end: Unix epoch window to recompute (default: previous and current hour)
+    Buckets are recomputed from scratch, so reruns and overlapping windows are idempotent.
+    """
+    event = event or {}
+    started = time.perf_counter()
+
+    now = int(time.time())
+    end = int(event.get('end', now))
+    end += -end % HOUR
+    start = int(event.get('start', end - 2 * HOUR))
+    start -= start % HOUR
+    farm_ids = event.get('farm_ids') or default_farm_ids
+
+    totals = {'readings': 0, 'hour_buckets': 0, 'day_buckets': 0}
+    for farm_id in farm_ids:
+        # Work one day at a time to bound memory on long backfills
+        day_start = start - start % DAY
+        while day_start < end:
+            readings, hours, days = rollup_farm_day(
+                farm_id, day_start, max(start, day_start), min(end, day_start + DAY)
+            )
+            totals['readings'] += readings
+            totals['hour_buckets'] += hours
+            totals['day_buckets'] += days
+            day_start += DAY
+
+    summary = {
+        'farm_ids': farm_ids,
+        'start': start,
+        'end': end,
+        **totals,
+        'elapsed_seconds': round(time.perf_counter() - started, 3),
+    }
+    print(json.dumps(summary))
+
+    return {
+        'statusCode': 200,
+        'body': json.dumps(summary)
+    }
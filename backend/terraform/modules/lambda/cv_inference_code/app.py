@@ -0,0 +1,227 @@
+# terraform/modules/lambda/cv_inference_code/app.py
+# Lambda function (container image) for POST /classify: single-image and batch CV inference
+
+import base64
+import binascii
+import json
+import os
+from datetime import datetime, timezone
+
+import boto3
+from botocore.config import Config
+
+from inference import DECODE_WORKERS, DEFAULT_TILING, INFERENCE_BATCH_SIZE, TILED_BY_DEFAULT, classify
+from model import load_model
+from records import image_id, image_timestamp, parse_image_key, result_item, write_results
+from result_cache import content_hash, load_cache
+
+# S3_ENDPOINT_URL / DYNAMODB_ENDPOINT_URL point the function at local stand-ins
+s3 = boto3.client(
+    's3',
+    endpoint_url=os.environ.get('S3_ENDPOINT_URL'),
+    config=Config(max_pool_connections=max(10, DECODE_WORKERS))
+)
+dynamodb = boto3.client('dynamodb', endpoint_url=os.environ.get('DYNAMODB_ENDPOINT_URL'))
+bucket_name = os.environ['S3_BUCKET_IMAGES']
+table_name = os.environ['DYNAMODB_TABLE_CV']
+
+# One batch request must finish inside API Gateway's 30 s integration timeout
+MAX_BATCH_IMAGES = int(os.environ.get('CLASSIFY_MAX_BATCH_IMAGES', 64))
+# A tiled frame is a few dozen model inputs, so far fewer fit
+MAX_TILED_BATCH_IMAGES = int(os.environ.get('CLASSIFY_MAX_TILED_BATCH_IMAGES', 8))
+
+# Loaded once per container; warm invocations reuse it
+model = load_model()
+cache = load_cache(dynamodb, model.version)
+
+
+def response(status_code, body):
+    return {
+        'statusCode': status_code,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*'
+        },
+        'body': json.dumps(body)
+    }
+
+
+def validation_error(message):
+    return response(400, {'error': 'ValidationError', 'message': message})
+
+
+def requested_tiling(body):
+    """Tiling for the request: body 'tiled' overrides INFERENCE_TILED"""
+    return DEFAULT_TILING if body.get('tiled', TILED_BY_DEFAULT) else None
+
+
+def s3_loader(key):
+    def load():
+        return s3.get_object(Bucket=bucket_name, Key=key)['Body'].read()
+    return load
+
+
+def list_prefix(prefix, limit):
+    """Up to limit+1 image keys under prefix (one more than allowed reveals an oversized request)"""
+    keys = []
+    paginator = s3.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+        for obj in page.get('Contents', []):
+            if parse_image_key(obj['Key']):
+                keys.append(obj['Key'])
+                if len(keys) > limit:
+                    return keys
+    return keys
+
+
+def classify_batch(body):
+    """
+    Batch mode: body has farm_id plus either images (S3 keys) or prefix
+    ({farm_id}/{date}/[{category}/[{drone_id}/]]). Every key must sit in the
+    farm's {farm_id}/{date}/{category}/{drone_id}/ layout. Results are
+    batch-written to cv_results; the response reports each image's status.
+    """
+    farm_id = body.get('farm_id')
+    if not farm_id:
+        return validation_error('Missing required field: farm_id')
+    tiling = requested_tiling(body)
+    limit = MAX_TILED_BATCH_IMAGES if tiling else MAX_BATCH_IMAGES
+
+    if 'prefix' in body:
+        prefix = body['prefix']
+        if not isinstance(prefix, str) or not prefix.startswith(f"{farm_id}/"):
+            return validation_error(f'prefix must start with {farm_id}/')
+        keys = list_prefix(prefix, limit)
+    else:
+        keys = body.get('images')
+        if not isinstance(keys, list) or not keys or not all(isinstance(key, str) for key in keys):
+            return validation_error('images must be a non-empty list of S3 keys')
+        # The same key twice would also be a duplicate key inside one BatchWriteItem
+        keys = list(dict.fromkeys(keys))
+
+    if len(keys) > limit:
+        return validation_error(
+            f"At most {limit}{' tiled' if tiling else ''} images per request; submit a flight-level job for more"
+        )
+
+    parsed = {key: parse_image_key(key) for key in keys}
+    invalid = [key for key, fields in parsed.items() if not fields or fields['farm_id'] != farm_id]
+    if invalid:
+        return validation_error(
+            f"Keys must match {farm_id}/{{date}}/{{category}}/{{drone_id}}/{{name}}.jpg: {', '.join(invalid[:5])}"
+        )
+
+    results, stats = classify(model, {key: s3_loader(key) for key in keys}, cache=cache, tiling=tiling)
+
+    items = []
+    statuses = []
+    for key in keys:
+        fields = results[key]
+        key_fields = parsed[key]
+        status = {'key': key, 'image_id': image_id(key_fields)}
+        if 'error' in fields:
+            statuses.append({**status, 'status': 'failed', 'error': fields['error']})
+            continue
+        items.append(result_item(
+            status['image_id'], image_timestamp(key_fields), farm_id, f"s3://{bucket_name}/{key}",
+            fields, model.version, field_zone=body.get('field_zone'), drone_id=key_fields['drone_id']
+        ))
+        statuses.append({**status, 'status': 'classified', **fields})
+
+    write_failures = write_results(dynamodb, table_name, items)
+    for status in statuses:
+        if status['image_id'] in write_failures:
+            status.update(status='failed', error=f"Write failed: {write_failures[status['image_id']]}")
+
+    failed = sum(1 for status in statuses if status['status'] == 'failed')
+    return response(200, {
+        'farm_id': farm_id,
+        'model_version': model.version,
+        'processed': len(statuses) - failed,
+        'failed': failed,
+        'stats': stats,
+        'results': statuses
+    })
+
+
+def classify_single(body):
+    """
+    Single mode: base64 image -> stored as {farm_id}/{date}/{classification}/{drone_id}/{HHMMSS}_{hash}.jpg
+    and classified; the same image sent again in the same second maps to the same key and result
+    """
+    farm_id = body.get('farm_id')
+    if not body.get('image') or not farm_id:
+        return validation_error('Missing required fields: image, farm_id')
+    try:
+        data = base64.b64decode(body['image'], validate=True)
+    except (binascii.Error, ValueError):
+        return validation_error('image must be base64-encoded')
+
+    tiling = requested_tiling(body)
+    results, stats = classify(
+        model, {'image': lambda: data}, batch_size=INFERENCE_BATCH_SIZE if tiling else 1, workers=1,
+        cache=cache, tiling=tiling
+    )
+    fields = results['image']
+    if 'error' in fields:
+        return validation_error(f"Could not decode image: {fields['error']}")
+
+    now = datetime.now(timezone.utc)
+    # HHMMSS keeps the capture time in the name; the content suffix keeps two uploads in one second apart
+    name = f"{now:%H%M%S}_{content_hash(data)[:12]}"
+    key = f"{farm_id}/{now:%Y-%m-%d}/{fields['classification']}/{body.get('drone_id') or 'manual'}/{name}.jpg"
+    s3.put_object(Bucket=bucket_name, Key=key, Body=data, ContentType='image/jpeg')
+
+    key_fields = parse_image_key(key)
+    item = result_item(
+        image_id(key_fields), image_timestamp(key_fields), farm_id, f"s3://{bucket_name}/{key}",
+        fields, model.version, field_zone=body.get('field_zone'), drone_id=body.get('drone_id')
+    )
+    write_failures = write_results(dynamodb, table_name, [item])
+    if write_failures:
+        raise RuntimeError(next(iter(write_failures.values())))
+
+    return response(200, {
+        'image_id': item['image_id']['S'],
+        'timestamp': int(item['timestamp']['N']),
+        'farm_id': farm_id,
+        'field_zone': body.get('field_zone'),
+        's3_uri': item['s3_uri']['S'],
+        'model_version': model.version,
+        **fields
+    })
+
+
+def handler(event, context):
+    """
+    Lambda handler for POST /classify
+    Body (JSON), one of:
+    - image (base64) + farm_id [+ field_zone, drone_id]: classify one image
+    - farm_id + images (list of S3 keys) or prefix [+ field_zone]: classify up to
+      CLASSIFY_MAX_BATCH_IMAGES stored images in micro-batches
+    Either mode takes tiled (bool, default INFERENCE_TILED): classify overlapping
+    TILE_SIZE crops of the full-resolution frame and merge them, reporting every
+    region found instead of one box (batch mode then takes up to
+    CLASSIFY_MAX_TILED_BATCH_IMAGES images).
+    Each result reports cache 'hit' or 'miss' when the classification cache is configured.
+    """
+    try:
+        raw = event.get('body') or '{}'
+        if event.get('isBase64Encoded'):
+            raw = base64.b64decode(raw)
+        try:
+            body = json.loads(raw)
+        except ValueError:
+            return validation_error('Request body must be JSON')
+        if not isinstance(body, dict):
+            return validation_error('Request body must be a JSON object')
+        if not isinstance(body.get('tiled', False), bool):
+            return validation_error('tiled must be true or false')
+
+        if 'images' in body or 'prefix' in body:
+            return classify_batch(body)
+        return classify_single(body)
+
+    except Exception as e:
+        print(f"Error classifying images: {str(e)}")
+        return response(500, {'error': 'InternalServerError', 'message': str(e)})
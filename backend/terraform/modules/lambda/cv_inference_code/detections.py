@@ -0,0 +1,84 @@
+# terraform/modules/lambda/cv_inference_code/detections.py
+# Detection post-processing: box conversion, non-maximum suppression, coverage
+#
+# Detections are float32 arrays of shape [K, 6]: x1, y1, x2, y2, score, class index.
+
+import numpy as np
+
+EMPTY = np.zeros((0, 6), dtype=np.float32)
+
+
+def xywh_to_xyxy(boxes):
+    """Centre/size boxes (YOLO output) to corner boxes"""
+    xyxy = np.empty_like(boxes)
+    half_w = boxes[:, 2] / 2
+    half_h = boxes[:, 3] / 2
+    xyxy[:, 0] = boxes[:, 0] - half_w
+    xyxy[:, 1] = boxes[:, 1] - half_h
+    xyxy[:, 2] = boxes[:, 0] + half_w
+    xyxy[:, 3] = boxes[:, 1] + half_h
+    return xyxy
+
+
+def nms(detections, iou_threshold):
+    """Greedy per-class non-maximum suppression; returns the kept detections, highest score first"""
+    if len(detections) == 0:
+        return EMPTY
+    # Offset each class into its own coordinate range so one pass never suppresses across classes
+    offset = detections[:, 5:6] * (detections[:, :4].max() + 1)
+    boxes = detections[:, :4] + offset
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    order = np.argsort(-detections[:, 4], kind='stable')
+
+    keep = []
+    while order.size:
+        best = order[0]
+        keep.append(best)
+        rest = order[1:]
+        xx1 = np.maximum(boxes[best, 0], boxes[rest, 0])
+        yy1 = np.maximum(boxes[best, 1], boxes[rest, 1])
+        xx2 = np.minimum(boxes[best, 2], boxes[rest, 2])
+        yy2 = np.minimum(boxes[best, 3], boxes[rest, 3])
+        intersection = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+        iou = intersection / (areas[best] + areas[rest] - intersection + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return detections[keep]
+
+
+def scale(detections, scale_x, scale_y):
+    """Detections in model-input pixels to frame pixels"""
+    scaled = detections.copy()
+    scaled[:, [0, 2]] *= scale_x
+    scaled[:, [1, 3]] *= scale_y
+    return scaled
+
+
+def to_frame(detections, tile_box, input_size):
+    """Detections in a tile's model-input pixels to frame pixels, given the tile's x1, y1, x2, y2 in the frame"""
+    x1, y1, x2, y2 = tile_box
+    placed = scale(detections, (x2 - x1) / input_size, (y2 - y1) / input_size)
+    placed[:, [0, 2]] += x1
+    placed[:, [1, 3]] += y1
+    return placed
+
+
+def enclosing_box(detections):
+    """Smallest box around all detections as {x, y, width, height} in whole pixels"""
+    x1, y1 = detections[:, 0].min(), detections[:, 1].min()
+    x2, y2 = detections[:, 2].max(), detections[:, 3].max()
+    return {'x': int(x1), 'y': int(y1), 'width': int(round(x2 - x1)), 'height': int(round(y2 - y1))}
+
+
+def coverage_percentage(detections, width, height, grid=256):
+    """
+    Percentage of the frame covered by the union of the boxes, rasterized on a
+    grid x grid mask so overlapping boxes are not counted twice
+    """
+    if len(detections) == 0:
+        return 0.0
+    mask = np.zeros((grid, grid), dtype=bool)
+    cols = np.clip(np.round(detections[:, [0, 2]] / width * grid), 0, grid).astype(int)
+    rows = np.clip(np.round(detections[:, [1, 3]] / height * grid), 0, grid).astype(int)
+    for (c1, c2), (r1, r2) in zip(cols, rows):
+        mask[r1:r2, c1:c2] = True
+    return float(mask.mean() * 100)
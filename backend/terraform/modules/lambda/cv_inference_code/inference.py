@@ -0,0 +1,231 @@
+# terraform/modules/lambda/cv_inference_code/inference.py
+# Micro-batched CPU inference over many images, with per-image status
+#
+# Fetch + decode runs on a thread pool (S3 reads and Pillow's decoder release
+# the GIL) while the calling thread runs the model on micro-batches as they
+# fill, so I/O for the next batch overlaps inference on the current one.
+# Workers return uint8 pixels; the calling thread normalizes each micro-batch
+# in place into a float32 buffer that lives as long as the thread (warm
+# invocations reuse it), so no per-image float tensors or per-batch np.stack
+# copies are made.
+# With a result cache, fetched bytes are hashed first and a hit skips both
+# decode and inference.
+#
+# Whole-frame mode squeezes the frame into one model input, which shrinks a
+# lesion a few dozen pixels wide below what the model can see. Tiled mode
+# cuts the frame into overlapping TILE_SIZE crops instead; the crops of all
+# images share the micro-batches, and each frame's detections are mapped back
+# to frame pixels and merged with NMS across tiles.
+
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from detections import EMPTY, coverage_percentage, enclosing_box, nms, scale, to_frame
+from model import MODEL_CLASSES, NMS_IOU_THRESHOLD
+from preprocess import normalize_into, prepare, prepare_tiles
+from result_cache import content_hash
+
+CONFIDENCE_THRESHOLD = float(os.environ.get('MODEL_CONFIDENCE_THRESHOLD', 0.70))
+INFERENCE_BATCH_SIZE = int(os.environ.get('INFERENCE_BATCH_SIZE', 16))
+DECODE_WORKERS = int(os.environ.get('DECODE_WORKERS', 8))
+
+# Tiled mode: tile edge in frame pixels, and the share of a tile that neighbouring tiles overlap
+Tiling = namedtuple('Tiling', 'size overlap')
+DEFAULT_TILING = Tiling(int(os.environ.get('TILE_SIZE', 640)), float(os.environ.get('TILE_OVERLAP', 0.2)))
+TILED_BY_DEFAULT = os.environ.get('INFERENCE_TILED', 'false').lower() == 'true'
+
+# Coverage mask resolution; tiled detections can be a few frame pixels wide
+COVERAGE_GRID = 256
+TILED_COVERAGE_GRID = 1024
+# Regions kept per image (highest confidence first)
+MAX_REGIONS = 50
+
+# One batch buffer per thread: concurrent classify() calls (job runner threads) must not share it
+_buffers = threading.local()
+
+
+def batch_buffer(batch_size, input_size):
+    """This thread's float32 [batch_size, 3, input_size, input_size] buffer, reallocated only when it does not fit"""
+    buffer = getattr(_buffers, 'batch', None)
+    if buffer is None or buffer.shape[0] < batch_size or buffer.shape[2] != input_size:
+        buffer = _buffers.batch = np.empty((batch_size, 3, input_size, input_size), dtype=np.float32)
+    return buffer
+
+
+def region_list(detections):
+    return [
+        {
+            'x': int(x1), 'y': int(y1), 'width': int(round(x2 - x1)), 'height': int(round(y2 - y1)),
+            'classification': MODEL_CLASSES[int(class_index)],
+            'confidence': round(float(score), 4),
+        }
+        for x1, y1, x2, y2, score, class_index in detections[:MAX_REGIONS]
+    ]
+
+
+def summarize(detections, width, height, grid=COVERAGE_GRID):
+    """
+    Classification fields for one image from its candidate detections in
+    frame pixels: the top class above CONFIDENCE_THRESHOLD, the box around
+    that class's detections and the share of the frame their union covers,
+    plus every region above the threshold; 'healthy' when nothing clears it
+    """
+    positives = detections[detections[:, 4] >= CONFIDENCE_THRESHOLD]
+    if not len(positives):
+        top_score = float(detections[:, 4].max()) if len(detections) else 0.0
+        return {
+            'classification': 'healthy',
+            'confidence': round(1.0 - top_score, 4),
+            'bbox_coords': {'x': 0, 'y': 0, 'width': width, 'height': height},
+            'affected_area_percentage': 0.0,
+            'detections': 0,
+            'regions': [],
+        }
+
+    top_class = int(positives[0, 5])
+    regions = positives[positives[:, 5] == top_class]
+    return {
+        'classification': MODEL_CLASSES[top_class],
+        'confidence': round(float(positives[0, 4]), 4),
+        'bbox_coords': enclosing_box(regions),
+        'affected_area_percentage': round(coverage_percentage(regions, width, height, grid), 1),
+        'detections': int(len(regions)),
+        'regions': region_list(positives),
+    }
+
+
+def interpret(candidates, width, height, input_size):
+    """Classification fields from whole-frame candidates in model-input pixels"""
+    return summarize(scale(candidates, width / input_size, height / input_size), width, height)
+
+
+def merge_tiles(tile_candidates, tile_boxes, width, height, input_size):
+    """Classification fields from per-tile candidates: mapped to frame pixels, then NMS across tiles"""
+    placed = [
+        to_frame(candidates, box, input_size)
+        for candidates, box in zip(tile_candidates, tile_boxes) if len(candidates)
+    ]
+    merged = nms(np.concatenate(placed), NMS_IOU_THRESHOLD) if placed else EMPTY
+    return summarize(merged, width, height, TILED_COVERAGE_GRID)
+
+
+def settings_signature(tiling):
+    """Inference settings a result depends on besides the model version (for the result cache)"""
+    signature = f"threshold={CONFIDENCE_THRESHOLD}"
+    if tiling:
+        signature += f",tile={tiling.size},overlap={tiling.overlap}"
+    return signature
+
+
+def classify(model, loaders, batch_size=INFERENCE_BATCH_SIZE, workers=DECODE_WORKERS, cache=None, tiling=None):
+    """
+    Classify images given as {name: fn() -> encoded bytes}, whole-frame or,
+    with a Tiling, tile by tile. Returns ({name: fields or {'error': message}},
+    stats); stats has images, failed, batches, inference_seconds and
+    images_per_second (and tiles in tiled mode).
+    With a ResultCache, fields also carry cache ('hit' or 'miss'), stats
+    carry cache_hits, and fresh results are stored for the next request.
+    """
+    names = list(loaders)
+    settings = settings_signature(tiling)
+    results = {}
+    digests = {}
+    cached = {}
+    frames = {}
+    buffer = batch_buffer(batch_size, model.input_size)
+    batches = 0
+    tiles = 0
+    inference_seconds = 0.0
+    started = time.perf_counter()
+
+    def load(name):
+        try:
+            data = loaders[name]()
+            if cache is not None:
+                digests[name] = content_hash(data)
+                hit = cache.get(digests[name], settings)
+                if hit is not None:
+                    return name, None, hit, None
+            if tiling:
+                return name, prepare_tiles(data, model.input_size, tiling.size, tiling.overlap), None, None
+            pixels, width, height = prepare(data, model.input_size)
+            return name, (pixels[None], None, width, height), None, None
+        except Exception as e:
+            return name, None, None, f"{type(e).__name__}: {str(e)}"
+
+    def finish(name):
+        frame = frames.pop(name)
+        if frame['boxes'] is None:
+            results[name] = interpret(frame['candidates'][0], frame['width'], frame['height'], model.input_size)
+        else:
+            results[name] = merge_tiles(
+                frame['candidates'], frame['boxes'], frame['width'], frame['height'], model.input_size
+            )
+
+    def run(pending):
+        nonlocal batches, inference_seconds
+        batch = buffer[:len(pending)]
+        for slot, (_, _, pixels) in zip(batch, pending):
+            normalize_into(pixels, slot)
+        batch_started = time.perf_counter()
+        candidates = model.predict(batch)
+        inference_seconds += time.perf_counter() - batch_started
+        batches += 1
+        for (name, index, _), tile_candidates in zip(pending, candidates):
+            frame = frames[name]
+            frame['candidates'][index] = tile_candidates
+            frame['remaining'] -= 1
+            if not frame['remaining']:
+                finish(name)
+
+    pending = []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(names)))) as pool:
+        for name, prepared, hit, error in pool.map(load, names):
+            if error:
+                results[name] = {'error': error}
+                continue
+            if hit is not None:
+                cached[name] = results[name] = hit
+                continue
+            pixels, boxes, width, height = prepared
+            frames[name] = {
+                'boxes': boxes, 'width': width, 'height': height,
+                'candidates': [None] * len(pixels), 'remaining': len(pixels),
+            }
+            tiles += len(pixels)
+            pending.extend((name, index, tile_pixels) for index, tile_pixels in enumerate(pixels))
+            while len(pending) >= batch_size:
+                run(pending[:batch_size])
+                pending = pending[batch_size:]
+        if pending:
+            run(pending)
+
+    if cache is not None:
+        # One entry per distinct content; duplicates within the request share it
+        cache.put_many({
+            digests[name]: fields for name, fields in results.items()
+            if name not in cached and 'error' not in fields
+        }, settings)
+        for name, fields in results.items():
+            if 'error' not in fields:
+                results[name] = {**fields, 'cache': 'hit' if name in cached else 'miss'}
+
+    elapsed = time.perf_counter() - started
+    failed = sum(1 for fields in results.values() if 'error' in fields)
+    stats = {
+        'images': len(names),
+        'failed': failed,
+        'batches': batches,
+        'inference_seconds': round(inference_seconds, 3),
+        'images_per_second': round((len(names) - failed) / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+    if tiling:
+        stats['tiles'] = tiles
+    if cache is not None:
+        stats['cache_hits'] = len(cached)
+    return {name: results[name] for name in names}, stats
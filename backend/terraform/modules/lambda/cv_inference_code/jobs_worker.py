@@ -0,0 +1,204 @@
+# terraform/modules/lambda/cv_inference_code/jobs_worker.py
+# Queue consumer for flight classification jobs (see query_lambda_code/jobs_api.py)
+#
+# Each message is one chunk of a job run: {job_id, run, chunk, farm_id, keys}.
+# Images this model version already classified are skipped, the rest are
+# classified and written to cv_results, then the chunk is checkpointed on the
+# job with a conditional update, so a redelivered message neither writes
+# twice nor counts twice.
+
+import json
+import os
+import time
+
+import boto3
+from botocore.exceptions import ClientError
+
+from inference import DEFAULT_TILING, TILED_BY_DEFAULT, classify
+from model import load_model
+from records import image_id, image_timestamp, parse_image_key, result_item, write_results
+from result_cache import load_cache
+
+s3 = boto3.client('s3', endpoint_url=os.environ.get('S3_ENDPOINT_URL'))
+dynamodb = boto3.client('dynamodb', endpoint_url=os.environ.get('DYNAMODB_ENDPOINT_URL'))
+bucket_name = os.environ['S3_BUCKET_IMAGES']
+table_name = os.environ['DYNAMODB_TABLE_CV']
+jobs_table_name = os.environ['DYNAMODB_TABLE_JOBS']
+
+# Deliveries after which a chunk that keeps failing is checkpointed as failed
+# instead of retried (keep below the queue's maxReceiveCount)
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+
+model = load_model()
+cache = load_cache(dynamodb, model.version)
+
+
+def load_job(job_id):
+    response = dynamodb.get_item(TableName=jobs_table_name, Key={'job_id': {'S': job_id}}, ConsistentRead=True)
+    return response.get('Item')
+
+
+def is_current(job, message):
+    """The message belongs to the job's current, unfailed run and its chunk is not checkpointed yet"""
+    if job is None or int(job['run']['N']) != int(message['run']) or job['status']['S'] == 'failed':
+        return False
+    return message['chunk'] not in job.get('done_chunks', {}).get('SS', [])
+
+
+def mark_running(job_id, run):
+    """Record when workers first picked the run up; later chunks leave started_at alone"""
+    try:
+        dynamodb.update_item(
+            TableName=jobs_table_name,
+            Key={'job_id': {'S': job_id}},
+            UpdateExpression='SET started_at = if_not_exists(started_at, :now), #status = :running',
+            ConditionExpression='#run = :run AND #status IN (:queued, :running)',
+            ExpressionAttributeNames={'#status': 'status', '#run': 'run'},
+            ExpressionAttributeValues={
+                ':now': {'N': str(int(time.time()))},
+                ':run': {'N': str(run)},
+                ':queued': {'S': 'queued'},
+                ':running': {'S': 'running'},
+            }
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+
+
+def already_classified(keys):
+    """Keys whose cv_results item already carries this model version"""
+    parsed = {key: parse_image_key(key) for key in keys}
+    wanted = {
+        (image_id(fields), str(image_timestamp(fields))): key
+        for key, fields in parsed.items() if fields
+    }
+    done = set()
+    pending = [
+        {'image_id': {'S': image}, 'timestamp': {'N': timestamp}} for image, timestamp in wanted
+    ]
+    for offset in range(0, len(pending), 100):
+        request = {table_name: {
+            'Keys': pending[offset:offset + 100],
+            'ProjectionExpression': 'image_id, #ts, model_version',
+            'ExpressionAttributeNames': {'#ts': 'timestamp'},
+        }}
+        while request:
+            response = dynamodb.batch_get_item(RequestItems=request)
+            for item in response['Responses'].get(table_name, []):
+                if item.get('model_version', {}).get('S') == model.version:
+                    done.add(wanted[(item['image_id']['S'], item['timestamp']['N'])])
+            request = response.get('UnprocessedKeys') or None
+    return done
+
+
+def classify_chunk(farm_id, keys):
+    """(completed, failed, skipped) for one chunk after classifying and writing its results"""
+    skipped = already_classified(keys)
+    todo = [key for key in keys if key not in skipped and parse_image_key(key)]
+    failed = len(keys) - len(skipped) - len(todo)
+
+    loaders = {
+        key: (lambda key=key: s3.get_object(Bucket=bucket_name, Key=key)['Body'].read()) for key in todo
+    }
+    tiling = DEFAULT_TILING if TILED_BY_DEFAULT else None
+    results, stats = classify(model, loaders, cache=cache, tiling=tiling) if todo else ({}, None)
+    items = []
+    for key in todo:
+        fields = results[key]
+        if 'error' in fields:
+            print(f"Failed to classify {key}: {fields['error']}")
+            failed += 1
+            continue
+        parsed = parse_image_key(key)
+        items.append(result_item(
+            image_id(parsed), image_timestamp(parsed), farm_id, f"s3://{bucket_name}/{key}",
+            fields, model.version, drone_id=parsed['drone_id']
+        ))
+
+    write_failures = write_results(dynamodb, table_name, items)
+    failed += len(write_failures)
+    if stats:
+        print(f"Chunk of {len(keys)}: {stats['images_per_second']} images/s, {len(skipped)} skipped, "
+              f"{stats.get('cache_hits', 0)} cache hits")
+    return len(items) - len(write_failures), failed, len(skipped)
+
+
+def checkpoint(message, completed, failed, skipped):
+    """
+    Add the chunk's counts to the job exactly once (the condition rejects a
+    chunk already in done_chunks) and close the run after its last chunk.
+    Returns the updated job, or None when the chunk had already been counted.
+    """
+    now = {'N': str(int(time.time()))}
+    try:
+        job = dynamodb.update_item(
+            TableName=jobs_table_name,
+            Key={'job_id': {'S': message['job_id']}},
+            UpdateExpression=(
+                'ADD completed :completed, failed :failed, skipped :skipped, '
+                'chunks_done :one, done_chunks :chunk SET updated_at = :now'
+            ),
+            ConditionExpression='#run = :run AND NOT contains(done_chunks, :chunk_id)',
+            ExpressionAttributeNames={'#run': 'run'},
+            ExpressionAttributeValues={
+                ':completed': {'N': str(completed)},
+                ':failed': {'N': str(failed)},
+                ':skipped': {'N': str(skipped)},
+                ':one': {'N': '1'},
+                ':chunk': {'SS': [message['chunk']]},
+                ':chunk_id': {'S': message['chunk']},
+                ':run': {'N': str(message['run'])},
+                ':now': now,
+            },
+            ReturnValues='ALL_NEW'
+        )['Attributes']
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return None
+        raise
+
+    if int(job['chunks_done']['N']) >= int(job['chunks_total']['N']):
+        final = 'completed_with_errors' if int(job['failed']['N']) else 'completed'
+        dynamodb.update_item(
+            TableName=jobs_table_name,
+            Key={'job_id': {'S': message['job_id']}},
+            UpdateExpression='SET #status = :final, finished_at = :now',
+            ConditionExpression='#run = :run',
+            ExpressionAttributeNames={'#status': 'status', '#run': 'run'},
+            ExpressionAttributeValues={':final': {'S': final}, ':now': now, ':run': {'N': str(message['run'])}}
+        )
+    return job
+
+
+def process_message(message, receive_count=1):
+    """Classify and checkpoint one chunk; stale or already-counted chunks are acknowledged untouched"""
+    if not is_current(load_job(message['job_id']), message):
+        print(f"Skipping chunk {message['chunk']} of {message['job_id']} run {message['run']}: stale or done")
+        return
+    mark_running(message['job_id'], message['run'])
+    try:
+        completed, failed, skipped = classify_chunk(message['farm_id'], message['keys'])
+    except Exception as e:
+        if receive_count < JOB_MAX_ATTEMPTS:
+            raise
+        # Out of retries: count the chunk as failed so the job still finishes
+        print(f"Giving up on chunk {message['chunk']} of {message['job_id']}: {str(e)}")
+        completed, failed, skipped = 0, len(message['keys']), 0
+    checkpoint(message, completed, failed, skipped)
+
+
+def handler(event, context):
+    """
+    Lambda handler for the jobs SQS queue. Failed messages are reported
+    individually (ReportBatchItemFailures) so only they are redelivered.
+    """
+    failures = []
+    for record in event.get('Records', []):
+        try:
+            receive_count = int(record.get('attributes', {}).get('ApproximateReceiveCount', 1))
+            process_message(json.loads(record['body']), receive_count)
+        except Exception as e:
+            print(f"Error processing job chunk {record.get('messageId')}: {str(e)}")
+            failures.append({'itemIdentifier': record['messageId']})
+    return {'batchItemFailures': failures}
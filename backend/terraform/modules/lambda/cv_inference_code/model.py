@@ -0,0 +1,123 @@
+# terraform/modules/lambda/cv_inference_code/model.py
+# Model loading: the packaged YOLOv8 ONNX export, or a small NumPy test model
+# when one is asked for (MODEL_PATH=test, or ALLOW_TEST_MODEL=1 for local runs
+# and benchmarks). Otherwise a missing model fails the import, so a function
+# deployed without its model errors instead of serving test detections.
+#
+# Both take a float32 batch [N, 3, S, S] scaled to 0-1 and return, per image,
+# candidate detections [K, 6] (x1, y1, x2, y2, score, class index) in input
+# pixels after NMS. Thresholding against MODEL_CONFIDENCE_THRESHOLD happens
+# in inference.py so both models are judged the same way.
+
+import os
+
+import numpy as np
+
+from detections import EMPTY, nms, xywh_to_xyxy
+
+try:
+    import onnxruntime
+except ImportError:  # Not needed for the test model
+    onnxruntime = None
+
+TEST_MODEL_PATH = 'test'
+MODEL_PATH = os.environ.get('MODEL_PATH', '/opt/ml/model/yolov8n.onnx')
+# Fall back to the test model when MODEL_PATH cannot be loaded (never set on the deployed functions)
+ALLOW_TEST_MODEL = os.environ.get('ALLOW_TEST_MODEL', '').lower() in ('1', 'true', 'yes')
+MODEL_VERSION = os.environ.get('MODEL_VERSION', 'yolov8-nano-v1.0')
+# Detection classes in model output order; healthy is "nothing detected"
+MODEL_CLASSES = tuple(os.environ.get('MODEL_CLASSES', 'diseased,pest,weed').split(','))
+
+# Candidates below this never reach thresholding; keeps NMS cheap
+CANDIDATE_SCORE_FLOOR = 0.05
+NMS_IOU_THRESHOLD = float(os.environ.get('NMS_IOU_THRESHOLD', 0.45))
+
+
+class OnnxModel:
+    """YOLOv8 detection export (output [N, 4 + classes, anchors]) run with ONNX Runtime on CPU"""
+
+    def __init__(self, path, threads=None):
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.input_size = int(model_input.shape[-1]) if isinstance(model_input.shape[-1], int) else 640
+        self.version = MODEL_VERSION
+
+    def predict(self, batch):
+        output = self.session.run(None, {self.input_name: batch})[0]
+        results = []
+        for anchors in output.transpose(0, 2, 1):
+            class_scores = anchors[:, 4:]
+            classes = class_scores.argmax(axis=1)
+            scores = class_scores[np.arange(len(classes)), classes]
+            keep = scores >= CANDIDATE_SCORE_FLOOR
+            if not keep.any():
+                results.append(EMPTY)
+                continue
+            candidates = np.concatenate([
+                xywh_to_xyxy(anchors[keep, :4]),
+                scores[keep, None],
+                classes[keep, None].astype(np.float32),
+            ], axis=1).astype(np.float32)
+            results.append(nms(candidates, NMS_IOU_THRESHOLD))
+        return results
+
+
+class TestModel:
+    """
+    Deterministic stand-in for local runs and benchmarks: flags grid cells
+    whose pixels are mostly brown/yellow rather than green as 'diseased'
+    (class 0). Costs a few vectorized passes over every pixel, so throughput
+    numbers still reflect the decode/resize/batch pipeline around it.
+    """
+
+    GRID = 16
+
+    def __init__(self, input_size=320):
+        self.input_size = input_size - input_size % self.GRID
+        self.version = f"{MODEL_VERSION}-test"
+
+    def predict(self, batch):
+        n, _, size, _ = batch.shape
+        red, green, blue = batch[:, 0], batch[:, 1], batch[:, 2]
+        lesion = (red > green) & (red > blue) & (red > 0.25)
+        cell = size // self.GRID
+        fraction = lesion.reshape(n, self.GRID, cell, self.GRID, cell).mean(axis=(2, 4))
+
+        results = []
+        for image_fraction in fraction:
+            rows, cols = np.nonzero(image_fraction >= CANDIDATE_SCORE_FLOOR)
+            if not len(rows):
+                results.append(EMPTY)
+                continue
+            scores = np.clip(image_fraction[rows, cols] * 1.25, 0, 1)
+            candidates = np.stack([
+                cols * cell, rows * cell, (cols + 1) * cell, (rows + 1) * cell,
+                scores, np.zeros_like(scores)
+            ], axis=1).astype(np.float32)
+            results.append(nms(candidates, NMS_IOU_THRESHOLD))
+        return results
+
+
+def load_model(path=MODEL_PATH, threads=None, allow_test_model=None):
+    """
+    The ONNX model at path, or the test model when path is 'test'. Raises
+    RuntimeError when the model cannot be loaded, unless the test model is
+    allowed as a fallback (allow_test_model, default ALLOW_TEST_MODEL).
+    """
+    if path == TEST_MODEL_PATH:
+        return TestModel()
+    if onnxruntime is not None and path and os.path.exists(path):
+        return OnnxModel(path, threads)
+
+    reason = 'onnxruntime is not installed' if onnxruntime is None else 'file not found'
+    if ALLOW_TEST_MODEL if allow_test_model is None else allow_test_model:
+        print(f"Model {path} unavailable ({reason}); using TestModel")
+        return TestModel()
+    raise RuntimeError(
+        f"Model {path} cannot be loaded ({reason}); "
+        f"set MODEL_PATH={TEST_MODEL_PATH} or ALLOW_TEST_MODEL=1 to run the test model"
+    )
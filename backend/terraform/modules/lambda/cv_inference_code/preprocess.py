@@ -0,0 +1,82 @@
+# terraform/modules/lambda/cv_inference_code/preprocess.py
+# Image decode and resize to model-input pixels, whole-frame or tiled
+#
+# JPEGs are decoded in draft mode: libjpeg's DCT scaling decodes at 1/2,
+# 1/4 or 1/8 resolution whenever that still covers the pixels the model
+# will see, which cuts decode time and the decoded frame's memory by up to
+# 64x. Workers hand back uint8 HWC pixels (a quarter the size of float32);
+# normalize_into() converts them straight into the caller's preallocated
+# float32 batch buffer in one pass, with no per-image float arrays.
+
+import io
+import math
+
+import numpy as np
+from PIL import Image
+
+SCALE = np.float32(1.0 / 255.0)
+
+
+def decode(data, target=None):
+    """
+    Encoded JPEG/PNG bytes to (RGB PIL image, frame width, frame height).
+    With target (width, height), a JPEG is decoded at the smallest DCT scale
+    whose output still covers target; the frame size is the original one.
+    """
+    # BytesIO over bytes shares the buffer until written to, so this does not copy the blob
+    image = Image.open(io.BytesIO(data))
+    width, height = image.size
+    if target:
+        image.draft('RGB', target)
+    image = image.convert('RGB') if image.mode != 'RGB' else image
+    return image, width, height
+
+
+def to_pixels(image, size, box=None):
+    """uint8 [size, size, 3] pixels of the image (or of box within it), stretched, not letterboxed"""
+    return np.asarray(image.resize((size, size), Image.BILINEAR, box=box))
+
+
+def normalize_into(pixels, out):
+    """uint8 [size, size, 3] pixels -> float32 [3, size, size] scaled to 0-1, written into out"""
+    np.multiply(pixels.transpose(2, 0, 1), SCALE, out=out)
+
+
+def prepare(data, size):
+    """(uint8 model-input pixels, frame width, frame height) for one encoded image"""
+    image, width, height = decode(data, (size, size))
+    return to_pixels(image, size), width, height
+
+
+def tile_origins(length, tile, overlap):
+    """Start offsets of tiles covering 0..length, adjacent tiles sharing overlap (0-1) of a tile"""
+    if length <= tile:
+        return [0]
+    stride = max(1, int(tile * (1 - overlap)))
+    origins = list(range(0, length - tile, stride))
+    return origins + [length - tile]
+
+
+def prepare_tiles(data, size, tile, overlap):
+    """
+    (uint8 pixels [T, size, size, 3], tile boxes [T, 4] as x1, y1, x2, y2 in
+    frame pixels, frame width, frame height) for one encoded image cut into
+    overlapping tile x tile crops; frames smaller than a tile give one crop.
+    Tiles larger than the model input let the decode run at reduced scale.
+    """
+    with Image.open(io.BytesIO(data)) as probe:
+        width, height = probe.size
+    ratio = size / tile
+    image, _, _ = decode(data, (math.ceil(width * ratio), math.ceil(height * ratio)))
+    scale_x, scale_y = image.width / width, image.height / height
+
+    boxes = [
+        (x, y, min(x + tile, width), min(y + tile, height))
+        for y in tile_origins(height, tile, overlap)
+        for x in tile_origins(width, tile, overlap)
+    ]
+    pixels = np.stack([
+        to_pixels(image, size, box=(x1 * scale_x, y1 * scale_y, x2 * scale_x, y2 * scale_y))
+        for x1, y1, x2, y2 in boxes
+    ])
+    return pixels, np.array(boxes, dtype=np.float32), width, height
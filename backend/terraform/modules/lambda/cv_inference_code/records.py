@@ -0,0 +1,118 @@
+# terraform/modules/lambda/cv_inference_code/records.py
+# Image keys -> cv_results items, and batched writes to the cv_results table
+
+import random
+import re
+import time
+from datetime import datetime, timezone
+
+from botocore.exceptions import ClientError
+
+BATCH_WRITE_SIZE = 25
+MAX_BATCH_ATTEMPTS = 8
+THROTTLE_ERRORS = ('ProvisionedThroughputExceededException', 'ThrottlingException', 'RequestLimitExceeded')
+
+# {farm_id}/{YYYY-MM-DD}/{category}/{drone_id}/{name}.jpg (category is the upload folder, not a label)
+IMAGE_KEY = re.compile(
+    r'^(?P<farm_id>[^/]+)/(?P<date>\d{4}-\d{2}-\d{2})/(?P<category>[^/]+)/(?P<drone_id>[^/]+)/(?P<name>[^/]+)\.(?:jpe?g|png)$',
+    re.IGNORECASE
+)
+# HHMMSS file name, optionally followed by _<suffix>
+CAPTURE_TIME = re.compile(r'^(\d{2})(\d{2})(\d{2})(?:_|$)')
+
+
+def parse_image_key(key):
+    """Key fields of a drone image, or None when the key is not in the images layout"""
+    match = IMAGE_KEY.match(key)
+    return match.groupdict() if match else None
+
+
+def image_timestamp(parsed):
+    """
+    Capture time from the date folder and a file name that is, or starts with,
+    HHMMSS (HHMMSS_<suffix>, as single-mode uploads are named); midnight when
+    the name carries no time
+    """
+    day = datetime.strptime(parsed['date'], '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    match = CAPTURE_TIME.match(parsed['name'])
+    if match:
+        hours, minutes, seconds = (int(part) for part in match.groups())
+        if hours < 24 and minutes < 60 and seconds < 60:
+            return int(day.timestamp()) + hours * 3600 + minutes * 60 + seconds
+    return int(day.timestamp())
+
+
+def image_id(parsed):
+    """
+    Stable id derived from the key, so classifying the same image again
+    overwrites its result instead of adding one
+    """
+    return f"img_{parsed['date'].replace('-', '')}_{parsed['name']}_{parsed['drone_id']}"
+
+
+def _number(value):
+    return {'N': str(value)}
+
+
+def result_item(image_id_value, timestamp, farm_id, s3_uri, fields, model_version,
+                field_zone=None, drone_id=None, processed_by='cv_inference_lambda'):
+    """cv_results item in DynamoDB wire format"""
+    bbox = fields['bbox_coords']
+    item = {
+        'image_id': {'S': image_id_value},
+        'timestamp': _number(timestamp),
+        'farm_id': {'S': farm_id},
+        's3_uri': {'S': s3_uri},
+        'classification': {'S': fields['classification']},
+        'confidence': _number(fields['confidence']),
+        'bbox_coords': {'M': {name: _number(bbox[name]) for name in ('x', 'y', 'width', 'height')}},
+        'affected_area_percentage': _number(fields['affected_area_percentage']),
+        'model_version': {'S': model_version},
+        'processed_by': {'S': processed_by},
+    }
+    if field_zone:
+        item['field_zone'] = {'S': field_zone}
+    if drone_id:
+        item['drone_id'] = {'S': drone_id}
+    if fields.get('regions'):
+        item['regions'] = {'L': [
+            {'M': {
+                **{name: _number(region[name]) for name in ('x', 'y', 'width', 'height', 'confidence')},
+                'classification': {'S': region['classification']},
+            }}
+            for region in fields['regions']
+        ]}
+    return item
+
+
+def write_batch(client, table_name, requests):
+    """Write up to 25 put requests, retrying UnprocessedItems and throttling with jittered backoff"""
+    pending = requests
+    for attempt in range(MAX_BATCH_ATTEMPTS):
+        try:
+            response = client.batch_write_item(RequestItems={table_name: pending})
+            pending = response.get('UnprocessedItems', {}).get(table_name, [])
+        except ClientError as e:
+            if e.response['Error']['Code'] not in THROTTLE_ERRORS:
+                raise
+        if not pending:
+            return
+        time.sleep(min(2.0, 0.05 * (2 ** attempt)) * random.uniform(0.5, 1.0))
+    raise RuntimeError(f"{len(pending)} items still unprocessed after {MAX_BATCH_ATTEMPTS} attempts")
+
+
+def write_results(client, table_name, items):
+    """
+    Batch-write items already in wire format. Returns {image_id: error} for
+    the batches that could not be written (empty when all were).
+    """
+    failures = {}
+    requests = [{'PutRequest': {'Item': item}} for item in items]
+    for offset in range(0, len(requests), BATCH_WRITE_SIZE):
+        batch = requests[offset:offset + BATCH_WRITE_SIZE]
+        try:
+            write_batch(client, table_name, batch)
+        except Exception as e:
+            for request in batch:
+                failures[request['PutRequest']['Item']['image_id']['S']] = str(e)
+    return failures
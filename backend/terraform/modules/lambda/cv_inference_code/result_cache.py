@@ -0,0 +1,85 @@
+# terraform/modules/lambda/cv_inference_code/result_cache.py
+# Classification results cached by image content hash and model version
+#
+# The images bucket is versioned and drones re-upload frames, so the same
+# bytes reach /classify (and flight jobs) under new keys. Items are keyed by
+# content_hash and a variant, "{model_version}|{settings}" where settings is
+# the inference settings signature (confidence threshold, tiling). Whole-frame
+# and tiled results of one image are cached side by side, deploying a new
+# MODEL_VERSION misses every old entry without touching it, and the table's
+# TTL on expires_at evicts entries CLASSIFY_CACHE_TTL_SECONDS after they were stored.
+
+import hashlib
+import json
+import os
+import time
+
+from botocore.exceptions import ClientError
+
+from records import BATCH_WRITE_SIZE, write_batch
+
+CACHE_TTL_SECONDS = int(os.environ.get('CLASSIFY_CACHE_TTL_SECONDS', 30 * 86400))
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResultCache:
+    """
+    Lookups and stores for one model version. Cache errors are logged and
+    treated as misses: the cache can slow classification down, never fail it.
+    """
+
+    def __init__(self, client, table_name, model_version, ttl_seconds=CACHE_TTL_SECONDS):
+        self.client = client
+        self.table_name = table_name
+        self.model_version = model_version
+        self.ttl_seconds = ttl_seconds
+
+    def _key(self, digest, settings):
+        return {'content_hash': {'S': digest}, 'variant': {'S': f"{self.model_version}|{settings}"}}
+
+    def get(self, digest, settings):
+        """Cached classification fields for the content hash under these settings, or None"""
+        try:
+            item = self.client.get_item(TableName=self.table_name, Key=self._key(digest, settings)).get('Item')
+        except ClientError as e:
+            print(f"Classification cache lookup failed: {str(e)}")
+            return None
+        if not item:
+            return None
+        if int(item.get('expires_at', {}).get('N', 0)) < time.time():
+            # Expired but not yet swept by TTL (deletion can lag by days)
+            return None
+        return json.loads(item['result']['S'])
+
+    def _item(self, digest, fields, settings, now):
+        return {
+            **self._key(digest, settings),
+            'model_version': {'S': self.model_version},
+            'settings': {'S': settings},
+            'result': {'S': json.dumps(fields)},
+            'created_at': {'N': str(now)},
+            'expires_at': {'N': str(now + self.ttl_seconds)},
+        }
+
+    def put_many(self, entries, settings):
+        """Store {content_hash: fields} with batched writes"""
+        now = int(time.time())
+        requests = [
+            {'PutRequest': {'Item': self._item(digest, fields, settings, now)}} for digest, fields in entries.items()
+        ]
+        for offset in range(0, len(requests), BATCH_WRITE_SIZE):
+            try:
+                write_batch(self.client, self.table_name, requests[offset:offset + BATCH_WRITE_SIZE])
+            except Exception as e:
+                print(f"Classification cache store failed: {str(e)}")
+
+
+def load_cache(client, model_version):
+    """The cache when DYNAMODB_TABLE_CLASSIFY_CACHE is configured, else None"""
+    table_name = os.environ.get('DYNAMODB_TABLE_CLASSIFY_CACHE')
+    if not table_name:
+        return None
+    return ResultCache(client, table_name, model_version)
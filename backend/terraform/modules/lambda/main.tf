@@ -25,6 +25,54 @@ variable "dynamodb_flight_table" {
   type = string
 }
 
+variable "dynamodb_sensor_latest_table" {
+  type = string
+}
+
+variable "dynamodb_sensor_stream_arn" {
+  type = string
+}
+
+variable "dynamodb_sensor_rollups_table" {
+  type = string
+}
+
+variable "dynamodb_sensor_anomaly_table" {
+  type = string
+}
+
+variable "disease_alert_topic_arn" {
+  type = string
+}
+
+variable "dynamodb_disease_risk_table" {
+  type = string
+}
+
+variable "dynamodb_cache_versions_table" {
+  type = string
+}
+
+variable "dynamodb_jobs_table" {
+  type = string
+}
+
+variable "dynamodb_classify_cache_table" {
+  type = string
+}
+
+variable "numpy_layer_arn" {
+  type        = string
+  default     = ""
+  description = "Lambda layer providing NumPy; defaults to the AWS SDK for pandas layer in the deployment region"
+}
+
+locals {
+  numpy_layer_arn = var.numpy_layer_arn != "" ? var.numpy_layer_arn : "arn:aws:lambda:${var.aws_region}:336392948345:layer:AWSSDKPandas-Python311:12"
+  # Model version stamped on cv_results and part of every classification job id
+  model_version = "yolov8-nano-v1.0"
+}
+
 variable "s3_bucket_reports" {
   type = string
 }
@@ -91,6 +139,9 @@ resource "aws_iam_role_policy" "lambda_policy" {
         Action = [
           "dynamodb:PutItem",
           "dynamodb:GetItem",
+          "dynamodb:UpdateItem",
+          "dynamodb:BatchGetItem",
+          "dynamodb:BatchWriteItem",
           "dynamodb:Query",
           "dynamodb:Scan"
         ]
@@ -98,9 +149,44 @@ resource "aws_iam_role_policy" "lambda_policy" {
           "arn:aws:dynamodb:${var.aws_region}:*:table/${var.dynamodb_cv_table}",
           "arn:aws:dynamodb:${var.aws_region}:*:table/${var.dynamodb_cv_table}/index/*",
           "arn:aws:dynamodb:${var.aws_region}:*:table/${var.dynamodb_sensor_table}",
+          "arn:aws:dynamodb:${var.aws_region}:*:table/${var.dynamodb_sensor_table}/index/*",
+          "arn:aws:dynamodb:${var.aws_region}:*:table/${var.dynamodb_sensor_latest_table}",
+          "arn:aws:dynamodb:${var.aws_region}:*:table/${var.dynamodb_sensor_rollups_table}",
+          "arn:aws:dynamodb:${var.aws_region}:*:table/${var.dynamodb_sensor_rollups_table}/index/*",
+          "arn:aws:dynamodb:${var.aws_region}:*:table/${var.dynamodb_sensor_anomaly_table}",
+          "arn:aws:dynamodb:${var.aws_region}:*:table/${var.dynamodb_disease_risk_table}",
+          "arn:aws:dynamodb:${var.aws_region}:*:table/${var.dynamodb_disease_risk_table}/index/*",
+          "arn:aws:dynamodb:${var.aws_region}:*:table/${var.dynamodb_cache_versions_table}",
+          "arn:aws:dynamodb:${var.aws_region}:*:table/${var.dynamodb_jobs_table}",
+          "arn:aws:dynamodb:${var.aws_region}:*:table/${var.dynamodb_classify_cache_table}",
           "arn:aws:dynamodb:${var.aws_region}:*:table/${var.dynamodb_flight_table}",
           "arn:aws:dynamodb:${var.aws_region}:*:table/${var.dynamodb_flight_table}/index/*"
         ]
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:DescribeStream",
+          "dynamodb:GetRecords",
+          "dynamodb:GetShardIterator",
+          "dynamodb:ListStreams"
+        ]
+        Resource = var.dynamodb_sensor_stream_arn
+      },
+      {
+        Effect   = "Allow"
+        Action   = "sns:Publish"
+        Resource = var.disease_alert_topic_arn
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "sqs:SendMessage",
+          "sqs:ReceiveMessage",
+          "sqs:DeleteMessage",
+          "sqs:GetQueueAttributes"
+        ]
+        Resource = aws_sqs_queue.classification_jobs.arn
       }
     ]
   })
@@ -126,7 +212,7 @@ resource "aws_ecr_repository" "cv_model" {
   }
 }
 
-# Lambda Function: CV Inference (Container)
+# Lambda Function: CV Inference (Container, built from cv_inference_code/Dockerfile)
 # Only created when deploy_cv_lambda is true (after Docker image is pushed to ECR)
 resource "aws_lambda_function" "cv_inference" {
   count         = var.deploy_cv_lambda ? 1 : 0
@@ -135,6 +221,8 @@ resource "aws_lambda_function" "cv_inference" {
   package_type  = "Image"
   image_uri     = "${aws_ecr_repository.cv_model.repository_url}:latest"
 
+  # Preprocessing peaks around 160 MB whole-frame / 430 MB tiled for 4000x3000 frames with
+  # 8 decode workers (scripts/benchmarks/bench_cv_preprocess.py); the rest is model and vCPU share
   memory_size = 3072
   timeout     = 60
 
@@ -144,9 +232,19 @@ resource "aws_lambda_function" "cv_inference" {
 
   environment {
     variables = {
-      S3_BUCKET_IMAGES           = var.s3_bucket_images
-      DYNAMODB_TABLE_CV          = var.dynamodb_cv_table
-      MODEL_CONFIDENCE_THRESHOLD = "0.70"
+      S3_BUCKET_IMAGES                = var.s3_bucket_images
+      DYNAMODB_TABLE_CV               = var.dynamodb_cv_table
+      MODEL_CONFIDENCE_THRESHOLD      = "0.70"
+      MODEL_VERSION                   = local.model_version
+      INFERENCE_BATCH_SIZE            = "16"
+      DECODE_WORKERS                  = "8"
+      INFERENCE_TILED                 = "false"
+      TILE_SIZE                       = "640"
+      TILE_OVERLAP                    = "0.2"
+      CLASSIFY_MAX_BATCH_IMAGES       = "64"
+      CLASSIFY_MAX_TILED_BATCH_IMAGES = "8"
+      DYNAMODB_TABLE_CLASSIFY_CACHE   = var.dynamodb_classify_cache_table
+      CLASSIFY_CACHE_TTL_SECONDS      = "2592000"
     }
   }
 
@@ -160,24 +258,113 @@ resource "aws_lambda_function" "cv_inference" {
   }
 }
 
+# ============================================================================
+# Flight Classification Jobs (POST /jobs fans chunks out through SQS)
+# ============================================================================
+
+resource "aws_sqs_queue" "classification_jobs_dlq" {
+  name                      = "${var.project_name}-classification-jobs-dlq"
+  message_retention_seconds = 1209600
+
+  tags = {
+    Name = "${var.project_name}-classification-jobs-dlq"
+  }
+}
+
+# Visibility timeout is six times the worker timeout, as Lambda recommends for SQS event sources
+resource "aws_sqs_queue" "classification_jobs" {
+  name                       = "${var.project_name}-classification-jobs"
+  visibility_timeout_seconds = 1800
+  message_retention_seconds  = 86400
+
+  redrive_policy = jsonencode({
+    deadLetterTargetArn = aws_sqs_queue.classification_jobs_dlq.arn
+    # One more than JOB_MAX_ATTEMPTS: the last delivery checkpoints the chunk as failed
+    maxReceiveCount = 4
+  })
+
+  tags = {
+    Name = "${var.project_name}-classification-jobs"
+  }
+}
+
+# Lambda Function: Classification Job Worker (same image as cv_inference, jobs_worker handler)
+resource "aws_lambda_function" "cv_job_worker" {
+  count         = var.deploy_cv_lambda ? 1 : 0
+  function_name = "${var.project_name}-cv-job-worker"
+  role          = aws_iam_role.lambda_role.arn
+  package_type  = "Image"
+  image_uri     = "${aws_ecr_repository.cv_model.repository_url}:latest"
+
+  image_config {
+    command = ["jobs_worker.handler"]
+  }
+
+  memory_size = 3072
+  timeout     = 300
+
+  environment {
+    variables = {
+      S3_BUCKET_IMAGES              = var.s3_bucket_images
+      DYNAMODB_TABLE_CV             = var.dynamodb_cv_table
+      DYNAMODB_TABLE_JOBS           = var.dynamodb_jobs_table
+      MODEL_CONFIDENCE_THRESHOLD    = "0.70"
+      MODEL_VERSION                 = local.model_version
+      INFERENCE_BATCH_SIZE          = "16"
+      DECODE_WORKERS                = "8"
+      INFERENCE_TILED               = "false"
+      TILE_SIZE                     = "640"
+      TILE_OVERLAP                  = "0.2"
+      JOB_MAX_ATTEMPTS              = "3"
+      DYNAMODB_TABLE_CLASSIFY_CACHE = var.dynamodb_classify_cache_table
+      CLASSIFY_CACHE_TTL_SECONDS    = "2592000"
+    }
+  }
+
+  tags = {
+    Name = "${var.project_name}-cv-job-worker"
+  }
+
+  lifecycle {
+    ignore_changes = [image_uri]
+  }
+}
+
+resource "aws_lambda_event_source_mapping" "cv_job_worker" {
+  count                   = var.deploy_cv_lambda ? 1 : 0
+  event_source_arn        = aws_sqs_queue.classification_jobs.arn
+  function_name           = aws_lambda_function.cv_job_worker[0].arn
+  batch_size              = 1
+  function_response_types = ["ReportBatchItemFailures"]
+
+  # Caps parallel workers (and so the write rate into cv_results)
+  scaling_config {
+    maximum_concurrency = 10
+  }
+}
+
 # Lambda Function: Mock Sensor Generator
 resource "aws_lambda_function" "mock_sensor" {
   function_name = "${var.project_name}-mock-sensor-generator"
   role          = aws_iam_role.lambda_role.arn
   handler       = "index.handler"
   runtime       = "python3.11"
+  layers        = [local.numpy_layer_arn]
 
   filename         = data.archive_file.sensor_lambda.output_path
   source_code_hash = data.archive_file.sensor_lambda.output_base64sha256
 
   memory_size = 512
-  timeout     = 10
+  timeout     = 60
 
   environment {
     variables = {
       DYNAMODB_TABLE_SENSORS = var.dynamodb_sensor_table
       FARM_ID                = var.farm_id
+      FARM_COUNT             = "1"
       SENSOR_COUNT           = "10"
+      WRITE_CONCURRENCY      = "4"
+      SYNTHETIC_SEED         = "0"
       UPDATE_INTERVAL        = "1"
     }
   }
@@ -219,6 +406,240 @@ resource "aws_lambda_permission" "allow_eventbridge" {
   source_arn    = aws_cloudwatch_event_rule.sensor_generator_schedule.arn
 }
 
+# ============================================================================
+# Stream Consumers on the sensor_data DynamoDB Stream
+# ============================================================================
+
+# Package stream Lambda code
+data "archive_file" "stream_lambda" {
+  type        = "zip"
+  source_dir  = "${path.module}/stream_lambda_code"
+  output_path = "${path.module}/stream_lambda.zip"
+}
+
+# Lambda Function: Latest Sensor State
+resource "aws_lambda_function" "sensor_latest_state" {
+  function_name = "${var.project_name}-sensor-latest-state"
+  role          = aws_iam_role.lambda_role.arn
+  handler       = "latest_state.handler"
+  runtime       = "python3.11"
+
+  filename         = data.archive_file.stream_lambda.output_path
+  source_code_hash = data.archive_file.stream_lambda.output_base64sha256
+
+  memory_size = 256
+  timeout     = 30
+
+  environment {
+    variables = {
+      DYNAMODB_TABLE_SENSOR_LATEST  = var.dynamodb_sensor_latest_table
+      DYNAMODB_TABLE_CACHE_VERSIONS = var.dynamodb_cache_versions_table
+    }
+  }
+
+  tags = {
+    Name = "${var.project_name}-sensor-latest-state"
+  }
+}
+
+resource "aws_lambda_event_source_mapping" "sensor_latest_state" {
+  event_source_arn                   = var.dynamodb_sensor_stream_arn
+  function_name                      = aws_lambda_function.sensor_latest_state.arn
+  starting_position                  = "LATEST"
+  batch_size                         = 500
+  maximum_batching_window_in_seconds = 1
+  bisect_batch_on_function_error     = true
+  maximum_retry_attempts             = 5
+  function_response_types            = ["ReportBatchItemFailures"]
+}
+
+# Lambda Function: Sensor Anomaly Detector
+# Rolling per-sensor statistics on every reading; anomalies and fungal-risk
+# conditions go to the disease alerts topic
+resource "aws_lambda_function" "sensor_anomaly_detector" {
+  function_name = "${var.project_name}-sensor-anomaly-detector"
+  role          = aws_iam_role.lambda_role.arn
+  handler       = "anomaly_detector.handler"
+  runtime       = "python3.11"
+
+  filename         = data.archive_file.stream_lambda.output_path
+  source_code_hash = data.archive_file.stream_lambda.output_base64sha256
+
+  memory_size = 256
+  timeout     = 30
+
+  environment {
+    variables = {
+      DYNAMODB_TABLE_SENSOR_ANOMALY_STATE = var.dynamodb_sensor_anomaly_table
+      SNS_TOPIC_DISEASE_ALERTS            = var.disease_alert_topic_arn
+      ANOMALY_ALERT_COOLDOWN_SECONDS      = "3600"
+      ANOMALY_MAX_ALERTS_PER_HOUR         = "6"
+      ANOMALY_EWMA_ALPHA                  = "0.1"
+      ANOMALY_Z_THRESHOLD                 = "4.0"
+      ANOMALY_WARMUP_READINGS             = "10"
+    }
+  }
+
+  tags = {
+    Name = "${var.project_name}-sensor-anomaly-detector"
+  }
+}
+
+# Second reader of the sensor_data stream (DynamoDB Streams allows two per shard)
+resource "aws_lambda_event_source_mapping" "sensor_anomaly_detector" {
+  event_source_arn                   = var.dynamodb_sensor_stream_arn
+  function_name                      = aws_lambda_function.sensor_anomaly_detector.arn
+  starting_position                  = "LATEST"
+  batch_size                         = 500
+  maximum_batching_window_in_seconds = 1
+  bisect_batch_on_function_error     = true
+  maximum_retry_attempts             = 5
+  function_response_types            = ["ReportBatchItemFailures"]
+}
+
+# ============================================================================
+# Analytics Jobs (NumPy via Lambda layer)
+# ============================================================================
+
+# Package analytics Lambda code
+data "archive_file" "analytics_lambda" {
+  type        = "zip"
+  source_dir  = "${path.module}/analytics_lambda_code"
+  output_path = "${path.module}/analytics_lambda.zip"
+}
+
+# Lambda Function: Sensor Rollups (hourly/daily aggregates)
+resource "aws_lambda_function" "sensor_rollup" {
+  function_name = "${var.project_name}-sensor-rollup"
+  role          = aws_iam_role.lambda_role.arn
+  handler       = "sensor_rollup.handler"
+  runtime       = "python3.11"
+  layers        = [local.numpy_layer_arn]
+
+  filename         = data.archive_file.analytics_lambda.output_path
+  source_code_hash = data.archive_file.analytics_lambda.output_base64sha256
+
+  memory_size = 1024
+  timeout     = 300
+
+  environment {
+    variables = {
+      DYNAMODB_TABLE_SENSORS        = var.dynamodb_sensor_table
+      DYNAMODB_TABLE_SENSOR_ROLLUPS = var.dynamodb_sensor_rollups_table
+      FARM_IDS                      = var.farm_id
+    }
+  }
+
+  tags = {
+    Name = "${var.project_name}-sensor-rollup"
+  }
+}
+
+# Lambda Function: Disease Risk (hourly late-blight risk per zone from rollups and cv_results)
+resource "aws_lambda_function" "disease_risk" {
+  function_name = "${var.project_name}-disease-risk"
+  role          = aws_iam_role.lambda_role.arn
+  handler       = "disease_risk.handler"
+  runtime       = "python3.11"
+  layers        = [local.numpy_layer_arn]
+
+  filename         = data.archive_file.analytics_lambda.output_path
+  source_code_hash = data.archive_file.analytics_lambda.output_base64sha256
+
+  memory_size = 512
+  timeout     = 300
+
+  environment {
+    variables = {
+      DYNAMODB_TABLE_SENSOR_ROLLUPS = var.dynamodb_sensor_rollups_table
+      DYNAMODB_TABLE_CV             = var.dynamodb_cv_table
+      DYNAMODB_TABLE_DISEASE_RISK   = var.dynamodb_disease_risk_table
+      FARM_IDS                      = var.farm_id
+    }
+  }
+
+  tags = {
+    Name = "${var.project_name}-disease-risk"
+  }
+}
+
+# Fleet Analytics Lambda (GET /fleet/analytics, cached per day in the reports bucket)
+resource "aws_lambda_function" "fleet_analytics" {
+  function_name = "${var.project_name}-fleet-analytics"
+  role          = aws_iam_role.lambda_role.arn
+  handler       = "fleet_analytics.handler"
+  runtime       = "python3.11"
+  layers        = [local.numpy_layer_arn]
+
+  filename         = data.archive_file.analytics_lambda.output_path
+  source_code_hash = data.archive_file.analytics_lambda.output_base64sha256
+
+  memory_size = 1024
+  timeout     = 30
+
+  environment {
+    variables = {
+      DYNAMODB_TABLE_FLIGHTS             = var.dynamodb_flight_table
+      S3_BUCKET_REPORTS                  = var.s3_bucket_reports
+      BATTERY_REPLACEMENT_END_PERCENTAGE = "20"
+    }
+  }
+
+  tags = {
+    Name = "${var.project_name}-fleet-analytics"
+  }
+}
+
+# EventBridge Rule for Sensor Rollups (recomputes the previous and current hour)
+resource "aws_cloudwatch_event_rule" "sensor_rollup_schedule" {
+  name                = "${var.project_name}-sensor-rollup-schedule"
+  description         = "Recompute hourly and daily sensor rollups"
+  schedule_expression = "rate(15 minutes)"
+
+  tags = {
+    Name = "${var.project_name}-sensor-rollup-schedule"
+  }
+}
+
+resource "aws_cloudwatch_event_target" "sensor_rollup_target" {
+  rule      = aws_cloudwatch_event_rule.sensor_rollup_schedule.name
+  target_id = "SensorRollupLambda"
+  arn       = aws_lambda_function.sensor_rollup.arn
+}
+
+resource "aws_lambda_permission" "allow_eventbridge_rollup" {
+  statement_id  = "AllowExecutionFromEventBridge"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.sensor_rollup.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.sensor_rollup_schedule.arn
+}
+
+# EventBridge Rule for Disease Risk (scores the hours completed since the last run)
+resource "aws_cloudwatch_event_rule" "disease_risk_schedule" {
+  name                = "${var.project_name}-disease-risk-schedule"
+  description         = "Score new hours of per-zone disease risk"
+  schedule_expression = "rate(1 hour)"
+
+  tags = {
+    Name = "${var.project_name}-disease-risk-schedule"
+  }
+}
+
+resource "aws_cloudwatch_event_target" "disease_risk_target" {
+  rule      = aws_cloudwatch_event_rule.disease_risk_schedule.name
+  target_id = "DiseaseRiskLambda"
+  arn       = aws_lambda_function.disease_risk.arn
+}
+
+resource "aws_lambda_permission" "allow_eventbridge_disease_risk" {
+  statement_id  = "AllowExecutionFromEventBridge"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.disease_risk.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.disease_risk_schedule.arn
+}
+
 # ============================================================================
 # Query Lambda Functions for API Gateway Endpoints
 # ============================================================================
@@ -245,7 +666,9 @@ resource "aws_lambda_function" "cv_results_query" {
 
   environment {
     variables = {
-      DYNAMODB_TABLE_CV = var.dynamodb_cv_table
+      DYNAMODB_TABLE_CV       = var.dynamodb_cv_table
+      QUERY_CACHE_TTL_SECONDS = "60"
+      QUERY_CACHE_DIR         = "/tmp/query-cache"
     }
   }
 
@@ -269,7 +692,12 @@ resource "aws_lambda_function" "sensor_data_query" {
 
   environment {
     variables = {
-      DYNAMODB_TABLE_SENSORS = var.dynamodb_sensor_table
+      DYNAMODB_TABLE_SENSORS        = var.dynamodb_sensor_table
+      DYNAMODB_TABLE_SENSOR_LATEST  = var.dynamodb_sensor_latest_table
+      DYNAMODB_TABLE_SENSOR_ROLLUPS = var.dynamodb_sensor_rollups_table
+      DYNAMODB_TABLE_CACHE_VERSIONS = var.dynamodb_cache_versions_table
+      QUERY_CACHE_TTL_SECONDS       = "30"
+      QUERY_CACHE_DIR               = "/tmp/query-cache"
     }
   }
 
@@ -312,12 +740,18 @@ resource "aws_lambda_function" "reports_query" {
   filename         = data.archive_file.query_lambda.output_path
   source_code_hash = data.archive_file.query_lambda.output_base64sha256
 
-  memory_size = 512
+  # Large and binary reports are handed out as presigned URLs, never buffered
+  memory_size = 256
   timeout     = 30
 
   environment {
     variables = {
-      S3_BUCKET_REPORTS = var.s3_bucket_reports
+      S3_BUCKET_REPORTS       = var.s3_bucket_reports
+      REPORT_INLINE_MAX_BYTES = "4194304"
+      REPORT_URL_TTL_SECONDS  = "300"
+      REPORT_BUNDLE_WORKERS   = "16"
+      # Zips are assembled in the default 512 MB /tmp; larger ranges get a URL per day
+      REPORT_BUNDLE_MAX_BYTES = "201326592"
     }
   }
 
@@ -326,6 +760,131 @@ resource "aws_lambda_function" "reports_query" {
   }
 }
 
+# Coverage Layers Lambda (GET /coverage, merged per-zoom layers stored in the reports bucket)
+resource "aws_lambda_function" "coverage_query" {
+  function_name = "${var.project_name}-coverage-query"
+  role          = aws_iam_role.lambda_role.arn
+  handler       = "coverage_query.handler"
+  runtime       = "python3.11"
+
+  filename         = data.archive_file.query_lambda.output_path
+  source_code_hash = data.archive_file.query_lambda.output_base64sha256
+
+  # A miss fetches every coverage file in the range once and builds all zoom levels
+  memory_size = 512
+  timeout     = 30
+
+  environment {
+    variables = {
+      DYNAMODB_TABLE_FLIGHTS    = var.dynamodb_flight_table
+      S3_BUCKET_REPORTS         = var.s3_bucket_reports
+      COVERAGE_FETCH_WORKERS    = "16"
+      COVERAGE_INLINE_MAX_BYTES = "4194304"
+      COVERAGE_URL_TTL_SECONDS  = "300"
+    }
+  }
+
+  tags = {
+    Name = "${var.project_name}-coverage-query"
+  }
+}
+
+# Lambda Function: Disease Risk Query (GET /disease-risk)
+resource "aws_lambda_function" "disease_risk_query" {
+  function_name = "${var.project_name}-disease-risk-query"
+  role          = aws_iam_role.lambda_role.arn
+  handler       = "disease_risk_query.handler"
+  runtime       = "python3.11"
+
+  filename         = data.archive_file.query_lambda.output_path
+  source_code_hash = data.archive_file.query_lambda.output_base64sha256
+
+  memory_size = 256
+  timeout     = 30
+
+  environment {
+    variables = {
+      DYNAMODB_TABLE_DISEASE_RISK = var.dynamodb_disease_risk_table
+    }
+  }
+
+  tags = {
+    Name = "${var.project_name}-disease-risk-query"
+  }
+}
+
+# Lambda Function: Jobs API (POST /jobs, GET /jobs/{job_id})
+resource "aws_lambda_function" "jobs_api" {
+  function_name = "${var.project_name}-jobs-api"
+  role          = aws_iam_role.lambda_role.arn
+  handler       = "jobs_api.handler"
+  runtime       = "python3.11"
+
+  filename         = data.archive_file.query_lambda.output_path
+  source_code_hash = data.archive_file.query_lambda.output_base64sha256
+
+  memory_size = 256
+  timeout     = 30
+
+  environment {
+    variables = {
+      DYNAMODB_TABLE_JOBS    = var.dynamodb_jobs_table
+      DYNAMODB_TABLE_FLIGHTS = var.dynamodb_flight_table
+      S3_BUCKET_IMAGES       = var.s3_bucket_images
+      JOBS_QUEUE_URL         = aws_sqs_queue.classification_jobs.url
+      MODEL_VERSION          = local.model_version
+      JOB_CHUNK_IMAGES       = "32"
+    }
+  }
+
+  tags = {
+    Name = "${var.project_name}-jobs-api"
+  }
+}
+
+# ============================================================================
+# Report Index (monthly manifests maintained from reports bucket events)
+# ============================================================================
+
+# Lambda Function: Report Indexer (ships in the query package: it shares report_manifest.py)
+resource "aws_lambda_function" "report_indexer" {
+  function_name = "${var.project_name}-report-indexer"
+  role          = aws_iam_role.lambda_role.arn
+  handler       = "report_indexer.handler"
+  runtime       = "python3.11"
+
+  filename         = data.archive_file.query_lambda.output_path
+  source_code_hash = data.archive_file.query_lambda.output_base64sha256
+
+  memory_size = 128
+  timeout     = 30
+
+  tags = {
+    Name = "${var.project_name}-report-indexer"
+  }
+}
+
+resource "aws_lambda_permission" "allow_s3_report_indexer" {
+  statement_id  = "AllowExecutionFromS3"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.report_indexer.function_name
+  principal     = "s3.amazonaws.com"
+  source_arn    = "arn:aws:s3:::${var.s3_bucket_reports}"
+}
+
+# A bucket has a single notification configuration; add further targets here
+resource "aws_s3_bucket_notification" "reports" {
+  bucket = var.s3_bucket_reports
+
+  lambda_function {
+    lambda_function_arn = aws_lambda_function.report_indexer.arn
+    events              = ["s3:ObjectCreated:*", "s3:ObjectRemoved:*"]
+    filter_prefix       = "daily/"
+  }
+
+  depends_on = [aws_lambda_permission.allow_s3_report_indexer]
+}
+
 # Outputs
 output "cv_lambda_function_name" {
   value = var.deploy_cv_lambda ? aws_lambda_function.cv_inference[0].function_name : "${var.project_name}-cv-inference"
@@ -351,6 +910,18 @@ output "sensor_lambda_invoke_arn" {
   value = aws_lambda_function.mock_sensor.invoke_arn
 }
 
+output "sensor_latest_state_function_name" {
+  value = aws_lambda_function.sensor_latest_state.function_name
+}
+
+output "sensor_anomaly_detector_function_name" {
+  value = aws_lambda_function.sensor_anomaly_detector.function_name
+}
+
+output "sensor_rollup_function_name" {
+  value = aws_lambda_function.sensor_rollup.function_name
+}
+
 output "ecr_repository_url" {
   value = aws_ecr_repository.cv_model.repository_url
 }
@@ -407,4 +978,44 @@ output "reports_query_arn" {
 
 output "reports_query_invoke_arn" {
   value = aws_lambda_function.reports_query.invoke_arn
-}
\ No newline at end of file
+}
+
+output "jobs_api_function_name" {
+  value = aws_lambda_function.jobs_api.function_name
+}
+
+output "jobs_api_invoke_arn" {
+  value = aws_lambda_function.jobs_api.invoke_arn
+}
+
+output "report_indexer_function_name" {
+  value = aws_lambda_function.report_indexer.function_name
+}
+
+output "fleet_analytics_function_name" {
+  value = aws_lambda_function.fleet_analytics.function_name
+}
+
+output "fleet_analytics_invoke_arn" {
+  value = aws_lambda_function.fleet_analytics.invoke_arn
+}
+
+output "coverage_query_function_name" {
+  value = aws_lambda_function.coverage_query.function_name
+}
+
+output "coverage_query_invoke_arn" {
+  value = aws_lambda_function.coverage_query.invoke_arn
+}
+
+output "disease_risk_function_name" {
+  value = aws_lambda_function.disease_risk.function_name
+}
+
+output "disease_risk_query_function_name" {
+  value = aws_lambda_function.disease_risk_query.function_name
+}
+
+output "disease_risk_query_invoke_arn" {
+  value = aws_lambda_function.disease_risk_query.invoke_arn
+}
@@ -0,0 +1,239 @@
+# terraform/modules/lambda/query_lambda_code/cache.py
+# Warm-container response cache for the query Lambdas
+#
+# Tier 1 is an in-process LRU bounded by body bytes; it lives as long as the
+# warm container. Tier 2 (optional, QUERY_CACHE_DIR) keeps entries as files,
+# e.g. under /tmp, so a larger working set survives tier-1 eviction.
+#
+# Entries expire after a TTL. Requests scoped to a partition (a farm's
+# sensor_data) are also invalidated early: the latest_state stream consumer
+# bumps a version counter per partition in the cache-versions table, and an
+# entry is only served while the version it was filled under is current.
+
+import copy
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from functools import wraps
+
+import boto3
+
+import metrics
+
+CACHE_TTL_SECONDS = int(os.environ.get('QUERY_CACHE_TTL_SECONDS', 30))
+CACHE_MAX_BYTES = int(os.environ.get('QUERY_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+CACHE_DIR = os.environ.get('QUERY_CACHE_DIR')
+CACHE_DIR_MAX_BYTES = int(os.environ.get('QUERY_CACHE_DIR_MAX_BYTES', 256 * 1024 * 1024))
+VERSIONS_TABLE = os.environ.get('DYNAMODB_TABLE_CACHE_VERSIONS')
+
+# How long a partition version read is trusted; bounds staleness after a
+# stream write to roughly this plus the stream consumer's batching window
+VERSION_CHECK_SECONDS = float(os.environ.get('QUERY_CACHE_VERSION_CHECK_SECONDS', 2))
+
+
+def sensor_partition(farm_id):
+    """Version key of a farm's sensor_data (same format as stream_lambda_code/latest_state.py)"""
+    return f"sensor_data#{farm_id}"
+
+
+class LRUCache:
+    """Entries (expires_at, version, response) evicted least-recently-used once max_bytes is exceeded"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, entry, size):
+        if size > self.max_bytes:
+            return
+        self.delete(key)
+        self._entries[key] = (entry, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.size -= evicted_size
+
+    def delete(self, key):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= old[1]
+
+
+class FileCache:
+    """One JSON file per entry; access time is the file mtime, oldest evicted first"""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'r') as f:
+                stored = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        # Guard against (astronomically unlikely) hash collisions
+        if stored.get('key') != key:
+            return None
+        return tuple(stored['entry'])
+
+    def put(self, key, entry, size):
+        if size > self.max_bytes:
+            return
+        # Write-then-rename so a concurrent reader never sees a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'key': key, 'entry': list(entry)}, f)
+        os.replace(tmp_path, self._path(key))
+        self._evict()
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        files = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+
+class VersionTracker:
+    """Current version of each partition, re-read at most every VERSION_CHECK_SECONDS"""
+
+    def __init__(self, table_name, client=None):
+        self.table_name = table_name
+        self.client = client
+        self._versions = {}
+
+    def current(self, partition):
+        """The partition's version (0 before its first write); None when it cannot be read"""
+        if not self.table_name or partition is None:
+            return None
+        now = time.monotonic()
+        cached = self._versions.get(partition)
+        if cached and now - cached[1] < VERSION_CHECK_SECONDS:
+            return cached[0]
+        try:
+            if self.client is None:
+                self.client = boto3.client('dynamodb')
+            response = self.client.get_item(
+                TableName=self.table_name,
+                Key={'partition': {'S': partition}},
+                ProjectionExpression='version'
+            )
+            version = int(response.get('Item', {}).get('version', {}).get('N', 0))
+        except Exception as e:
+            print(f"Error reading cache version for {partition}: {str(e)}")
+            return None
+        self._versions[partition] = (version, now)
+        return version
+
+
+memory_cache = LRUCache(CACHE_MAX_BYTES)
+file_cache = FileCache(CACHE_DIR, CACHE_DIR_MAX_BYTES) if CACHE_DIR else None
+versions = VersionTracker(VERSIONS_TABLE)
+
+
+def cache_key(endpoint, event):
+    """Endpoint + route + query parameters in canonical order (empty values dropped)"""
+    params = event.get('queryStringParameters') or {}
+    normalized = sorted((name, value) for name, value in params.items() if value not in (None, ''))
+    route = event.get('rawPath', '').rstrip('/')
+    path_params = sorted((event.get('pathParameters') or {}).items())
+    return json.dumps([endpoint, route, path_params, normalized], separators=(',', ':'))
+
+
+def lookup(key, version, now):
+    """Response of a live entry, else None; expired or stale entries are dropped"""
+    for tier, tier_cache in (('memory', memory_cache), ('file', file_cache)):
+        if tier_cache is None:
+            continue
+        entry = tier_cache.get(key)
+        if entry is None:
+            continue
+        expires_at, entry_version, response = entry
+        if expires_at <= now or entry_version != version:
+            tier_cache.delete(key)
+            continue
+        if tier == 'file':
+            # Promote so the next hit is served from memory
+            memory_cache.put(key, entry, len(response['body']))
+        return response
+    return None
+
+
+def store(key, version, response, ttl):
+    entry = (time.time() + ttl, version, response)
+    size = len(response['body'])
+    memory_cache.put(key, entry, size)
+    if file_cache is not None:
+        file_cache.put(key, entry, size)
+
+
+def cached(endpoint, partition=None, ttl=CACHE_TTL_SECONDS):
+    """
+    Decorator caching successful (200, text body) proxy responses of a handler.
+    partition: optional fn(query params) -> version key the response depends on
+    (None: TTL-only). Responses carry X-Cache: HIT/MISS and every request logs
+    CacheHit/CacheMiss per endpoint, so the hit ratio is a metric-math graph.
+    """
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(event, context):
+            event = event or {}
+            key = cache_key(endpoint, event)
+            params = event.get('queryStringParameters') or {}
+            scope = partition(params) if partition else None
+            version = versions.current(scope) if scope else None
+            # A scoped request whose version cannot be read is served uncached
+            bypass = bool(VERSIONS_TABLE) and scope is not None and version is None
+
+            response = None if bypass else lookup(key, version, time.time())
+            hit = response is not None
+            if hit:
+                response = copy.deepcopy(response)
+            else:
+                response = handler(event, context)
+                if (not bypass and response.get('statusCode') == 200
+                        and isinstance(response.get('body'), str)):
+                    store(key, version, copy.deepcopy(response), ttl)
+
+            response.setdefault('headers', {})['X-Cache'] = 'HIT' if hit else 'MISS'
+            metrics.emit(
+                {'CacheHit': (int(hit), 'Count'), 'CacheMiss': (int(not hit), 'Count')},
+                Endpoint=endpoint
+            )
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,129 @@
+# terraform/modules/lambda/query_lambda_code/compression.py
+# Response compression with Accept-Encoding negotiation, shared by the query Lambdas
+#
+# API Gateway HTTP APIs pass Lambda proxy responses through untouched, so the
+# Lambda compresses the body itself and returns it base64-encoded. Brotli is
+# used when the brotli module is packaged with the function; gzip otherwise.
+
+import base64
+import gzip
+import os
+from functools import wraps
+
+import metrics
+
+try:
+    import brotli
+except ImportError:  # Optional, not part of the Lambda runtime
+    brotli = None
+
+# Below this size the encoding overhead outweighs the transfer saved
+MIN_COMPRESS_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', 1024))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Already-compressed formats (PDF, images) are passed through as-is
+COMPRESSIBLE_TYPES = ('application/json', 'application/geo+json', 'text/')
+
+# Server preference among equally weighted encodings
+PREFERENCE = ('br', 'gzip') if brotli else ('gzip',)
+
+
+def accepted_encodings(header):
+    """Accept-Encoding as {encoding: q}; a bare name means q=1"""
+    accepted = {}
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def choose_encoding(header):
+    """Highest-q supported encoding the client accepts (ties go to PREFERENCE order), or None"""
+    accepted = accepted_encodings(header)
+    best = None
+    best_q = 0.0
+    for encoding in PREFERENCE:
+        q = accepted.get(encoding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def _header(headers, name):
+    """Case-insensitive header lookup (payload v2 lowercases names, v1 does not)"""
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _encode(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_response(event, response, function_name='unknown'):
+    """Compress a proxy response for the request's Accept-Encoding; binary bodies are base64-encoded"""
+    body = response.get('body')
+    if body is None or response.get('isBase64Encoded'):
+        return response
+
+    headers = response.setdefault('headers', {})
+    data = body.encode('utf-8') if isinstance(body, str) else body
+    content_type = (_header(headers, 'content-type') or '').lower()
+
+    encoding = None
+    # A 206 body is a byte range of the identity representation; encoding it would corrupt the range
+    if (len(data) >= MIN_COMPRESS_BYTES
+            and response.get('statusCode') != 206
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+            and _header(headers, 'content-encoding') is None):
+        encoding = choose_encoding(_header(event.get('headers'), 'accept-encoding'))
+        # The body depends on Accept-Encoding, so caches must key on it
+        headers['Vary'] = 'Accept-Encoding'
+
+    if encoding:
+        payload = _encode(data, encoding)
+        headers['Content-Encoding'] = encoding
+        # The encoded bytes differ from the identity representation, so a
+        # strong validator must become weak (If-None-Match compares weakly)
+        for name, value in headers.items():
+            if name.lower() == 'etag' and not value.startswith('W/'):
+                headers[name] = f"W/{value}"
+        response['body'] = base64.b64encode(payload).decode('ascii')
+        response['isBase64Encoded'] = True
+    elif isinstance(body, bytes):
+        payload = data
+        response['body'] = base64.b64encode(payload).decode('ascii')
+        response['isBase64Encoded'] = True
+    else:
+        payload = data
+
+    metrics.emit(
+        {'UncompressedBytes': (len(data), 'Bytes'), 'ResponseBytes': (len(payload), 'Bytes')},
+        FunctionName=function_name,
+        Encoding=encoding or 'identity'
+    )
+    return response
+
+
+def compressed(handler):
+    """Decorator applying compress_response to a Lambda proxy handler"""
+    @wraps(handler)
+    def wrapper(event, context):
+        response = handler(event, context)
+        function_name = getattr(context, 'function_name', None) or handler.__module__
+        return compress_response(event or {}, response, function_name)
+    return wrapper
@@ -0,0 +1,117 @@
+# terraform/modules/lambda/query_lambda_code/conditional.py
+# ETag / conditional GET helpers shared by the query Lambdas
+
+import hashlib
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from functools import wraps
+
+# A window ending this long ago is treated as closed: late stream writes have landed
+CLOSED_WINDOW_LAG_SECONDS = 300
+
+# Closed windows and past reports only change on a backfill; the ETag still
+# catches that once max-age runs out
+CLOSED_CACHE_CONTROL = 'public, max-age=86400'
+# Open data: browsers may keep it but must revalidate (cheap 304s)
+OPEN_CACHE_CONTROL = 'no-cache'
+
+
+def request_header(event, name):
+    """Case-insensitive request header (payload v2 lowercases names, v1 does not)"""
+    for key, value in (event.get('headers') or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def body_etag(body):
+    """Strong ETag derived from the response body, so identical content always gets the same tag"""
+    data = body.encode('utf-8') if isinstance(body, str) else body
+    return '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+
+
+def _opaque(etag):
+    """Weak comparison (RFC 9110 13.1.2): W/ prefixes are ignored"""
+    etag = etag.strip()
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return _opaque(etag) in {_opaque(candidate) for candidate in if_none_match.split(',')}
+
+
+def not_modified_since(if_modified_since, last_modified):
+    """If-Modified-Since check; only consulted when the request carries no If-None-Match"""
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        return int(last_modified.timestamp()) <= int(parsedate_to_datetime(if_modified_since).timestamp())
+    except (TypeError, ValueError):
+        return False
+
+
+def is_not_modified(event, etag, last_modified=None):
+    if_none_match = request_header(event, 'if-none-match')
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    return not_modified_since(request_header(event, 'if-modified-since'), last_modified)
+
+
+def http_date(dt):
+    return formatdate(dt.timestamp(), usegmt=True)
+
+
+def validator_headers(etag, cache_control, last_modified=None):
+    headers = {'ETag': etag, 'Cache-Control': cache_control}
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified)
+    return headers
+
+
+def not_modified(headers):
+    """304 carrying the validators and caching headers, no body"""
+    return {
+        'statusCode': 304,
+        'headers': {'Access-Control-Allow-Origin': '*', **headers},
+        'body': ''
+    }
+
+
+def window_closed(end_timestamp, now=None):
+    """True when a query window has an explicit end far enough in the past"""
+    if not end_timestamp:
+        return False
+    try:
+        end = int(end_timestamp)
+    except (TypeError, ValueError):
+        return False
+    now = time.time() if now is None else now
+    return end < now - CLOSED_WINDOW_LAG_SECONDS
+
+
+def conditional(end_param):
+    """
+    Decorator giving 200 responses for closed time windows (query parameter
+    end_param in the past) a body-derived ETag and long-lived Cache-Control,
+    and answering a matching If-None-Match with 304.
+    """
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(event, context):
+            event = event or {}
+            response = handler(event, context)
+            params = event.get('queryStringParameters') or {}
+            if response.get('statusCode') != 200 or not window_closed(params.get(end_param)):
+                return response
+
+            headers = validator_headers(body_etag(response['body']), CLOSED_CACHE_CONTROL)
+            if is_not_modified(event, headers['ETag']):
+                return not_modified(headers)
+            response.setdefault('headers', {}).update(headers)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,270 @@
+# terraform/modules/lambda/query_lambda_code/coverage_geometry.py
+# Per-zoom union and simplification of coverage GeoJSON polygons (WGS84 lon/lat)
+#
+# A zoom level's tolerance is the width of one 256-px web map tile pixel at
+# the equator, and its pixel grid is the lon/lat plane cut into squares of
+# that size. Polygons are unioned on the grid: each is rasterized to runs of
+# the pixels whose centre it covers, the runs of all polygons are merged and
+# split into connected regions, and each region's outline is traced back to
+# rings. Rings are then simplified with Douglas-Peucker, snapped to the grid
+# and dropped when they are smaller than a pixel, so each zoom carries only
+# the vertices it can draw. Everything is plain Python: the query functions
+# ship without NumPy, and the cost follows the outlines, not the areas.
+
+import math
+
+MIN_ZOOM = 10
+MAX_ZOOM = 18
+ZOOM_LEVELS = range(MIN_ZOOM, MAX_ZOOM + 1)
+TILE_SIZE = 256
+
+
+def tolerance(zoom):
+    """Degrees per tile pixel at zoom (largest at the equator, so conservative elsewhere)"""
+    return 360.0 / (TILE_SIZE * 2 ** zoom)
+
+
+def polygons(document):
+    """Every polygon (a list of rings, outer ring first) in a GeoJSON object, any nesting"""
+    kind = document.get('type') if isinstance(document, dict) else None
+    if kind == 'FeatureCollection':
+        for feature in document.get('features') or []:
+            yield from polygons(feature)
+    elif kind == 'Feature':
+        yield from polygons(document.get('geometry'))
+    elif kind == 'GeometryCollection':
+        for geometry in document.get('geometries') or []:
+            yield from polygons(geometry)
+    elif kind == 'Polygon':
+        yield document.get('coordinates') or []
+    elif kind == 'MultiPolygon':
+        yield from document.get('coordinates') or []
+
+
+def rasterize(rings, epsilon):
+    """
+    Pixel runs of a polygon on the epsilon grid, {row: [(first column, end column), ...]},
+    for the pixels whose centre is inside it. Crossings are counted over all
+    rings (even-odd), so holes stay open.
+    """
+    crossings = {}
+    for ring in rings:
+        points = [(point[0] / epsilon, point[1] / epsilon) for point in ring]
+        for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]):
+            if y1 == y2:
+                continue
+            slope = (x2 - x1) / (y2 - y1)
+            # Rows whose centre line y = row + 0.5 lies in [low, high) of the edge
+            for row in range(math.ceil(min(y1, y2) - 0.5), math.ceil(max(y1, y2) - 0.5)):
+                crossings.setdefault(row, []).append(x1 + (row + 0.5 - y1) * slope)
+
+    runs = {}
+    for row, xs in crossings.items():
+        xs.sort()
+        row_runs = []
+        for left, right in zip(xs[::2], xs[1::2]):
+            first, end = math.ceil(left - 0.5), math.ceil(right - 0.5)
+            if end > first:
+                row_runs.append((first, end))
+        if row_runs:
+            runs[row] = row_runs
+    return runs
+
+
+def regions(sources):
+    """
+    Union of several sources' pixel runs ((source, runs) pairs) split into
+    4-connected regions: a list of (set of sources, {row: [(first, end), ...]}).
+    A region's sources are every source with a pixel in it.
+    """
+    rows = {}
+    for source, runs in sources:
+        for row, row_runs in runs.items():
+            rows.setdefault(row, []).extend((first, end, source) for first, end in row_runs)
+
+    # Merge each row's overlapping or touching runs
+    merged, by_row = [], {}
+    for row, row_runs in rows.items():
+        row_runs.sort(key=lambda run: run[0])
+        indices = by_row[row] = []
+        for first, end, source in row_runs:
+            if indices and first <= merged[indices[-1]][2]:
+                last = merged[indices[-1]]
+                last[2] = max(last[2], end)
+                last[3].add(source)
+            else:
+                indices.append(len(merged))
+                merged.append([row, first, end, {source}])
+
+    # Union-find over runs that overlap the run below them
+    parent = list(range(len(merged)))
+
+    def find(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    for row, indices in by_row.items():
+        below = by_row.get(row - 1)
+        if not below:
+            continue
+        a = b = 0
+        while a < len(indices) and b < len(below):
+            upper, lower = merged[indices[a]], merged[below[b]]
+            if upper[1] < lower[2] and lower[1] < upper[2]:
+                parent[find(indices[a])] = find(below[b])
+            if upper[2] < lower[2]:
+                a += 1
+            else:
+                b += 1
+
+    grouped = {}
+    for index, (row, first, end, run_sources) in enumerate(merged):
+        region_sources, runs = grouped.setdefault(find(index), (set(), {}))
+        region_sources.update(run_sources)
+        runs.setdefault(row, []).append((first, end))
+    return list(grouped.values())
+
+
+def subtract(runs, others):
+    """Parts of sorted, disjoint runs not covered by sorted, disjoint others"""
+    remaining = []
+    for first, end in runs:
+        for other_first, other_end in others:
+            if other_end <= first:
+                continue
+            if other_first >= end:
+                break
+            if other_first > first:
+                remaining.append((first, other_first))
+            first = max(first, other_end)
+        if first < end:
+            remaining.append((first, end))
+    return remaining
+
+
+def outline(runs):
+    """
+    Rings of a 4-connected pixel region as closed lists of grid vertices: the
+    outer ring counter-clockwise first, then the holes clockwise
+    """
+    edges = {}
+    for row, row_runs in runs.items():
+        # Region on the left of every edge
+        for first, end in row_runs:
+            edges.setdefault((end, row), []).append((end, row + 1))
+            edges.setdefault((first, row + 1), []).append((first, row))
+        for first, end in subtract(row_runs, runs.get(row - 1, ())):
+            edges.setdefault((first, row), []).append((end, row))
+        for first, end in subtract(row_runs, runs.get(row + 1, ())):
+            edges.setdefault((end, row + 1), []).append((first, row + 1))
+
+    rings = []
+    while edges:
+        # The lowest, leftmost vertex is never a corner two untraced pixels touch at
+        start = vertex = min(edges)
+        heading = None
+        ring = []
+        while True:
+            ring.append(vertex)
+            ends = edges[vertex]
+            if len(ends) > 1 and heading:
+                # Pixels touching only at this corner are not connected: take the leftmost turn
+                ends.sort(key=lambda end: heading[1] * (end[0] - vertex[0]) - heading[0] * (end[1] - vertex[1]))
+            end = ends.pop(0)
+            if not ends:
+                del edges[vertex]
+            heading = (end[0] - vertex[0], end[1] - vertex[1])
+            vertex = end
+            if vertex == start:
+                break
+        rings.append(ring + [start])
+
+    outer = [ring for ring in rings if signed_area(ring) > 0]
+    holes = [ring for ring in rings if signed_area(ring) < 0]
+    return outer + holes
+
+
+def douglas_peucker(points, epsilon):
+    """Indices of points kept by Douglas-Peucker (iterative, so long rings cannot hit the recursion limit)"""
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        (x1, y1), (x2, y2) = points[first][:2], points[last][:2]
+        dx, dy = x2 - x1, y2 - y1
+        length = math.hypot(dx, dy)
+        farthest, distance = None, epsilon
+        for index in range(first + 1, last):
+            px, py = points[index][:2]
+            if length:
+                d = abs(dy * px - dx * py + x2 * y1 - y2 * x1) / length
+            else:
+                d = math.hypot(px - x1, py - y1)
+            if d > distance:
+                farthest, distance = index, d
+        if farthest is not None:
+            keep[farthest] = True
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+    return [index for index, kept in enumerate(keep) if kept]
+
+
+def simplify_ring(ring, epsilon):
+    """
+    Closed ring simplified and snapped to the epsilon grid, or None when it
+    collapses below a pixel. Output rings are closed, start at their lowest
+    vertex and run counter-clockwise, so equal shapes compare equal.
+    """
+    if len(ring) < 4:
+        return None
+    # Split at the vertex farthest from the start: Douglas-Peucker needs distinct end points
+    start = ring[0]
+    far = max(range(len(ring)), key=lambda i: (ring[i][0] - start[0]) ** 2 + (ring[i][1] - start[1]) ** 2)
+    if far == 0:
+        return None
+    halves = (ring[:far + 1], ring[far:])
+    kept = [halves[0][i] for i in douglas_peucker(halves[0], epsilon)]
+    kept += [halves[1][i] for i in douglas_peucker(halves[1], epsilon)][1:]
+
+    snapped = []
+    for x, y in (point[:2] for point in kept):
+        vertex = (round(x / epsilon), round(y / epsilon))
+        if not snapped or vertex != snapped[-1]:
+            snapped.append(vertex)
+    if snapped[0] == snapped[-1]:
+        snapped.pop()
+    if len(snapped) < 3:
+        return None
+    xs, ys = [x for x, _ in snapped], [y for _, y in snapped]
+    if max(xs) - min(xs) < 1 or max(ys) - min(ys) < 1 or signed_area(snapped) == 0:
+        return None
+
+    if signed_area(snapped) < 0:
+        snapped.reverse()
+    lowest = snapped.index(min(snapped))
+    snapped = snapped[lowest:] + snapped[:lowest]
+    return tuple(snapped + snapped[:1])
+
+
+def signed_area(vertices):
+    """Shoelace area (positive counter-clockwise) of an open or closed vertex list"""
+    return sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(vertices, vertices[1:] + vertices[:1])) / 2
+
+
+def simplify_polygon(rings, epsilon):
+    """Polygon as a tuple of grid rings (outer first), or None when the outer ring vanishes; vanished holes are dropped"""
+    simplified = [simplify_ring(ring, epsilon) for ring in rings]
+    if not simplified or simplified[0] is None:
+        return None
+    # GeoJSON holes run clockwise
+    holes = sorted(tuple(reversed(hole)) for hole in simplified[1:] if hole is not None)
+    return (simplified[0],) + tuple(holes)
+
+
+def to_coordinates(polygon, epsilon):
+    """Grid polygon back to GeoJSON Polygon coordinates, rounded to the digits the grid needs"""
+    digits = max(0, math.ceil(-math.log10(epsilon)) + 1)
+    return [[[round(x * epsilon, digits), round(y * epsilon, digits)] for x, y in ring] for ring in polygon]
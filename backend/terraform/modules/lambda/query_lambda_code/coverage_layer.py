@@ -0,0 +1,197 @@
+# terraform/modules/lambda/query_lambda_code/coverage_layer.py
+# Merged, per-zoom coverage layers for a farm and date range
+#
+# A layer is one GeoJSON FeatureCollection built from the coverage_map_s3_uri
+# files of every flight in the range. The files are fetched concurrently once,
+# then each zoom level is derived from the same parsed polygons: unioned on
+# the zoom's pixel grid and simplified (coverage_geometry), so overlapping
+# passes become one feature per connected covered area, with the number of
+# flights, drones and dates that covered it, instead of one polygon per flight.
+#
+# Layers are stored in the reports bucket under
+# coverage/{farm_id}/{from}_{to}/z{zoom}.geojson with the fingerprint of the
+# flights they were built from as object metadata; a stored layer is only
+# served while the range still holds exactly those flights, and a layer built
+# while some coverage files were unreadable is never served from storage.
+#
+# Every function takes its clients explicitly so layers can be built against
+# local stand-ins (MinIO, moto server) and from scripts/coverage/.
+
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+from coverage_geometry import (
+    ZOOM_LEVELS, outline, polygons, rasterize, regions, simplify_polygon, to_coordinates, tolerance
+)
+
+FARM_INDEX = 'farm_id-flight_start-index'
+FLIGHT_PROJECTION = 'flight_id, drone_id, flight_date, coverage_map_s3_uri'
+LAYER_CONTENT_TYPE = 'application/geo+json'
+FINGERPRINT_METADATA = 'sources'
+
+
+def layer_key(farm_id, start, end, zoom):
+    return f"coverage/{farm_id}/{start:%Y-%m-%d}_{end:%Y-%m-%d}/z{zoom}.geojson"
+
+
+def flights_in_range(table, farm_id, start, end):
+    """The farm's flights starting between start and end (dates, inclusive) that have a coverage map"""
+    low = int(datetime(start.year, start.month, start.day, tzinfo=timezone.utc).timestamp())
+    high = int(datetime(end.year, end.month, end.day, tzinfo=timezone.utc).timestamp()) + 86400 - 1
+    kwargs = {
+        'IndexName': FARM_INDEX,
+        'KeyConditionExpression': Key('farm_id').eq(farm_id) & Key('flight_start').between(low, high),
+        'ProjectionExpression': FLIGHT_PROJECTION,
+    }
+    flights = []
+    while True:
+        page = table.query(**kwargs)
+        flights.extend(item for item in page.get('Items', []) if item.get('coverage_map_s3_uri'))
+        if 'LastEvaluatedKey' not in page:
+            return sorted(flights, key=lambda flight: flight['flight_id'])
+        kwargs['ExclusiveStartKey'] = page['LastEvaluatedKey']
+
+
+def fingerprint(flights, missing=()):
+    """
+    Identity of the set of coverage files a layer is built from. A layer
+    that could not read some of them (missing flight_ids) gets a different
+    one, so it never passes for the complete layer and is rebuilt next time.
+    """
+    digest = hashlib.sha256()
+    for flight in flights:
+        digest.update(f"{flight['flight_id']}\t{flight['coverage_map_s3_uri']}\n".encode('utf-8'))
+    for flight_id in sorted(missing):
+        digest.update(f"missing\t{flight_id}\n".encode('utf-8'))
+    return digest.hexdigest()[:32]
+
+
+def split_s3_uri(uri):
+    """s3://bucket/key -> (bucket, key)"""
+    if not uri.startswith('s3://') or '/' not in uri[5:]:
+        raise ValueError(f"Not an S3 URI: {uri}")
+    bucket, key = uri[5:].split('/', 1)
+    return bucket, key
+
+
+def load_stored(s3, bucket, key, expected_fingerprint):
+    """Body and ETag of a stored layer built from expected_fingerprint, else None"""
+    try:
+        stored = s3.get_object(Bucket=bucket, Key=key)
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+            return None
+        raise
+    if stored.get('Metadata', {}).get(FINGERPRINT_METADATA) != expected_fingerprint:
+        stored['Body'].close()
+        return None
+    return stored['Body'].read().decode('utf-8'), stored['ETag']
+
+
+def fetch_coverage(s3, flights, workers):
+    """
+    {flight_id: [polygon rings]} for every coverage file that could be read,
+    plus the flight_ids whose file was missing or not valid GeoJSON
+    """
+    def fetch(flight):
+        try:
+            bucket, key = split_s3_uri(flight['coverage_map_s3_uri'])
+            document = json.loads(s3.get_object(Bucket=bucket, Key=key)['Body'].read())
+            return flight['flight_id'], list(polygons(document))
+        except (ClientError, ValueError) as e:
+            print(f"Skipping coverage of {flight['flight_id']}: {str(e)}")
+            return flight['flight_id'], None
+
+    coverage, missing = {}, []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(flights)))) as pool:
+        for flight_id, shapes in pool.map(fetch, flights):
+            if shapes is None:
+                missing.append(flight_id)
+            else:
+                coverage[flight_id] = shapes
+    return coverage, missing
+
+
+def merge(flights, coverage, zoom):
+    """FeatureCollection features for one zoom: the union of the flights' coverage, one per connected area"""
+    epsilon = tolerance(zoom)
+    rasters = [
+        (flight['flight_id'], rasterize(rings, epsilon))
+        for flight in flights
+        for rings in coverage.get(flight['flight_id'], [])
+    ]
+    by_id = {flight['flight_id']: flight for flight in flights}
+    merged = []
+    for flight_ids, runs in regions(rasters):
+        # Traced in pixel units: simplify at one pixel, then scale back to degrees
+        polygon = simplify_polygon(outline(runs), 1)
+        if polygon is None:
+            continue
+        merged.append((polygon, {
+            'flights': flight_ids,
+            'drones': {by_id[flight_id].get('drone_id') for flight_id in flight_ids},
+            'dates': {by_id[flight_id].get('flight_date') for flight_id in flight_ids},
+        }))
+
+    features = []
+    # Most-flown areas first, then a stable geometric order
+    for polygon, entry in sorted(merged, key=lambda item: (-len(item[1]['flights']), item[0])):
+        dates = sorted(date for date in entry['dates'] if date)
+        features.append({
+            'type': 'Feature',
+            'geometry': {'type': 'Polygon', 'coordinates': to_coordinates(polygon, epsilon)},
+            'properties': {
+                'flights': len(entry['flights']),
+                'drones': sorted(drone for drone in entry['drones'] if drone),
+                'first_flight_date': dates[0] if dates else None,
+                'last_flight_date': dates[-1] if dates else None,
+            },
+        })
+    return features
+
+
+def build_layers(s3, flights, farm_id, start, end, workers, zooms=ZOOM_LEVELS):
+    """{zoom: layer document} from one fetch of the range's coverage files"""
+    coverage, missing = fetch_coverage(s3, flights, workers)
+    layers = {}
+    for zoom in zooms:
+        features = merge(flights, coverage, zoom)
+        layers[zoom] = {
+            'type': 'FeatureCollection',
+            'features': features,
+            'properties': {
+                'farm_id': farm_id,
+                'from': start.isoformat(),
+                'to': end.isoformat(),
+                'zoom': zoom,
+                'flights': len(flights),
+                'missing_flights': missing,
+            },
+        }
+    return layers
+
+
+def store_layers(s3, bucket, farm_id, start, end, layers, source_fingerprint):
+    """Write every zoom's layer; returns {zoom: (body, etag)}"""
+    stored = {}
+    for zoom, layer in layers.items():
+        body = json.dumps(layer, separators=(',', ':'))
+        written = s3.put_object(
+            Bucket=bucket,
+            Key=layer_key(farm_id, start, end, zoom),
+            Body=body.encode('utf-8'),
+            ContentType=LAYER_CONTENT_TYPE,
+            Metadata={FINGERPRINT_METADATA: source_fingerprint},
+        )
+        stored[zoom] = (body, written['ETag'])
+    return stored
+
+
+def range_closed(end):
+    """A range ending before yesterday (UTC) gets no new flights short of a backfill"""
+    return end < datetime.now(timezone.utc).date() - timedelta(days=1)
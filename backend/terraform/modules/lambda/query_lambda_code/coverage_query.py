@@ -0,0 +1,169 @@
+# terraform/modules/lambda/query_lambda_code/coverage_query.py
+# Lambda function serving merged, zoom-simplified coverage layers from S3
+
+import json
+import os
+from datetime import datetime
+import boto3
+from botocore.config import Config
+from compression import compressed
+from conditional import CLOSED_CACHE_CONTROL, OPEN_CACHE_CONTROL, is_not_modified, not_modified, validator_headers
+from coverage_geometry import MAX_ZOOM, MIN_ZOOM
+from coverage_layer import (
+    LAYER_CONTENT_TYPE, build_layers, fingerprint, flights_in_range, layer_key, load_stored, range_closed,
+    store_layers
+)
+from serialization import RawTable
+
+# Concurrent coverage-file GETs on a miss; the S3 client's connection pool is sized to match
+COVERAGE_WORKERS = int(os.environ.get('COVERAGE_FETCH_WORKERS', 16))
+MAX_RANGE_DAYS = 366
+DEFAULT_ZOOM = 14
+# API Gateway caps Lambda responses at 6 MB; larger layers are handed out as presigned URLs
+INLINE_MAX_BYTES = int(os.environ.get('COVERAGE_INLINE_MAX_BYTES', 4 * 1024 * 1024))
+PRESIGNED_URL_TTL_SECONDS = int(os.environ.get('COVERAGE_URL_TTL_SECONDS', 300))
+
+# Same client setup as reports_query: regional SigV4 so presigned URLs work
+# everywhere, path-style against a local stand-in (S3_ENDPOINT_URL)
+region = os.environ.get('AWS_REGION')
+s3_endpoint_url = os.environ.get('S3_ENDPOINT_URL')
+s3 = boto3.client(
+    's3',
+    endpoint_url=s3_endpoint_url or (f"https://s3.{region}.amazonaws.com" if region else None),
+    config=Config(
+        signature_version='s3v4',
+        s3={'addressing_style': 'path' if s3_endpoint_url else 'virtual'},
+        max_pool_connections=COVERAGE_WORKERS
+    )
+)
+bucket_name = os.environ['S3_BUCKET_REPORTS']
+
+dynamodb = boto3.client('dynamodb', endpoint_url=os.environ.get('DYNAMODB_ENDPOINT_URL'))
+flights_table = RawTable(dynamodb, os.environ['DYNAMODB_TABLE_FLIGHTS'])
+
+def validation_error(message):
+    return {
+        'statusCode': 400,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*'
+        },
+        'body': json.dumps({
+            'error': 'ValidationError',
+            'message': message
+        })
+    }
+
+def presigned_response(s3_key, etag, size):
+    """Short-lived GET URL for a layer too large to return through API Gateway"""
+    url = s3.generate_presigned_url(
+        'get_object',
+        Params={'Bucket': bucket_name, 'Key': s3_key},
+        ExpiresIn=PRESIGNED_URL_TTL_SECONDS
+    )
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*',
+            'Cache-Control': 'no-store'
+        },
+        'body': json.dumps({
+            'url': url,
+            'expires_in': PRESIGNED_URL_TTL_SECONDS,
+            'content_type': LAYER_CONTENT_TYPE,
+            'content_length': size,
+            'etag': etag
+        })
+    }
+
+@compressed
+def handler(event, context):
+    """
+    Lambda handler for GET /coverage
+    Query Parameters:
+    - farm_id (required): Farm identifier
+    - from, to (required): Flight dates, YYYY-MM-DD inclusive, at most MAX_RANGE_DAYS
+    - zoom (optional): Map zoom level (default 14); levels outside 10-18 use the nearest one
+
+    Returns one GeoJSON FeatureCollection merging the coverage maps of every
+    flight in the range, simplified for the zoom. Layers are built for all
+    zoom levels on the first request for a range and read from S3 afterwards
+    until the range's flights change; a layer missing unreadable coverage
+    maps (X-Cache: PARTIAL) is rebuilt on the next request. Responses carry
+    the layer's ETag; a matching If-None-Match gets a 304.
+    """
+    try:
+        params = event.get('queryStringParameters') or {}
+        farm_id = params.get('farm_id')
+        if not farm_id:
+            return validation_error('Missing required parameter: farm_id')
+
+        try:
+            start = datetime.strptime(params.get('from', ''), '%Y-%m-%d').date()
+            end = datetime.strptime(params.get('to', ''), '%Y-%m-%d').date()
+        except ValueError:
+            return validation_error('from and to are required. Expected YYYY-MM-DD')
+        if end < start:
+            return validation_error('to must not be before from')
+        if (end - start).days + 1 > MAX_RANGE_DAYS:
+            return validation_error(f'A coverage layer covers at most {MAX_RANGE_DAYS} days')
+
+        try:
+            zoom = int(params.get('zoom', DEFAULT_ZOOM))
+        except ValueError:
+            return validation_error('zoom must be an integer')
+        zoom = min(max(zoom, MIN_ZOOM), MAX_ZOOM)
+
+        # The flight list is a small projected index query; it decides whether the stored layer is current
+        flights = flights_in_range(flights_table, farm_id, start, end)
+        source_fingerprint = fingerprint(flights)
+        key = layer_key(farm_id, start, end, zoom)
+
+        stored = load_stored(s3, bucket_name, key, source_fingerprint)
+        cache_status = 'HIT'
+        if stored is None:
+            cache_status = 'MISS'
+            layers = build_layers(s3, flights, farm_id, start, end, COVERAGE_WORKERS)
+            missing = layers[zoom]['properties']['missing_flights']
+            # Stored (presigned URLs need the object) under a fingerprint the next lookup will not match
+            stored = store_layers(s3, bucket_name, farm_id, start, end, layers, fingerprint(flights, missing))[zoom]
+            print(f"Built coverage layers for {farm_id} {start}..{end}: {len(flights)} flights, "
+                  f"{len(missing)} coverage maps unreadable")
+            if missing:
+                cache_status = 'PARTIAL'
+        body, etag = stored
+
+        closed = range_closed(end) and cache_status != 'PARTIAL'
+        headers = validator_headers(etag, CLOSED_CACHE_CONTROL if closed else OPEN_CACHE_CONTROL)
+        if is_not_modified(event, etag):
+            return not_modified({**headers, 'X-Cache': cache_status})
+
+        size = len(body.encode('utf-8'))
+        if size > INLINE_MAX_BYTES:
+            return presigned_response(key, etag, size)
+
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': LAYER_CONTENT_TYPE,
+                'Access-Control-Allow-Origin': '*',
+                'X-Cache': cache_status,
+                **headers
+            },
+            'body': body
+        }
+
+    except Exception as e:
+        print(f"Error serving coverage layer: {str(e)}")
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({
+                'error': 'InternalServerError',
+                'message': str(e)
+            })
+        }
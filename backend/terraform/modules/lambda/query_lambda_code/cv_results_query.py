@@ -5,19 +5,19 @@ import json
 import os
 import boto3
 from boto3.dynamodb.conditions import Key
-from decimal import Decimal
+from serialization import RawTable, dumps
+from projection import parse_fields, parse_format, projection_kwargs, shape_items
+from compression import compressed
+from conditional import conditional
+from cache import cached
 
-dynamodb = boto3.resource('dynamodb')
+dynamodb = boto3.client('dynamodb')
 table_name = os.environ['DYNAMODB_TABLE_CV']
-table = dynamodb.Table(table_name)
-
-class DecimalEncoder(json.JSONEncoder):
-    """Helper class to convert Decimal to float for JSON serialization"""
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return float(obj)
-        return super(DecimalEncoder, self).default(obj)
+table = RawTable(dynamodb, table_name)
 
+@compressed
+@conditional('end_date')
+@cached('cv_results')
 def handler(event, context):
     """
     Lambda handler for GET /cv-results
@@ -26,6 +26,8 @@ def handler(event, context):
     - start_date (optional): Start timestamp (Unix epoch)
     - end_date (optional): End timestamp (Unix epoch)
     - limit (optional): Maximum number of results (default 100, max 1000)
+    - fields (optional): Comma-separated attributes to return (e.g. timestamp,confidence)
+    - format (optional): rows (default) or columnar (parallel arrays under 'columns')
     """
     
     try:
@@ -49,6 +51,8 @@ def handler(event, context):
         start_date = params.get('start_date')
         end_date = params.get('end_date')
         limit = int(params.get('limit', 100))
+        fields = parse_fields(params.get('fields'))
+        response_format = parse_format(params.get('format'))
         
         # Enforce max limit
         if limit > 1000:
@@ -73,9 +77,13 @@ def handler(event, context):
         elif end_date:
             query_kwargs['KeyConditionExpression'] &= Key('timestamp').lte(int(end_date))
         
+        # Only fetch the requested attributes
+        query_kwargs.update(projection_kwargs(fields))
+        
         # Execute query
         response = table.query(**query_kwargs)
         items = response.get('Items', [])
+        data_key, data = shape_items(items, fields, response_format)
         
         return {
             'statusCode': 200,
@@ -83,10 +91,10 @@ def handler(event, context):
                 'Content-Type': 'application/json',
                 'Access-Control-Allow-Origin': '*'
             },
-            'body': json.dumps({
-                'items': items,
+            'body': dumps({
+                data_key: data,
                 'count': len(items)
-            }, cls=DecimalEncoder)
+            })
         }
     
     except ValueError as e:
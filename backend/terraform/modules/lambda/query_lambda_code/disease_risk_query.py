@@ -0,0 +1,140 @@
+# terraform/modules/lambda/query_lambda_code/disease_risk_query.py
+# Lambda function to read the precomputed hourly disease-risk series per zone
+
+import json
+import os
+import time
+import boto3
+from boto3.dynamodb.conditions import Key
+from pagination import fetch_page
+from serialization import RawTable, dumps
+from projection import parse_fields, parse_format, projection_kwargs, shape_items
+from compression import compressed
+from conditional import conditional
+
+dynamodb = boto3.client('dynamodb')
+table = RawTable(dynamodb, os.environ['DYNAMODB_TABLE_DISEASE_RISK'])
+
+PATH_ZONE = 'zone_key'
+PATH_FARM_INDEX = 'farm_id-hour_start-index'
+
+DEFAULT_WINDOW_SECONDS = 7 * 86400
+# Returned without fields=; the scorer's carried accumulators are left out
+SERIES_FIELDS = [
+    'field_zone', 'hour_start', 'risk_index', 'risk_level', 'weather_score', 'detection_score',
+    'blight_units', 'blight_pressure', 'wet', 'temperature_celsius', 'humidity_percentage',
+    'leaf_wetness_duration_hours', 'images', 'diseased_images', 'diseased_share',
+]
+
+def plan_query(farm_id, field_zone, start_timestamp, end_timestamp):
+    """One zone's series by its key, or every zone of the farm through the farm/hour index"""
+    if field_zone:
+        access_path = PATH_ZONE
+        query_kwargs = {'KeyConditionExpression': Key('zone_key').eq(f"{farm_id}#{field_zone}")}
+    else:
+        access_path = PATH_FARM_INDEX
+        query_kwargs = {
+            'IndexName': PATH_FARM_INDEX,
+            'KeyConditionExpression': Key('farm_id').eq(farm_id)
+        }
+    query_kwargs['KeyConditionExpression'] &= Key('hour_start').between(start_timestamp, end_timestamp)
+    query_kwargs['ScanIndexForward'] = True  # Oldest first, as charted
+    return access_path, query_kwargs
+
+@compressed
+@conditional('end_timestamp')
+def handler(event, context):
+    """
+    Lambda handler for GET /disease-risk
+    Query Parameters:
+    - farm_id (required): Farm identifier
+    - field_zone (optional): One zone's series (default: every zone, interleaved by hour)
+    - start_timestamp (optional): Start timestamp (Unix epoch, default 7 days before end)
+    - end_timestamp (optional): End timestamp (Unix epoch, default now)
+    - limit (optional): Maximum number of rows (default 500, max 1000)
+    - next_token (optional): Continuation token returned by the previous page
+    - fields (optional): Comma-separated attributes to return (default: the series fields)
+    - format (optional): rows (default) or columnar (parallel arrays under 'columns')
+
+    Rows are written hourly by the disease_risk job; hours it has not scored yet are absent.
+    """
+
+    try:
+        params = event.get('queryStringParameters', {}) or {}
+
+        farm_id = params.get('farm_id')
+        if not farm_id:
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({
+                    'error': 'ValidationError',
+                    'message': 'Missing required parameter: farm_id'
+                })
+            }
+
+        field_zone = params.get('field_zone')
+        end_timestamp = int(params.get('end_timestamp') or time.time())
+        start_timestamp = int(params.get('start_timestamp') or end_timestamp - DEFAULT_WINDOW_SECONDS)
+        limit = int(params.get('limit', 500))
+        next_token = params.get('next_token')
+        fields = parse_fields(params.get('fields')) or SERIES_FIELDS
+        response_format = parse_format(params.get('format'))
+
+        # Enforce limit bounds
+        if limit > 1000:
+            limit = 1000
+        if limit < 1:
+            raise ValueError('limit must be a positive integer')
+        # Include the hour the window starts in
+        start_timestamp -= start_timestamp % 3600
+
+        access_path, query_kwargs = plan_query(farm_id, field_zone, start_timestamp, end_timestamp)
+        items, next_token = fetch_page(
+            table.query, {**query_kwargs, **projection_kwargs(fields)}, limit, next_token, scope=access_path
+        )
+        data_key, data = shape_items(items, fields, response_format)
+
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': dumps({
+                data_key: data,
+                'count': len(items),
+                'next_token': next_token,
+                'access_path': access_path
+            })
+        }
+
+    except ValueError as e:
+        return {
+            'statusCode': 400,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({
+                'error': 'ValidationError',
+                'message': f'Invalid parameter format: {str(e)}'
+            })
+        }
+
+    except Exception as e:
+        print(f"Error querying disease risk: {str(e)}")
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({
+                'error': 'InternalServerError',
+                'message': str(e)
+            })
+        }
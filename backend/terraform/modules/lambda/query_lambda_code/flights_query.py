@@ -5,19 +5,95 @@ import json
 import os
 import boto3
 from boto3.dynamodb.conditions import Key, Attr
-from decimal import Decimal
+from botocore.exceptions import ClientError
+from pagination import fetch_page, cursor_scope
+from serialization import RawTable, dumps
+from compression import compressed
 
-dynamodb = boto3.resource('dynamodb')
+dynamodb = boto3.client('dynamodb')
 table_name = os.environ['DYNAMODB_TABLE_FLIGHTS']
-table = dynamodb.Table(table_name)
+table = RawTable(dynamodb, table_name)
 
-class DecimalEncoder(json.JSONEncoder):
-    """Helper class to convert Decimal to float for JSON serialization"""
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return float(obj)
-        return super(DecimalEncoder, self).default(obj)
+# Access paths, narrowest first
+PATH_DRONE_INDEX = 'drone_id-flight_start-index'
+PATH_DATE_INDEX = 'flight_date-index'
+PATH_FARM_INDEX = 'farm_id-flight_start-index'
+PATH_SCAN = 'scan'
 
+def time_condition(condition, start_timestamp, end_timestamp, attribute='flight_start'):
+    """Build a flight_start window with Key (key conditions) or Attr (filters)"""
+    if start_timestamp and end_timestamp:
+        return condition(attribute).between(int(start_timestamp), int(end_timestamp))
+    elif start_timestamp:
+        return condition(attribute).gte(int(start_timestamp))
+    elif end_timestamp:
+        return condition(attribute).lte(int(end_timestamp))
+    return None
+
+def combine(filters):
+    """AND filter conditions together; None when there are none"""
+    filters = [condition for condition in filters if condition is not None]
+    if not filters:
+        return None
+    expression = filters[0]
+    for extra in filters[1:]:
+        expression &= extra
+    return expression
+
+def equals(attribute, value):
+    return Attr(attribute).eq(value) if value else None
+
+def plan_query(farm_id, drone_id, flight_date, start_timestamp, end_timestamp):
+    """
+    Choose the narrowest access path for the request: a drone's flights, then
+    one day's flights, then a farm's flights, else a filtered scan. Parameters
+    the chosen key does not cover become filters, which fetch_page applies
+    while it keeps reading until the page is full.
+    Returns (access_path, operation, request_kwargs) for fetch_page.
+    """
+    if drone_id:
+        access_path = PATH_DRONE_INDEX
+        key_condition = Key('drone_id').eq(drone_id)
+        filters = [equals('farm_id', farm_id), equals('flight_date', flight_date)]
+    elif flight_date:
+        # flight_date-index has no sort key: the time window is a filter there
+        access_path = PATH_DATE_INDEX
+        key_condition = Key('flight_date').eq(flight_date)
+        filters = [equals('farm_id', farm_id), time_condition(Attr, start_timestamp, end_timestamp)]
+    elif farm_id:
+        access_path = PATH_FARM_INDEX
+        key_condition = Key('farm_id').eq(farm_id)
+        filters = []
+    else:
+        return PATH_SCAN, table.scan, scan_kwargs(farm_id, drone_id, flight_date, start_timestamp, end_timestamp)
+
+    if access_path != PATH_DATE_INDEX:
+        window = time_condition(Key, start_timestamp, end_timestamp)
+        if window is not None:
+            key_condition &= window
+
+    query_kwargs = {
+        'IndexName': access_path,
+        'KeyConditionExpression': key_condition,
+        'ScanIndexForward': False  # Most recent first (ignored without a sort key)
+    }
+    filter_expression = combine(filters)
+    if filter_expression is not None:
+        query_kwargs['FilterExpression'] = filter_expression
+
+    return access_path, table.query, query_kwargs
+
+def scan_kwargs(farm_id, drone_id, flight_date, start_timestamp, end_timestamp):
+    """Filtered scan; only used when no index covers the request"""
+    filter_expression = combine([
+        equals('farm_id', farm_id),
+        equals('drone_id', drone_id),
+        equals('flight_date', flight_date),
+        time_condition(Attr, start_timestamp, end_timestamp),
+    ])
+    return {'FilterExpression': filter_expression} if filter_expression is not None else {}
+
+@compressed
 def handler(event, context):
     """
     Lambda handler for GET /flights
@@ -25,7 +101,9 @@ def handler(event, context):
     - farm_id (optional): Farm identifier
     - drone_id (optional): Drone identifier
     - flight_date (optional): Flight date (YYYY-MM-DD)
+    - from / to (optional): flight_start window (Unix epoch, inclusive)
     - limit (optional): Maximum number of results (default 50, max 1000)
+    - next_token (optional): Continuation token from a previous response
     """
     
     try:
@@ -35,60 +113,47 @@ def handler(event, context):
         farm_id = params.get('farm_id')
         drone_id = params.get('drone_id')
         flight_date = params.get('flight_date')
+        start_timestamp = params.get('from')
+        end_timestamp = params.get('to')
         limit = int(params.get('limit', 50))
+        next_token = params.get('next_token')
         
-        # Enforce max limit
+        # Enforce limit bounds
         if limit > 1000:
             limit = 1000
+        if limit < 1:
+            raise ValueError('limit must be a positive integer')
+        if start_timestamp and end_timestamp and int(start_timestamp) > int(end_timestamp):
+            raise ValueError('from must not be after to')
         
-        if flight_date:
-            # Query using flight_date-index GSI
-            query_kwargs = {
-                'IndexName': 'flight_date-index',
-                'KeyConditionExpression': Key('flight_date').eq(flight_date),
-                'Limit': limit
-            }
-            
-            response = table.query(**query_kwargs)
-            items = response.get('Items', [])
-            
-            # Filter by farm_id or drone_id if provided
-            if farm_id:
-                items = [item for item in items if item.get('farm_id') == farm_id]
-            if drone_id:
-                items = [item for item in items if item.get('drone_id') == drone_id]
+        access_path, operation, request_kwargs = plan_query(
+            farm_id, drone_id, flight_date, start_timestamp, end_timestamp
+        )
         
-        elif farm_id or drone_id:
-            # Scan with filter (less efficient)
-            scan_kwargs = {
-                'Limit': limit
-            }
-            
-            filter_expressions = []
-            if farm_id:
-                filter_expressions.append(Attr('farm_id').eq(farm_id))
-            if drone_id:
-                filter_expressions.append(Attr('drone_id').eq(drone_id))
-            
-            # Combine filters
-            if len(filter_expressions) == 1:
-                scan_kwargs['FilterExpression'] = filter_expressions[0]
-            else:
-                scan_kwargs['FilterExpression'] = filter_expressions[0] & filter_expressions[1]
-            
-            response = table.scan(**scan_kwargs)
-            items = response.get('Items', [])
+        # A token issued by the scan fallback keeps paging on the scan
+        if access_path != PATH_SCAN and cursor_scope(next_token) == PATH_SCAN:
+            access_path = PATH_SCAN
+            operation = table.scan
+            request_kwargs = scan_kwargs(farm_id, drone_id, flight_date, start_timestamp, end_timestamp)
         
-        else:
-            # Return all recent flights (limited scan)
-            scan_kwargs = {
-                'Limit': limit
-            }
-            response = table.scan(**scan_kwargs)
-            items = response.get('Items', [])
+        try:
+            items, next_token = fetch_page(operation, request_kwargs, limit, next_token, scope=access_path)
+        except ClientError as e:
+            if access_path == PATH_SCAN or e.response['Error']['Code'] != 'ValidationException':
+                raise
+            # Index missing or still backfilling: fall back to a filtered scan
+            print(f"Index {access_path} unavailable, falling back to scan: {str(e)}")
+            access_path = PATH_SCAN
+            items, next_token = fetch_page(
+                table.scan,
+                scan_kwargs(farm_id, drone_id, flight_date, start_timestamp, end_timestamp),
+                limit,
+                scope=access_path
+            )
         
-        # Sort by flight_start descending
-        items.sort(key=lambda x: x.get('flight_start', 0), reverse=True)
+        if access_path in (PATH_SCAN, PATH_DATE_INDEX):
+            # No flight_start sort key on these paths; present each page newest first
+            items.sort(key=lambda x: x.get('flight_start', 0), reverse=True)
         
         return {
             'statusCode': 200,
@@ -96,10 +161,12 @@ def handler(event, context):
                 'Content-Type': 'application/json',
                 'Access-Control-Allow-Origin': '*'
             },
-            'body': json.dumps({
+            'body': dumps({
                 'items': items,
-                'count': len(items)
-            }, cls=DecimalEncoder)
+                'count': len(items),
+                'next_token': next_token,
+                'access_path': access_path
+            })
         }
     
     except ValueError as e:
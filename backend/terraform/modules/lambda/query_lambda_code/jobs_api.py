@@ -0,0 +1,274 @@
+# terraform/modules/lambda/query_lambda_code/jobs_api.py
+# Lambda function for flight-level classification jobs: POST /jobs, GET /jobs/{job_id}
+#
+# Submitting a flight enumerates its images, records a job in the jobs table
+# and fans the images out in chunks through a queue (SQS; scripts/jobs swaps
+# in a local queue). cv_inference_code/jobs_worker.py classifies each chunk,
+# streams the results into cv_results and checkpoints the chunk on the job.
+#
+# One job exists per (flight_id, model_version). Resubmitting returns the
+# running or finished job; rerun=true starts a new run of it, and workers
+# skip images this model version has already classified. A run whose chunks
+# could not all be enqueued is marked failed, and the next submission
+# restarts it without rerun.
+
+import hashlib
+import json
+import os
+import re
+import time
+from datetime import datetime, timezone
+
+import boto3
+from botocore.exceptions import ClientError
+
+dynamodb = boto3.resource('dynamodb', endpoint_url=os.environ.get('DYNAMODB_ENDPOINT_URL'))
+jobs_table = dynamodb.Table(os.environ['DYNAMODB_TABLE_JOBS'])
+flights_table = dynamodb.Table(os.environ['DYNAMODB_TABLE_FLIGHTS'])
+s3 = boto3.client('s3', endpoint_url=os.environ.get('S3_ENDPOINT_URL'))
+images_bucket = os.environ['S3_BUCKET_IMAGES']
+
+MODEL_VERSION = os.environ.get('MODEL_VERSION', 'yolov8-nano-v1.0')
+JOB_CHUNK_IMAGES = int(os.environ.get('JOB_CHUNK_IMAGES', 32))
+JOB_TTL_SECONDS = int(os.environ.get('JOB_TTL_SECONDS', 30 * 86400))
+ACTIVE_STATUSES = ('queued', 'running')
+# Set when enqueueing a run's chunks fails; such a job is restarted on resubmission
+FAILED_STATUS = 'failed'
+
+# Same layout as cv_inference_code/records.py: {farm_id}/{date}/{category}/{drone_id}/{HHMMSS}.jpg
+IMAGE_KEY = re.compile(
+    r'^(?P<farm_id>[^/]+)/(?P<date>\d{4}-\d{2}-\d{2})/(?P<category>[^/]+)/(?P<drone_id>[^/]+)/(?P<name>[^/]+)\.(?:jpe?g|png)$',
+    re.IGNORECASE
+)
+CAPTURE_TIME = re.compile(r'^(\d{2})(\d{2})(\d{2})(?:_|$)')
+
+
+class SqsQueue:
+    """Chunk messages to the jobs queue, ten per SendMessageBatch"""
+
+    def __init__(self, queue_url, client=None):
+        self.queue_url = queue_url
+        self.client = client or boto3.client('sqs')
+
+    def send(self, messages):
+        for offset in range(0, len(messages), 10):
+            entries = [
+                {'Id': str(n), 'MessageBody': json.dumps(message)}
+                for n, message in enumerate(messages[offset:offset + 10])
+            ]
+            response = self.client.send_message_batch(QueueUrl=self.queue_url, Entries=entries)
+            if response.get('Failed'):
+                raise RuntimeError(f"Could not enqueue {len(response['Failed'])} job chunks")
+
+
+queue = SqsQueue(os.environ['JOBS_QUEUE_URL']) if os.environ.get('JOBS_QUEUE_URL') else None
+
+
+def response(status_code, body):
+    return {
+        'statusCode': status_code,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*'
+        },
+        'body': json.dumps(body)
+    }
+
+
+def validation_error(message):
+    return response(400, {'error': 'ValidationError', 'message': message})
+
+
+def job_id_for(flight_id, model_version):
+    return 'job_' + hashlib.sha256(f"{flight_id}|{model_version}".encode('utf-8')).hexdigest()[:20]
+
+
+def capture_time(match):
+    """
+    Epoch seconds of an image from its date folder and HHMMSS[_suffix] name, or None
+    when the name is not a valid time (validated as records.image_timestamp
+    does, so enumeration and the worker agree on which names carry a time)
+    """
+    time_match = CAPTURE_TIME.match(match['name'])
+    if not time_match:
+        return None
+    hours, minutes, seconds = (int(part) for part in time_match.groups())
+    if not (hours < 24 and minutes < 60 and seconds < 60):
+        return None
+    day = datetime.strptime(match['date'], '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    return int(day.timestamp()) + hours * 3600 + minutes * 60 + seconds
+
+
+def flight_images(flight):
+    """
+    Keys of the flight's images: the drone's images under the farm's date
+    prefix, captured between flight_start and flight_end when the file name
+    carries the capture time
+    """
+    start, end = int(flight['flight_start']), int(flight['flight_end'])
+    keys = []
+    paginator = s3.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=images_bucket, Prefix=f"{flight['farm_id']}/{flight['flight_date']}/"):
+        for obj in page.get('Contents', []):
+            match = IMAGE_KEY.match(obj['Key'])
+            if not match or match['drone_id'] != flight['drone_id']:
+                continue
+            captured = capture_time(match)
+            if captured is None or start <= captured <= end:
+                keys.append(obj['Key'])
+    return sorted(keys)
+
+
+def job_view(job):
+    """Public progress of a job; images_per_second over the time workers have been running it"""
+    total = int(job.get('total_images', 0))
+    completed = int(job.get('completed', 0))
+    failed = int(job.get('failed', 0))
+    skipped = int(job.get('skipped', 0))
+    started_at = job.get('started_at')
+    elapsed = (int(job.get('finished_at') or job.get('updated_at') or started_at or 0) - int(started_at)) if started_at else 0
+    return {
+        'job_id': job['job_id'],
+        'flight_id': job['flight_id'],
+        'farm_id': job['farm_id'],
+        'model_version': job['model_version'],
+        'status': job['status'],
+        'run': int(job['run']),
+        'total_images': total,
+        'completed': completed,
+        'failed': failed,
+        'skipped': skipped,
+        'progress_percentage': round((completed + failed + skipped) / total * 100, 1) if total else 100.0,
+        'chunks_total': int(job['chunks_total']),
+        'chunks_done': int(job.get('chunks_done', 0)),
+        'images_per_second': round(completed / elapsed, 2) if elapsed > 0 else None,
+        'created_at': int(job['created_at']),
+        'started_at': int(started_at) if started_at else None,
+        'finished_at': int(job['finished_at']) if job.get('finished_at') else None,
+        'error': job.get('error'),
+    }
+
+
+def start_run(job_id, flight, keys, previous):
+    """
+    Write the job for a new run (run 1, or previous run + 1) and enqueue its
+    chunks. The conditional put keeps two submissions from starting runs at once.
+    """
+    if queue is None:
+        raise RuntimeError('JOBS_QUEUE_URL is not configured')
+    run = int(previous['run']) + 1 if previous else 1
+    now = int(time.time())
+    chunks = [keys[offset:offset + JOB_CHUNK_IMAGES] for offset in range(0, len(keys), JOB_CHUNK_IMAGES)]
+    job = {
+        'job_id': job_id,
+        'flight_id': flight['flight_id'],
+        'farm_id': flight['farm_id'],
+        'drone_id': flight['drone_id'],
+        'flight_date': flight['flight_date'],
+        'model_version': MODEL_VERSION,
+        'status': 'queued' if chunks else 'completed',
+        'run': run,
+        'total_images': len(keys),
+        'chunks_total': len(chunks),
+        'chunks_done': 0,
+        'completed': 0,
+        'failed': 0,
+        'skipped': 0,
+        'created_at': now,
+        'updated_at': now,
+        'expires_at': now + JOB_TTL_SECONDS,
+    }
+    if not chunks:
+        job['finished_at'] = now
+
+    condition = 'attribute_not_exists(job_id)' if previous is None else '#run = :previous_run'
+    put_kwargs = {'Item': job, 'ConditionExpression': condition}
+    if previous is not None:
+        put_kwargs['ExpressionAttributeNames'] = {'#run': 'run'}
+        put_kwargs['ExpressionAttributeValues'] = {':previous_run': previous['run']}
+    jobs_table.put_item(**put_kwargs)
+
+    try:
+        queue.send([
+            {'job_id': job_id, 'run': run, 'chunk': str(index), 'farm_id': flight['farm_id'], 'keys': chunk}
+            for index, chunk in enumerate(chunks)
+        ])
+    except Exception as e:
+        # Without all its chunks the run would stay queued forever: fail it so it can be resubmitted
+        fail_run(job_id, run, f"Enqueueing chunks failed: {str(e)}")
+        raise
+    return job
+
+
+def fail_run(job_id, run, error):
+    """Mark a run failed; chunks of it that did reach the queue are skipped by the workers"""
+    now = int(time.time())
+    try:
+        jobs_table.update_item(
+            Key={'job_id': job_id},
+            UpdateExpression='SET #status = :failed, #error = :error, finished_at = :now, updated_at = :now',
+            ConditionExpression='#run = :run',
+            ExpressionAttributeNames={'#status': 'status', '#error': 'error', '#run': 'run'},
+            ExpressionAttributeValues={':failed': FAILED_STATUS, ':error': error, ':now': now, ':run': run}
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+
+
+def submit(event):
+    try:
+        body = json.loads(event.get('body') or '{}')
+    except ValueError:
+        return validation_error('Request body must be JSON')
+    flight_id = body.get('flight_id') if isinstance(body, dict) else None
+    if not flight_id:
+        return validation_error('Missing required field: flight_id')
+
+    flight = flights_table.get_item(Key={'flight_id': flight_id}).get('Item')
+    if not flight:
+        return response(404, {'error': 'NotFound', 'message': f'Flight {flight_id} not found'})
+
+    job_id = job_id_for(flight_id, MODEL_VERSION)
+    previous = jobs_table.get_item(Key={'job_id': job_id}, ConsistentRead=True).get('Item')
+    restart = body.get('rerun') or (previous and previous['status'] == FAILED_STATUS)
+    if previous and (previous['status'] in ACTIVE_STATUSES or not restart):
+        # Idempotent resubmission: hand back the job as it stands
+        return response(200 if previous['status'] not in ACTIVE_STATUSES else 202, job_view(previous))
+
+    try:
+        job = start_run(job_id, flight, flight_images(flight), previous)
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+        # A concurrent submission started the run first
+        job = jobs_table.get_item(Key={'job_id': job_id}, ConsistentRead=True)['Item']
+    return response(202, job_view(job))
+
+
+def status(job_id):
+    job = jobs_table.get_item(Key={'job_id': job_id}).get('Item')
+    if not job:
+        return response(404, {'error': 'NotFound', 'message': f'Job {job_id} not found'})
+    return response(200, job_view(job))
+
+
+def handler(event, context):
+    """
+    Lambda handler for flight classification jobs
+    - POST /jobs, body {"flight_id": ..., "rerun": false}: 202 with the queued
+      job (200 with the existing one when it already ran and rerun is not set;
+      a job that failed to enqueue is restarted either way)
+    - GET /jobs/{job_id}: completed/failed/skipped counts, progress and images/sec
+    """
+    try:
+        path_params = event.get('pathParameters') or {}
+        if path_params.get('job_id'):
+            return status(path_params['job_id'])
+        if event.get('requestContext', {}).get('http', {}).get('method', 'POST') == 'POST':
+            return submit(event)
+        return validation_error('Missing required path parameter: job_id')
+
+    except Exception as e:
+        print(f"Error handling job request: {str(e)}")
+        return response(500, {'error': 'InternalServerError', 'message': str(e)})
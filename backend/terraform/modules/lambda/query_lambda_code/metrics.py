@@ -0,0 +1,28 @@
+# terraform/modules/lambda/query_lambda_code/metrics.py
+# CloudWatch Embedded Metric Format helpers shared by the query Lambdas
+
+import json
+import os
+import time
+
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'AgriDrone/QueryAPI')
+
+
+def emit(metrics, **dimensions):
+    """
+    Log one EMF line; CloudWatch extracts the metrics from the log, so there is
+    no PutMetricData call on the request path.
+    metrics: {name: (value, unit)}
+    """
+    print(json.dumps({
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': METRICS_NAMESPACE,
+                'Dimensions': [list(dimensions)],
+                'Metrics': [{'Name': name, 'Unit': unit} for name, (_, unit) in metrics.items()],
+            }],
+        },
+        **dimensions,
+        **{name: value for name, (value, _) in metrics.items()},
+    }))
@@ -0,0 +1,92 @@
+# terraform/modules/lambda/query_lambda_code/pagination.py
+# Cursor-based pagination helpers shared by the query Lambdas
+
+import base64
+import json
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+# Upper bound on DynamoDB round trips per request so that a filtered scan over
+# sparse data returns a partial page plus a token instead of running into the
+# Lambda timeout
+MAX_PAGES_PER_REQUEST = 10
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def encode_cursor(last_evaluated_key, scope=None):
+    """Encode a DynamoDB LastEvaluatedKey (and the access path it belongs to) as an opaque, URL-safe token"""
+    if not last_evaluated_key:
+        return None
+
+    # Typed DynamoDB JSON keeps number/string key types intact on the round trip
+    payload = {'k': {name: _serializer.serialize(value) for name, value in last_evaluated_key.items()}}
+    if scope:
+        payload['s'] = scope
+    raw = json.dumps(payload, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _load_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return payload['k'], payload.get('s')
+    except Exception:
+        raise ValueError('next_token is malformed or expired')
+
+
+def cursor_scope(token):
+    """Return the access path a continuation token was issued for (None if unscoped)"""
+    if not token:
+        return None
+    return _load_cursor(token)[1]
+
+
+def decode_cursor(token, scope=None):
+    """Decode a continuation token back into an ExclusiveStartKey"""
+    if not token:
+        return None
+
+    wire_key, token_scope = _load_cursor(token)
+    if token_scope != scope:
+        raise ValueError('next_token does not belong to this query')
+    try:
+        return {name: _deserializer.deserialize(value) for name, value in wire_key.items()}
+    except Exception:
+        raise ValueError('next_token is malformed or expired')
+
+
+def fetch_page(operation, request_kwargs, limit, next_token=None, scope=None,
+               max_pages=MAX_PAGES_PER_REQUEST):
+    """
+    Assemble one page of up to `limit` items by following LastEvaluatedKey.
+
+    operation: bound table.query or table.scan
+    request_kwargs: query/scan arguments without Limit/ExclusiveStartKey
+    scope: access path label embedded in the token so it cannot be replayed elsewhere
+    Returns (items, next_token); next_token is None once the result set is exhausted.
+    """
+    kwargs = dict(request_kwargs)
+    start_key = decode_cursor(next_token, scope)
+    items = []
+    pages = 0
+
+    while True:
+        # Only ask DynamoDB for what is still missing so the returned
+        # LastEvaluatedKey lines up exactly with the last item we hand back
+        kwargs['Limit'] = limit - len(items)
+        if start_key:
+            kwargs['ExclusiveStartKey'] = start_key
+        else:
+            kwargs.pop('ExclusiveStartKey', None)
+
+        response = operation(**kwargs)
+        items.extend(response.get('Items', []))
+        start_key = response.get('LastEvaluatedKey')
+        pages += 1
+
+        if not start_key or len(items) >= limit or pages >= max_pages:
+            break
+
+    return items, encode_cursor(start_key, scope)
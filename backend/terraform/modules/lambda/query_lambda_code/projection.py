@@ -0,0 +1,84 @@
+# terraform/modules/lambda/query_lambda_code/projection.py
+# fields= projection and format=columnar response shaping shared by the query Lambdas
+
+import re
+
+FORMATS = ('rows', 'columnar')
+
+_NAME_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def parse_fields(value):
+    """
+    fields= query parameter (comma-separated, dotted paths for nested maps,
+    e.g. timestamp,NPK_values.nitrogen) as a list; None returns full items.
+    """
+    if not value:
+        return None
+    fields = list(dict.fromkeys(f.strip() for f in value.split(',') if f.strip()))
+    if not fields:
+        return None
+    for field in fields:
+        if not all(_NAME_PATTERN.match(part) for part in field.split('.')):
+            raise ValueError(f'invalid field name: {field}')
+    return fields
+
+
+def parse_format(value):
+    """format= query parameter: rows (list of items, default) or columnar (parallel arrays)"""
+    response_format = value or 'rows'
+    if response_format not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    return response_format
+
+
+def projection_kwargs(fields):
+    """
+    ProjectionExpression for query/scan kwargs. Every name goes through a
+    placeholder so reserved words (status, timestamp) are safe; placeholders
+    use their own prefix so they never clash with condition placeholders.
+    """
+    if not fields:
+        return {}
+    placeholders = {}
+    paths = []
+    for field in fields:
+        parts = []
+        for name in field.split('.'):
+            if name not in placeholders:
+                placeholders[name] = f"#f{len(placeholders)}"
+            parts.append(placeholders[name])
+        paths.append('.'.join(parts))
+    return {
+        'ProjectionExpression': ', '.join(paths),
+        'ExpressionAttributeNames': {placeholder: name for name, placeholder in placeholders.items()},
+    }
+
+
+def _lookup(item, field):
+    value = item
+    for name in field.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(name)
+    return value
+
+
+def columnar(items, fields=None):
+    """Parallel arrays keyed by field (missing values are None); without fields, every attribute seen"""
+    if fields is None:
+        fields = list(dict.fromkeys(name for item in items for name in item))
+    columns = {}
+    for field in fields:
+        if '.' in field:
+            columns[field] = [_lookup(item, field) for item in items]
+        else:
+            columns[field] = [item.get(field) for item in items]
+    return columns
+
+
+def shape_items(items, fields, response_format):
+    """The body's data entry: ('items', rows) or ('columns', parallel arrays)"""
+    if response_format == 'columnar':
+        return 'columns', columnar(items, fields)
+    return 'items', items
@@ -0,0 +1,159 @@
+# terraform/modules/lambda/query_lambda_code/report_bundle.py
+# Multi-day report bundles: list a farm's daily reports, fetch them concurrently,
+# and merge them into one JSON document or zip archive
+#
+# Only JSON documents are built in memory, and only for ranges whose indexed
+# sizes fit in a response. Zip archives are assembled on local disk: reports
+# are streamed to files and from there into the archive, so memory holds a
+# chunk per download whatever the range's size.
+#
+# Every function takes the S3 client explicitly so the bundle can be built
+# against a local S3 stand-in (MinIO, moto server) via S3_ENDPOINT_URL.
+
+import json
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from botocore.exceptions import ClientError
+
+# Report format -> (file extension, content type); keys are
+# daily/{farm_id}/{YYYY}/{MM}/{YYYY-MM-DD}_daily_report.{ext}
+REPORT_FORMATS = {
+    'markdown': ('md', 'text/markdown'),
+    'json': ('json', 'application/json'),
+    'pdf': ('pdf', 'application/pdf'),
+}
+
+REPORT_SUFFIX = '_daily_report'
+DOWNLOAD_CHUNK_BYTES = 256 * 1024
+
+
+def report_key(farm_id, day, report_format):
+    """S3 key of one daily report (day is a date or datetime)"""
+    extension = REPORT_FORMATS[report_format][0]
+    return f"daily/{farm_id}/{day:%Y}/{day:%m}/{day:%Y-%m-%d}{REPORT_SUFFIX}.{extension}"
+
+
+def days_between(start, end):
+    """Every date from start to end inclusive"""
+    return [start + timedelta(days=n) for n in range((end - start).days + 1)]
+
+
+def month_prefixes(farm_id, start, end):
+    """daily/{farm_id}/{YYYY}/{MM}/ for every month the range touches"""
+    prefixes = []
+    for day in days_between(start, end):
+        prefix = f"daily/{farm_id}/{day:%Y}/{day:%m}/"
+        if not prefixes or prefixes[-1] != prefix:
+            prefixes.append(prefix)
+    return prefixes
+
+
+def list_reports(client, bucket, farm_id, start, end, report_format):
+    """
+    {date string: {'key', 'size'}} for the reports that exist in the range,
+    one paginated LIST per month prefix instead of a GET per day
+    """
+    wanted = {report_key(farm_id, day, report_format): f"{day:%Y-%m-%d}" for day in days_between(start, end)}
+    found = {}
+    paginator = client.get_paginator('list_objects_v2')
+    for prefix in month_prefixes(farm_id, start, end):
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                if obj['Key'] in wanted:
+                    found[wanted[obj['Key']]] = {'key': obj['Key'], 'size': obj['Size']}
+    return found
+
+
+def bundle_size(reports):
+    """Total bytes of {date string: {'key', 'size'}} reports, known before any is fetched"""
+    return sum(int(report.get('size') or 0) for report in reports.values())
+
+
+def is_missing(error):
+    """A report that was indexed or listed but deleted before it was fetched"""
+    return error.response['Error']['Code'] in ('NoSuchKey', '404')
+
+
+def fetch_reports(client, bucket, keys, max_workers):
+    """
+    {date string: bytes} fetched through a bounded pool sharing one (thread-safe)
+    client; a report deleted since it was listed is left out, so its day is missing
+    """
+    def fetch(item):
+        date_str, key = item
+        try:
+            return date_str, client.get_object(Bucket=bucket, Key=key)['Body'].read()
+        except ClientError as e:
+            if not is_missing(e):
+                raise
+            return date_str, None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(keys)))) as pool:
+        return {date_str: data for date_str, data in pool.map(fetch, sorted(keys.items())) if data is not None}
+
+
+def download_reports(client, bucket, keys, directory, max_workers):
+    """{date string: path} of the reports streamed into files under directory through a bounded pool, as fetch_reports"""
+    def download(item):
+        date_str, key = item
+        try:
+            body = client.get_object(Bucket=bucket, Key=key)['Body']
+        except ClientError as e:
+            if not is_missing(e):
+                raise
+            return date_str, None
+        path = os.path.join(directory, date_str)
+        with open(path, 'wb') as f:
+            for chunk in body.iter_chunks(DOWNLOAD_CHUNK_BYTES):
+                f.write(chunk)
+        return date_str, path
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(keys)))) as pool:
+        return {date_str: path for date_str, path in pool.map(download, sorted(keys.items())) if path is not None}
+
+
+def merged_document(farm_id, start, end, report_format, contents):
+    """One JSON document: reports by date (json reports embedded as objects), missing days listed"""
+    reports = {}
+    for date_str, data in sorted(contents.items()):
+        text = data.decode('utf-8')
+        reports[date_str] = json.loads(text) if report_format == 'json' else text
+    return {
+        'farm_id': farm_id,
+        'from': f"{start:%Y-%m-%d}",
+        'to': f"{end:%Y-%m-%d}",
+        'format': report_format,
+        'count': len(reports),
+        'reports': reports,
+        'missing': missing_days(start, end, contents),
+    }
+
+
+def zip_archive(fileobj, farm_id, start, end, report_format, paths):
+    """
+    Zip of the downloaded reports ({date string: path}) plus a manifest.json
+    listing included and missing days, written to fileobj; each report file
+    is removed once it is in the archive
+    """
+    extension = REPORT_FORMATS[report_format][0]
+    # PDFs are already compressed
+    compress_type = zipfile.ZIP_STORED if report_format == 'pdf' else zipfile.ZIP_DEFLATED
+    with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for date_str, path in sorted(paths.items()):
+            archive.write(path, f"{date_str}{REPORT_SUFFIX}.{extension}", compress_type=compress_type)
+            os.remove(path)
+        archive.writestr('manifest.json', json.dumps({
+            'farm_id': farm_id,
+            'from': f"{start:%Y-%m-%d}",
+            'to': f"{end:%Y-%m-%d}",
+            'format': report_format,
+            'included': sorted(paths),
+            'missing': missing_days(start, end, paths),
+        }, indent=2))
+
+
+def missing_days(start, end, contents):
+    return [f"{day:%Y-%m-%d}" for day in days_between(start, end) if f"{day:%Y-%m-%d}" not in contents]
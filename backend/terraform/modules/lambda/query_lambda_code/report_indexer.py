@@ -0,0 +1,67 @@
+# terraform/modules/lambda/query_lambda_code/report_indexer.py
+# S3 event consumer keeping the reports bucket's monthly manifests current
+
+import os
+from collections import defaultdict
+from urllib.parse import unquote_plus
+
+import boto3
+from botocore.config import Config
+
+from report_manifest import parse_report_key, update_manifest
+
+# S3_ENDPOINT_URL points the function at a local S3 stand-in (MinIO, moto server)
+s3_endpoint_url = os.environ.get('S3_ENDPOINT_URL')
+s3 = boto3.client(
+    's3',
+    endpoint_url=s3_endpoint_url,
+    config=Config(s3={'addressing_style': 'path' if s3_endpoint_url else 'virtual'})
+)
+
+
+def group_events(records):
+    """
+    {(bucket, farm_id, year, month): [(key, event_name, size, etag, last_modified, sequencer)]}
+    for the records that touch daily reports; anything else in the bucket is ignored
+    """
+    groups = defaultdict(list)
+    for record in records:
+        s3_info = record.get('s3', {})
+        obj = s3_info.get('object', {})
+        # Keys arrive URL-encoded (spaces as '+')
+        key = unquote_plus(obj.get('key', ''))
+        parsed = parse_report_key(key)
+        if parsed is None:
+            continue
+        farm_id, year, month, _, _ = parsed
+        groups[(s3_info['bucket']['name'], farm_id, year, month)].append((
+            key,
+            record['eventName'],
+            obj.get('size'),
+            obj.get('eTag'),
+            record.get('eventTime'),
+            obj.get('sequencer'),
+        ))
+    return groups
+
+
+def handler(event, context):
+    """
+    Lambda handler for s3:ObjectCreated:* / s3:ObjectRemoved:* on daily/.
+    Each month's manifest is updated once per invocation however many of its
+    reports the batch touches. Any failure is re-raised after the other months
+    are done, so the async retry replays the batch (updates are idempotent).
+    """
+    groups = group_events(event.get('Records', []))
+    failed = []
+    for (bucket, farm_id, year, month), events in groups.items():
+        try:
+            applied = update_manifest(s3, bucket, farm_id, year, month, events)
+            print(f"Indexed {applied}/{len(events)} report events for {farm_id} {year:04d}-{month:02d}")
+        except Exception as e:
+            print(f"Error updating manifest for {farm_id} {year:04d}-{month:02d}: {str(e)}")
+            failed.append(f"{farm_id} {year:04d}-{month:02d}")
+
+    if failed:
+        raise RuntimeError(f"Manifest updates failed for: {', '.join(failed)}")
+    return {'indexed': sum(len(events) for events in groups.values())}
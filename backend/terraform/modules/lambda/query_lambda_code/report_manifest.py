@@ -0,0 +1,213 @@
+# terraform/modules/lambda/query_lambda_code/report_manifest.py
+# Per-farm, per-month index of the daily reports in the reports bucket
+#
+# manifests/{farm_id}/{YYYY}/{MM}.json records, for every day with a report,
+# each format's key, size, ETag and last-modified time. It is maintained by
+# report_indexer.py from the bucket's object events, so "which reports exist"
+# is answered with one small GET instead of LIST calls or 404 probes.
+
+import json
+import re
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from botocore.exceptions import ClientError
+
+from report_bundle import REPORT_FORMATS, REPORT_SUFFIX, list_reports
+
+MANIFEST_PREFIX = 'manifests/'
+MANIFEST_VERSION = 1
+
+# Optimistic-concurrency retries when two report writes race on one manifest
+MAX_UPDATE_ATTEMPTS = 8
+
+_EXTENSION_FORMATS = {extension: report_format for report_format, (extension, _) in REPORT_FORMATS.items()}
+_REPORT_KEY = re.compile(
+    r'^daily/(?P<farm_id>[^/]+)/(?P<year>\d{4})/(?P<month>\d{2})/'
+    r'(?P<date>\d{4}-\d{2}-\d{2})' + re.escape(REPORT_SUFFIX) + r'\.(?P<extension>\w+)$'
+)
+
+
+def manifest_key(farm_id, year, month):
+    return f"{MANIFEST_PREFIX}{farm_id}/{int(year):04d}/{int(month):02d}.json"
+
+
+def parse_report_key(key):
+    """(farm_id, year, month, date string, format) of a daily report key, or None"""
+    match = _REPORT_KEY.match(key)
+    if not match or match['extension'] not in _EXTENSION_FORMATS:
+        return None
+    return (match['farm_id'], int(match['year']), int(match['month']),
+            match['date'], _EXTENSION_FORMATS[match['extension']])
+
+
+def quoted_etag(etag):
+    """S3 events carry bare ETags, HeadObject quoted ones; the manifest stores what HeadObject returns"""
+    etag = (etag or '').strip('"')
+    return f'"{etag}"' if etag else None
+
+
+def empty_manifest(farm_id, year, month):
+    return {
+        'version': MANIFEST_VERSION,
+        'farm_id': farm_id,
+        'month': f"{int(year):04d}-{int(month):02d}",
+        'updated_at': None,
+        'reports': {},
+        # key -> sequencer of its last delete, so a late-delivered older create is not resurrected
+        'removed': {},
+    }
+
+
+def load_manifest(client, bucket, farm_id, year, month):
+    """(manifest, ETag) or (None, None) when the month has no manifest"""
+    try:
+        response = client.get_object(Bucket=bucket, Key=manifest_key(farm_id, year, month))
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+            return None, None
+        raise
+    return json.loads(response['Body'].read()), response['ETag']
+
+
+def _sequencer_order(sequencer):
+    """S3 event sequencers of one key compare as hex strings once left-padded to the same length"""
+    return (sequencer or '').upper().rjust(64, '0')
+
+
+def apply_event(manifest, key, event_name, size=None, etag=None, last_modified=None, sequencer=None):
+    """
+    Apply one object event to a manifest in place. Returns False when it was
+    not applied: not a daily report key, or not newer than the last event seen for the key.
+    """
+    parsed = parse_report_key(key)
+    if parsed is None:
+        return False
+    _, _, _, date_str, report_format = parsed
+    reports = manifest['reports']
+    current = reports.get(date_str, {}).get(report_format)
+    newest = max(
+        _sequencer_order(current.get('sequencer') if current else None),
+        _sequencer_order(manifest['removed'].get(key))
+    )
+    # Redelivered and out-of-order events are dropped
+    if sequencer and _sequencer_order(sequencer) <= newest and newest.strip('0'):
+        return False
+
+    if event_name.startswith('ObjectRemoved'):
+        manifest['removed'][key] = sequencer or ''
+        day = reports.get(date_str, {})
+        day.pop(report_format, None)
+        if not day:
+            reports.pop(date_str, None)
+    else:
+        manifest['removed'].pop(key, None)
+        reports.setdefault(date_str, {})[report_format] = {
+            'key': key,
+            'size': size,
+            'etag': quoted_etag(etag),
+            'last_modified': last_modified,
+            'sequencer': sequencer or '',
+        }
+        # Keep days (and formats) sorted so the listing needs no sort
+        manifest['reports'] = dict(sorted(reports.items()))
+        manifest['reports'][date_str] = dict(sorted(manifest['reports'][date_str].items()))
+    manifest['updated_at'] = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    return True
+
+
+def write_manifest(client, bucket, manifest, etag):
+    """
+    Conditional PUT of a manifest: If-Match on the ETag it was read with, or
+    If-None-Match: * when it is new. Returns False if another writer got there first.
+    """
+    year, month = manifest['month'].split('-')
+    put_kwargs = {
+        'Bucket': bucket,
+        'Key': manifest_key(manifest['farm_id'], year, month),
+        'Body': json.dumps(manifest, separators=(',', ':')).encode('utf-8'),
+        'ContentType': 'application/json',
+    }
+    if etag:
+        put_kwargs['IfMatch'] = etag
+    else:
+        put_kwargs['IfNoneMatch'] = '*'
+    try:
+        client.put_object(**put_kwargs)
+        return True
+    except ClientError as e:
+        # 412: someone else wrote first; 409: a concurrent conditional write is in flight
+        if e.response['Error']['Code'] not in ('PreconditionFailed', 'ConditionalRequestConflict'):
+            raise
+        return False
+
+
+def update_manifest(client, bucket, farm_id, year, month, events):
+    """
+    Apply (key, event_name, size, etag, last_modified, sequencer) events to a
+    month's manifest, re-reading and retrying when a concurrent write wins.
+    Returns the number of events applied.
+    """
+    for attempt in range(MAX_UPDATE_ATTEMPTS):
+        manifest, etag = load_manifest(client, bucket, farm_id, year, month)
+        if manifest is None:
+            manifest = empty_manifest(farm_id, year, month)
+        applied = sum(apply_event(manifest, *event) for event in events)
+        if not applied or write_manifest(client, bucket, manifest, etag):
+            return applied
+        time.sleep(min(0.05 * 2 ** attempt, 1.0))
+    raise RuntimeError(f"Gave up updating {manifest_key(farm_id, year, month)} after {MAX_UPDATE_ATTEMPTS} attempts")
+
+
+def listing(manifest):
+    """Public view of a manifest: days with their formats' size, ETag and last-modified time"""
+    return [
+        {
+            'date': date_str,
+            'formats': {
+                report_format: {name: entry[name] for name in ('size', 'etag', 'last_modified')}
+                for report_format, entry in formats.items()
+            },
+        }
+        for date_str, formats in manifest['reports'].items()
+    ]
+
+
+def manifest_reports(manifest, report_format, start=None, end=None):
+    """{date string: {'key', 'size'}} of the manifest's reports in one format, optionally within [start, end]"""
+    reports = {}
+    for date_str, formats in manifest['reports'].items():
+        if report_format not in formats:
+            continue
+        if (start and date_str < f"{start:%Y-%m-%d}") or (end and date_str > f"{end:%Y-%m-%d}"):
+            continue
+        reports[date_str] = {name: formats[report_format][name] for name in ('key', 'size')}
+    return reports
+
+
+def month_range(start, end):
+    """(year, month) of every month from start to end inclusive"""
+    months = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def indexed_reports(client, bucket, farm_id, start, end, report_format):
+    """
+    {date string: {'key', 'size'}} of the reports in [start, end], read from
+    the monthly manifests; a month without one (written before indexing
+    existed and not yet backfilled) falls back to a LIST of its prefix
+    """
+    reports = {}
+    for year, month in month_range(start, end):
+        manifest, _ = load_manifest(client, bucket, farm_id, year, month)
+        if manifest is not None:
+            reports.update(manifest_reports(manifest, report_format, start, end))
+            continue
+        first = max(start, date(year, month, 1))
+        last = min(end, date(year + (month == 12), month % 12 + 1, 1) - timedelta(days=1))
+        reports.update(list_reports(client, bucket, farm_id, first, last, report_format))
+    return reports
@@ -1,14 +1,286 @@
 # terraform/modules/lambda/query_lambda_code/reports_query.py
 # Lambda function to retrieve reports from S3
 
+import codecs
+import io
 import json
 import os
+import re
+import tempfile
 import boto3
-from datetime import datetime
+from datetime import datetime, timezone
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from compression import compressed
+from report_bundle import (
+    REPORT_FORMATS, bundle_size, download_reports, fetch_reports, merged_document, missing_days, report_key,
+    zip_archive
+)
+from report_manifest import indexed_reports, listing, load_manifest
+from conditional import (
+    CLOSED_CACHE_CONTROL, OPEN_CACHE_CONTROL, is_not_modified, not_modified, request_header, validator_headers
+)
 
-s3 = boto3.client('s3')
+# Concurrent GETs per bundle; the S3 client's connection pool is sized to match
+BUNDLE_WORKERS = int(os.environ.get('REPORT_BUNDLE_WORKERS', 16))
+MAX_BUNDLE_DAYS = 62
+BUNDLE_KINDS = ('json', 'zip')
+# Zip archives are assembled in /tmp (512 MB): larger ranges get a URL per day instead
+BUNDLE_MAX_BYTES = int(os.environ.get('REPORT_BUNDLE_MAX_BYTES', 192 * 1024 * 1024))
+
+# SigV4 against the regional endpoint so presigned URLs work in every region
+# without a redirect from the global endpoint. S3_ENDPOINT_URL points the
+# function at a local S3 stand-in (MinIO, moto server), which needs path-style URLs.
+region = os.environ.get('AWS_REGION')
+s3_endpoint_url = os.environ.get('S3_ENDPOINT_URL')
+s3 = boto3.client(
+    's3',
+    endpoint_url=s3_endpoint_url or (f"https://s3.{region}.amazonaws.com" if region else None),
+    config=Config(
+        signature_version='s3v4',
+        s3={'addressing_style': 'path' if s3_endpoint_url else 'virtual'},
+        max_pool_connections=BUNDLE_WORKERS
+    )
+)
 bucket_name = os.environ['S3_BUCKET_REPORTS']
 
+DELIVERY_MODES = ('auto', 'inline', 'url')
+TEXT_TYPES = ('text/markdown', 'application/json')
+# API Gateway caps Lambda responses at 6 MB, and binary bodies grow by a third when base64-encoded
+INLINE_MAX_BYTES = int(os.environ.get('REPORT_INLINE_MAX_BYTES', 4 * 1024 * 1024))
+PRESIGNED_URL_TTL_SECONDS = int(os.environ.get('REPORT_URL_TTL_SECONDS', 300))
+READ_CHUNK_BYTES = 256 * 1024
+
+def report_cache_control(date_obj):
+    """A closed day's report is final; today's may still be regenerated"""
+    if date_obj.date() < datetime.now(timezone.utc).date():
+        return CLOSED_CACHE_CONTROL
+    return OPEN_CACHE_CONTROL
+
+def range_length(range_header, content_length):
+    """
+    Bytes a Range header asks for out of content_length: a single
+    bytes=first-last, bytes=first- or bytes=-suffix range, otherwise (several
+    ranges, or one S3 would not accept) the whole object
+    """
+    match = re.fullmatch(r'\s*bytes=(\d*)-(\d*)\s*', range_header)
+    if not match or not (match[1] or match[2]):
+        return content_length
+    if not match[1]:
+        return min(int(match[2]), content_length)
+    first = int(match[1])
+    last = min(int(match[2]), content_length - 1) if match[2] else content_length - 1
+    return max(0, last - first + 1)
+
+def use_presigned_url(delivery, content_type, content_length, range_header=None):
+    """
+    delivery=url always redirects to S3, inline never does; auto does for
+    binary formats and for bodies too large to return through API Gateway.
+    A byte range is sized by what it resolves to against the object, so small
+    ranges of any format stay inline and open-ended or large ones redirect.
+    """
+    if delivery != 'auto':
+        return delivery == 'url'
+    if range_header:
+        return range_length(range_header, content_length) > INLINE_MAX_BYTES
+    return content_type not in TEXT_TYPES or content_length > INLINE_MAX_BYTES
+
+def presigned_response(s3_key, content_type, head):
+    """Short-lived GET URL for the object instead of its content"""
+    url = s3.generate_presigned_url(
+        'get_object',
+        Params={'Bucket': bucket_name, 'Key': s3_key},
+        ExpiresIn=PRESIGNED_URL_TTL_SECONDS
+    )
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*',
+            # The URL expires, so the response itself must not be cached
+            'Cache-Control': 'no-store'
+        },
+        'body': json.dumps({
+            'url': url,
+            'expires_in': PRESIGNED_URL_TTL_SECONDS,
+            'content_type': content_type,
+            'content_length': head['ContentLength'],
+            'etag': head['ETag']
+        })
+    }
+
+def validation_error(message):
+    return {
+        'statusCode': 400,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*'
+        },
+        'body': json.dumps({
+            'error': 'ValidationError',
+            'message': message
+        })
+    }
+
+def is_bundle_request(params):
+    return 'from' in params or 'to' in params
+
+def upload_bundle(key, fileobj, size, content_type):
+    """Park a bundle too large for API Gateway in S3 and hand out a presigned URL to it"""
+    s3.upload_fileobj(fileobj, bucket_name, key, ExtraArgs={'ContentType': content_type})
+    return presigned_response(key, content_type, {'ContentLength': size, 'ETag': None})
+
+def report_urls_response(farm_id, start, end, report_format, keys):
+    """A range too large to assemble in the function: a short-lived URL per day instead of a bundle"""
+    urls = {
+        date_str: s3.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': bucket_name, 'Key': key},
+            ExpiresIn=PRESIGNED_URL_TTL_SECONDS
+        )
+        for date_str, key in sorted(keys.items())
+    }
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*',
+            'Cache-Control': 'no-store'
+        },
+        'body': json.dumps({
+            'farm_id': farm_id,
+            'from': f"{start:%Y-%m-%d}",
+            'to': f"{end:%Y-%m-%d}",
+            'format': report_format,
+            'count': len(urls),
+            'urls': urls,
+            'expires_in': PRESIGNED_URL_TTL_SECONDS,
+            'content_type': REPORT_FORMATS[report_format][1],
+            'missing': missing_days(start, end, keys)
+        })
+    }
+
+def zip_bundle(farm_id, start, end, report_format, keys, headers):
+    """Reports streamed to /tmp and zipped there; returned inline when small enough, else through S3"""
+    with tempfile.TemporaryDirectory() as directory:
+        paths = download_reports(s3, bucket_name, keys, directory, BUNDLE_WORKERS) if keys else {}
+        with tempfile.TemporaryFile(dir=directory) as archive:
+            zip_archive(archive, farm_id, start, end, report_format, paths)
+            size = archive.tell()
+            archive.seek(0)
+            if size > INLINE_MAX_BYTES:
+                return upload_bundle(
+                    f"bundles/{farm_id}/{start:%Y-%m-%d}_{end:%Y-%m-%d}_{report_format}.zip",
+                    archive, size, 'application/zip'
+                )
+            body = archive.read()
+    headers['Content-Disposition'] = f'attachment; filename="{farm_id}_{start:%Y-%m-%d}_{end:%Y-%m-%d}_reports.zip"'
+    return {'statusCode': 200, 'headers': {**headers, 'Content-Type': 'application/zip'}, 'body': body}
+
+def bundle_handler(event):
+    """
+    GET /reports?farm_id=&from=&to= (YYYY-MM-DD, inclusive, at most MAX_BUNDLE_DAYS)
+    - format (optional): markdown (default), json or pdf
+    - bundle (optional): json (merged document, default) or zip; pdf is always zip
+    Missing days are listed in the response rather than failing the request.
+    Ranges whose indexed sizes exceed what a bundle may hold (INLINE_MAX_BYTES
+    for a merged document, BUNDLE_MAX_BYTES for a zip) get a presigned URL per
+    day instead, before anything is fetched.
+    """
+    params = event.get('queryStringParameters') or {}
+    farm_id = params.get('farm_id')
+    if not farm_id:
+        return validation_error('Missing required parameter: farm_id')
+    
+    try:
+        start = datetime.strptime(params.get('from', ''), '%Y-%m-%d').date()
+        end = datetime.strptime(params.get('to', ''), '%Y-%m-%d').date()
+    except ValueError:
+        return validation_error('from and to are required. Expected YYYY-MM-DD')
+    if end < start:
+        return validation_error('to must not be before from')
+    if (end - start).days + 1 > MAX_BUNDLE_DAYS:
+        return validation_error(f'A bundle covers at most {MAX_BUNDLE_DAYS} days')
+    
+    report_format = params.get('format', 'markdown')
+    if report_format not in REPORT_FORMATS:
+        return validation_error('Invalid format. Supported formats: markdown, json, pdf')
+    kind = 'zip' if report_format == 'pdf' else params.get('bundle', 'json')
+    if kind not in BUNDLE_KINDS:
+        return validation_error(f"Invalid bundle. Supported bundles: {', '.join(BUNDLE_KINDS)}")
+    
+    reports = indexed_reports(s3, bucket_name, farm_id, start, end, report_format)
+    keys = {date_str: report['key'] for date_str, report in reports.items()}
+    if bundle_size(reports) > (BUNDLE_MAX_BYTES if kind == 'zip' else INLINE_MAX_BYTES):
+        return report_urls_response(farm_id, start, end, report_format, keys)
+    
+    headers = {
+        'Access-Control-Allow-Origin': '*',
+        'Cache-Control': report_cache_control(datetime.combine(end, datetime.min.time()))
+    }
+    if kind == 'zip':
+        return zip_bundle(farm_id, start, end, report_format, keys, headers)
+    
+    # At most INLINE_MAX_BYTES of reports, so the merged document fits in memory
+    contents = fetch_reports(s3, bucket_name, keys, BUNDLE_WORKERS) if keys else {}
+    body = json.dumps(merged_document(farm_id, start, end, report_format, contents)).encode('utf-8')
+    if len(body) > INLINE_MAX_BYTES:
+        return upload_bundle(
+            f"bundles/{farm_id}/{start:%Y-%m-%d}_{end:%Y-%m-%d}_{report_format}.json",
+            io.BytesIO(body), len(body), 'application/json'
+        )
+    return {'statusCode': 200, 'headers': {**headers, 'Content-Type': 'application/json'}, 'body': body.decode('utf-8')}
+
+def listing_handler(event):
+    """
+    GET /reports?farm_id=&month=YYYY-MM (default: the current UTC month)
+    Which reports exist for the month, with each format's size, ETag and
+    last-modified time, served from the month's manifest alone.
+    """
+    params = event.get('queryStringParameters') or {}
+    farm_id = params.get('farm_id')
+    if not farm_id:
+        return validation_error('Missing required parameter: farm_id')
+    
+    month = params.get('month') or f"{datetime.now(timezone.utc):%Y-%m}"
+    try:
+        month_start = datetime.strptime(month, '%Y-%m')
+    except ValueError:
+        return validation_error('Invalid month format. Expected YYYY-MM')
+    
+    manifest, etag = load_manifest(s3, bucket_name, farm_id, month_start.year, month_start.month)
+    reports = listing(manifest) if manifest else []
+    body = json.dumps({
+        'farm_id': farm_id,
+        'month': f"{month_start:%Y-%m}",
+        'count': len(reports),
+        'reports': reports
+    })
+    
+    # The manifest changes whenever a report is (re)written, so clients revalidate
+    # against its ETag; an unindexed month has none
+    headers = {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'}
+    if etag:
+        validators = validator_headers(etag, OPEN_CACHE_CONTROL)
+        if is_not_modified(event, etag):
+            return not_modified(validators)
+        headers.update(validators)
+    else:
+        headers['Cache-Control'] = OPEN_CACHE_CONTROL
+    return {'statusCode': 200, 'headers': headers, 'body': body}
+
+def read_text(body):
+    """
+    Decode a UTF-8 S3 body incrementally (multi-byte characters may span
+    chunks). The raw bytes are never held in full, but the decoded parts and
+    their join are, briefly: peak memory is about twice the text.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    parts = [decoder.decode(chunk) for chunk in body.iter_chunks(READ_CHUNK_BYTES)]
+    parts.append(decoder.decode(b'', final=True))
+    return ''.join(parts)
+
+@compressed
 def handler(event, context):
     """
     Lambda handler for GET /reports/{date}
@@ -18,6 +290,13 @@ def handler(event, context):
     Query Parameters:
     - farm_id (required): Farm identifier
     - format (optional): Report format (markdown, json, pdf) - default: markdown
+    - delivery (optional): auto (default), inline or url. url returns a
+      short-lived presigned S3 URL instead of the content; auto does so for
+      pdf and for reports over REPORT_INLINE_MAX_BYTES
+    
+    Responses carry the S3 object's ETag and Last-Modified; a matching
+    If-None-Match / If-Modified-Since gets a 304 without the body being read.
+    A Range header returns 206 with that byte range fetched from S3.
     """
     
     try:
@@ -25,18 +304,11 @@ def handler(event, context):
         path_params = event.get('pathParameters', {}) or {}
         date_str = path_params.get('date')
         
+        # GET /reports lists a month's reports, or with from=&to= bundles a range of days
         if not date_str:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({
-                    'error': 'ValidationError',
-                    'message': 'Missing required path parameter: date'
-                })
-            }
+            if is_bundle_request(event.get('queryStringParameters') or {}):
+                return bundle_handler(event)
+            return listing_handler(event)
         
         # Parse query parameters
         params = event.get('queryStringParameters', {}) or {}
@@ -60,8 +332,6 @@ def handler(event, context):
         # Validate date format
         try:
             date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-            year = date_obj.strftime('%Y')
-            month = date_obj.strftime('%m')
         except ValueError:
             return {
                 'statusCode': 400,
@@ -76,16 +346,7 @@ def handler(event, context):
             }
         
         # Construct S3 key based on format
-        if report_format == 'markdown':
-            s3_key = f"daily/{farm_id}/{year}/{month}/{date_str}_daily_report.md"
-            content_type = 'text/markdown'
-        elif report_format == 'json':
-            s3_key = f"daily/{farm_id}/{year}/{month}/{date_str}_daily_report.json"
-            content_type = 'application/json'
-        elif report_format == 'pdf':
-            s3_key = f"daily/{farm_id}/{year}/{month}/{date_str}_daily_report.pdf"
-            content_type = 'application/pdf'
-        else:
+        if report_format not in REPORT_FORMATS:
             return {
                 'statusCode': 400,
                 'headers': {
@@ -97,26 +358,92 @@ def handler(event, context):
                     'message': 'Invalid format. Supported formats: markdown, json, pdf'
                 })
             }
+        s3_key = report_key(farm_id, date_obj, report_format)
+        content_type = REPORT_FORMATS[report_format][1]
+        
+        cache_control = report_cache_control(date_obj)
+        
+        delivery = params.get('delivery', 'auto')
+        if delivery not in DELIVERY_MODES:
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({
+                    'error': 'ValidationError',
+                    'message': f"Invalid delivery. Supported modes: {', '.join(DELIVERY_MODES)}"
+                })
+            }
         
         # Retrieve report from S3
         try:
-            response = s3.get_object(Bucket=bucket_name, Key=s3_key)
-            report_content = response['Body'].read()
+            # Metadata first: it answers revalidation and decides the delivery mode
+            head = s3.head_object(Bucket=bucket_name, Key=s3_key)
+            validators = validator_headers(head['ETag'], cache_control, head['LastModified'])
+            if is_not_modified(event, head['ETag'], head['LastModified']):
+                return not_modified(validators)
+            
+            range_header = request_header(event, 'range')
+            if use_presigned_url(delivery, content_type, head['ContentLength'], range_header):
+                return presigned_response(s3_key, content_type, head)
+            
+            get_kwargs = {'Bucket': bucket_name, 'Key': s3_key, 'IfMatch': head['ETag']}
+            if range_header:
+                get_kwargs['Range'] = range_header
+            response = s3.get_object(**get_kwargs)
+            
+            headers = {
+                'Content-Type': content_type,
+                'Access-Control-Allow-Origin': '*',
+                'Accept-Ranges': 'bytes',
+                **validators
+            }
+            if 'ContentRange' in response:
+                # Byte ranges are returned as-is (base64-encoded by the middleware)
+                headers['Content-Range'] = response['ContentRange']
+                return {'statusCode': 206, 'headers': headers, 'body': response['Body'].read()}
             
-            # Decode if text format
-            if content_type in ['text/markdown', 'application/json']:
-                report_content = report_content.decode('utf-8')
+            # Decode text formats chunk by chunk rather than reading the whole body as bytes first
+            if content_type in TEXT_TYPES:
+                report_content = read_text(response['Body'])
+            else:
+                report_content = response['Body'].read()
             
             return {
                 'statusCode': 200,
-                'headers': {
-                    'Content-Type': content_type,
-                    'Access-Control-Allow-Origin': '*'
-                },
+                'headers': headers,
                 'body': report_content
             }
         
-        except s3.exceptions.NoSuchKey:
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'PreconditionFailed':
+                # The report was rewritten between the HEAD and the GET; the retry sees the new version
+                return {
+                    'statusCode': 503,
+                    'headers': {
+                        'Content-Type': 'application/json',
+                        'Access-Control-Allow-Origin': '*',
+                        'Retry-After': '1'
+                    },
+                    'body': json.dumps({
+                        'error': 'ServiceUnavailable',
+                        'message': f'Report for date {date_str} and farm {farm_id} changed while being read; retry'
+                    })
+                }
+            if e.response['Error']['Code'] == 'InvalidRange':
+                return {
+                    'statusCode': 416,
+                    'headers': {
+                        'Content-Range': f"bytes */{head['ContentLength']}",
+                        'Access-Control-Allow-Origin': '*'
+                    },
+                    'body': ''
+                }
+            # get_object raises NoSuchKey, head_object a bare 404
+            if e.response['Error']['Code'] not in ('NoSuchKey', '404'):
+                raise
             return {
                 'statusCode': 404,
                 'headers': {
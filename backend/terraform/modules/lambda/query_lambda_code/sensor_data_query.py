@@ -3,30 +3,182 @@
 
 import json
 import os
+import time
 import boto3
-from boto3.dynamodb.conditions import Key
-from decimal import Decimal
+from boto3.dynamodb.conditions import Key, Attr
+from botocore.exceptions import ClientError
+from pagination import fetch_page, cursor_scope
+from serialization import RawTable, dumps
+from projection import parse_fields, parse_format, projection_kwargs, shape_items
+from compression import compressed
+from conditional import conditional
+from cache import cached, sensor_partition
 
-dynamodb = boto3.resource('dynamodb')
+dynamodb = boto3.client('dynamodb')
 table_name = os.environ['DYNAMODB_TABLE_SENSORS']
-table = dynamodb.Table(table_name)
+table = RawTable(dynamodb, table_name)
+latest_table = RawTable(dynamodb, os.environ['DYNAMODB_TABLE_SENSOR_LATEST'])
+rollup_table = RawTable(dynamodb, os.environ['DYNAMODB_TABLE_SENSOR_ROLLUPS'])
 
-class DecimalEncoder(json.JSONEncoder):
-    """Helper class to convert Decimal to float for JSON serialization"""
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return float(obj)
-        return super(DecimalEncoder, self).default(obj)
+# Access paths, narrowest first
+PATH_LATEST = 'latest'
+PATH_SENSOR = 'sensor_id'
+PATH_ZONE_INDEX = 'farm_zone-timestamp-index'
+PATH_FARM_INDEX = 'farm_id-timestamp-index'
+PATH_SCAN = 'scan'
+PATH_ROLLUP = 'sensor_rollups'
 
+# Bucket widths of the pre-aggregated series written by sensor_rollup
+ROLLUP_SECONDS = {'hour': 3600, 'day': 86400}
+
+# resolution=auto keeps raw readings for windows up to a day and hourly
+# buckets up to a month (<= 744 points); longer windows use daily buckets
+AUTO_RAW_MAX_SPAN = 86400
+AUTO_HOUR_MAX_SPAN = 31 * 86400
+
+def farm_zone_key(farm_id, field_zone):
+    """Composite partition key of the zone index (written by the sensor generators)"""
+    return f"{farm_id}#{field_zone}"
+
+def time_condition(condition, start_timestamp, end_timestamp, attribute='timestamp'):
+    """Build a time-window condition with Key (key conditions) or Attr (filters)"""
+    if start_timestamp and end_timestamp:
+        return condition(attribute).between(int(start_timestamp), int(end_timestamp))
+    elif start_timestamp:
+        return condition(attribute).gte(int(start_timestamp))
+    elif end_timestamp:
+        return condition(attribute).lte(int(end_timestamp))
+    return None
+
+def plan_query(sensor_id, farm_id, field_zone, start_timestamp, end_timestamp):
+    """
+    Choose the narrowest access path for the request.
+    Returns (access_path, operation, request_kwargs) for fetch_page.
+    """
+    if sensor_id:
+        access_path = PATH_SENSOR
+        query_kwargs = {'KeyConditionExpression': Key('sensor_id').eq(sensor_id)}
+    elif farm_id and field_zone:
+        access_path = PATH_ZONE_INDEX
+        query_kwargs = {
+            'IndexName': PATH_ZONE_INDEX,
+            'KeyConditionExpression': Key('farm_zone').eq(farm_zone_key(farm_id, field_zone))
+        }
+    elif farm_id:
+        access_path = PATH_FARM_INDEX
+        query_kwargs = {
+            'IndexName': PATH_FARM_INDEX,
+            'KeyConditionExpression': Key('farm_id').eq(farm_id)
+        }
+    else:
+        return PATH_SCAN, table.scan, scan_kwargs(farm_id, field_zone, start_timestamp, end_timestamp)
+
+    window = time_condition(Key, start_timestamp, end_timestamp)
+    if window is not None:
+        query_kwargs['KeyConditionExpression'] &= window
+    query_kwargs['ScanIndexForward'] = False  # Most recent first
+
+    return access_path, table.query, query_kwargs
+
+def scan_kwargs(farm_id, field_zone, start_timestamp, end_timestamp):
+    """Filtered scan; only used when no key or index covers the request"""
+    filters = []
+    if farm_id:
+        filters.append(Attr('farm_id').eq(farm_id))
+    if field_zone:
+        filters.append(Attr('field_zone').eq(field_zone))
+    window = time_condition(Attr, start_timestamp, end_timestamp)
+    if window is not None:
+        filters.append(window)
+
+    kwargs = {}
+    if filters:
+        filter_expression = filters[0]
+        for extra in filters[1:]:
+            filter_expression &= extra
+        kwargs['FilterExpression'] = filter_expression
+    return kwargs
+
+def is_latest_request(event, params):
+    """GET /sensor-data/latest (or ?mode=latest) reads the latest-state view"""
+    return event.get('rawPath', '').rstrip('/').endswith('/latest') or params.get('mode') == 'latest'
+
+def latest_kwargs(farm_id, field_zone):
+    """One partition of the latest-state table holds every sensor of a farm"""
+    kwargs = {'KeyConditionExpression': Key('farm_id').eq(farm_id)}
+    if field_zone:
+        kwargs['FilterExpression'] = Attr('field_zone').eq(field_zone)
+    return kwargs
+
+def choose_resolution(resolution, start_timestamp, end_timestamp):
+    """Resolve resolution=auto to the cheapest source that still covers the window"""
+    if resolution in ('raw', 'hour', 'day'):
+        return resolution
+    if resolution != 'auto':
+        raise ValueError('resolution must be one of raw, hour, day, auto')
+    if not start_timestamp:
+        return 'raw'
+
+    end = int(end_timestamp) if end_timestamp else int(time.time())
+    span = end - int(start_timestamp)
+    if span <= AUTO_RAW_MAX_SPAN:
+        return 'raw'
+    if span <= AUTO_HOUR_MAX_SPAN:
+        return 'hour'
+    return 'day'
+
+def rollup_kwargs(sensor_id, farm_id, field_zone, resolution, start_timestamp, end_timestamp):
+    """Query one rollup series (sensor, zone or whole farm), newest bucket first"""
+    if sensor_id:
+        entity = f"sensor#{sensor_id}"
+    elif farm_id and field_zone:
+        entity = f"zone#{farm_zone_key(farm_id, field_zone)}"
+    elif farm_id:
+        entity = f"farm#{farm_id}"
+    else:
+        raise ValueError(f'resolution={resolution} requires sensor_id or farm_id')
+
+    # Include the bucket the window starts in
+    if start_timestamp:
+        start_timestamp = int(start_timestamp) - int(start_timestamp) % ROLLUP_SECONDS[resolution]
+
+    key_condition = Key('series_key').eq(f"{entity}#{resolution}")
+    window = time_condition(Key, start_timestamp, end_timestamp, attribute='bucket_start')
+    if window is not None:
+        key_condition &= window
+
+    return {
+        'KeyConditionExpression': key_condition,
+        'ScanIndexForward': False
+    }
+
+def cache_partition(params):
+    """Farm-scoped responses are invalidated by new readings for that farm; sensor_id-only ones rely on the TTL"""
+    farm_id = params.get('farm_id')
+    return sensor_partition(farm_id) if farm_id else None
+
+@compressed
+@conditional('end_timestamp')
+@cached('sensor_data', partition=cache_partition)
 def handler(event, context):
     """
-    Lambda handler for GET /sensor-data
+    Lambda handler for GET /sensor-data and GET /sensor-data/latest
     Query Parameters:
     - sensor_id (optional): Specific sensor identifier
-    - farm_id (optional): Farm identifier (for filtering, requires scan)
+    - farm_id (optional): Farm identifier (served by farm_id-timestamp-index)
+    - field_zone (optional): Zone within the farm (served by farm_zone-timestamp-index)
     - start_timestamp (optional): Start timestamp (Unix epoch)
     - end_timestamp (optional): End timestamp (Unix epoch)
     - limit (optional): Maximum number of results (default 100, max 1000)
+    - next_token (optional): Continuation token returned by the previous page
+    - resolution (optional): raw (default), hour, day, or auto to pick the
+      cheapest source for the window; hour/day read pre-aggregated rollups
+    - fields (optional): Comma-separated attributes to return, dotted for
+      nested maps (e.g. timestamp,moisture_percentage,NPK_values.nitrogen)
+    - format (optional): rows (default) or columnar (parallel arrays under 'columns')
+    
+    /sensor-data/latest returns one row per sensor (its most recent reading)
+    and requires farm_id.
     """
     
     try:
@@ -35,70 +187,92 @@ def handler(event, context):
         
         sensor_id = params.get('sensor_id')
         farm_id = params.get('farm_id')
+        field_zone = params.get('field_zone')
         start_timestamp = params.get('start_timestamp')
         end_timestamp = params.get('end_timestamp')
         limit = int(params.get('limit', 100))
+        next_token = params.get('next_token')
+        resolution = choose_resolution(params.get('resolution', 'raw'), start_timestamp, end_timestamp)
+        fields = parse_fields(params.get('fields'))
+        response_format = parse_format(params.get('format'))
+        projection = projection_kwargs(fields)
         
-        # Enforce max limit
+        # Enforce limit bounds
         if limit > 1000:
             limit = 1000
+        if limit < 1:
+            raise ValueError('limit must be a positive integer')
         
-        if sensor_id:
-            # Query by sensor_id (primary key)
-            query_kwargs = {
-                'KeyConditionExpression': Key('sensor_id').eq(sensor_id),
-                'Limit': limit,
-                'ScanIndexForward': False  # Most recent first
-            }
-            
-            # Add time range filter if provided
-            if start_timestamp and end_timestamp:
-                query_kwargs['KeyConditionExpression'] &= Key('timestamp').between(
-                    int(start_timestamp), 
-                    int(end_timestamp)
-                )
-            elif start_timestamp:
-                query_kwargs['KeyConditionExpression'] &= Key('timestamp').gte(int(start_timestamp))
-            elif end_timestamp:
-                query_kwargs['KeyConditionExpression'] &= Key('timestamp').lte(int(end_timestamp))
-            
-            response = table.query(**query_kwargs)
-            items = response.get('Items', [])
+        if is_latest_request(event, params):
+            if not farm_id:
+                return {
+                    'statusCode': 400,
+                    'headers': {
+                        'Content-Type': 'application/json',
+                        'Access-Control-Allow-Origin': '*'
+                    },
+                    'body': json.dumps({
+                        'error': 'ValidationError',
+                        'message': 'Missing required parameter: farm_id'
+                    })
+                }
+            access_path = PATH_LATEST
+            operation = latest_table.query
+            request_kwargs = latest_kwargs(farm_id, field_zone)
+            resolution = 'raw'
+        elif resolution != 'raw':
+            access_path = PATH_ROLLUP
+            operation = rollup_table.query
+            request_kwargs = rollup_kwargs(
+                sensor_id, farm_id, field_zone, resolution, start_timestamp, end_timestamp
+            )
+        else:
+            access_path, operation, request_kwargs = plan_query(
+                sensor_id, farm_id, field_zone, start_timestamp, end_timestamp
+            )
         
-        elif farm_id:
-            # Scan with farm_id filter (less efficient but needed for demo)
-            scan_kwargs = {
-                'Limit': limit,
-                'FilterExpression': Key('farm_id').eq(farm_id)
-            }
-            
-            response = table.scan(**scan_kwargs)
-            items = response.get('Items', [])
-            
-            # Sort by timestamp descending
-            items.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
+        # A token issued by the scan fallback keeps paging on the scan
+        if access_path not in (PATH_SCAN, PATH_LATEST, PATH_ROLLUP) and cursor_scope(next_token) == PATH_SCAN:
+            access_path = PATH_SCAN
+            operation = table.scan
+            request_kwargs = scan_kwargs(farm_id, field_zone, start_timestamp, end_timestamp)
         
-        else:
-            # Return latest readings for all sensors (limited scan)
-            scan_kwargs = {
-                'Limit': limit
-            }
-            response = table.scan(**scan_kwargs)
-            items = response.get('Items', [])
-            
-            # Sort by timestamp descending
+        try:
+            items, next_token = fetch_page(
+                operation, {**request_kwargs, **projection}, limit, next_token, scope=access_path
+            )
+        except ClientError as e:
+            if access_path in (PATH_SCAN, PATH_LATEST, PATH_ROLLUP) or e.response['Error']['Code'] != 'ValidationException':
+                raise
+            # Index missing or still backfilling: fall back to a filtered scan
+            print(f"Index {access_path} unavailable, falling back to scan: {str(e)}")
+            access_path = PATH_SCAN
+            items, next_token = fetch_page(
+                table.scan,
+                {**scan_kwargs(farm_id, field_zone, start_timestamp, end_timestamp), **projection},
+                limit,
+                scope=access_path
+            )
+        
+        if access_path == PATH_SCAN:
+            # Scan order is arbitrary; present each page newest first
             items.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
         
+        data_key, data = shape_items(items, fields, response_format)
+        
         return {
             'statusCode': 200,
             'headers': {
                 'Content-Type': 'application/json',
                 'Access-Control-Allow-Origin': '*'
             },
-            'body': json.dumps({
-                'items': items,
-                'count': len(items)
-            }, cls=DecimalEncoder)
+            'body': dumps({
+                data_key: data,
+                'count': len(items),
+                'next_token': next_token,
+                'access_path': access_path,
+                'resolution': resolution
+            })
         }
     
     except ValueError as e:
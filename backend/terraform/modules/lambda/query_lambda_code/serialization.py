@@ -0,0 +1,130 @@
+# terraform/modules/lambda/query_lambda_code/serialization.py
+# Fast JSON path shared by the query Lambdas
+#
+# The boto3 resource layer turns every number into a Decimal, and
+# json.dumps(cls=DecimalEncoder) then calls back into Python for each one to
+# turn it into a float. RawTable reads through the low-level client instead
+# and converts DynamoDB wire values straight to JSON-ready Python values in a
+# single pass, so the standard library's C encoder serializes the page without
+# any callbacks. float('57.3') == float(Decimal('57.3')), so response bodies
+# are byte-identical to the DecimalEncoder ones.
+
+import base64
+import json
+import os
+
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+try:
+    import orjson
+except ImportError:  # Optional accelerator, not part of the Lambda runtime
+    orjson = None
+
+# orjson emits compact separators and raw UTF-8, so it is opt-in: the body
+# stays equivalent JSON but is no longer byte-identical to json.dumps
+USE_ORJSON = orjson is not None and os.environ.get('JSON_ENCODER') == 'orjson'
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+# Condition-object parameters the resource layer would compile to expressions
+_CONDITION_PARAMS = {'KeyConditionExpression': True, 'FilterExpression': False}
+
+
+def from_wire(value):
+    """One DynamoDB wire value ({'N': '57.3'}, {'M': {...}}, ...) as a JSON-ready value"""
+    (tag, raw), = value.items()
+    if tag == 'S':
+        return raw
+    if tag == 'N':
+        return float(raw)
+    if tag == 'M':
+        return {name: from_wire(v) for name, v in raw.items()}
+    if tag == 'L':
+        return [from_wire(v) for v in raw]
+    if tag == 'NULL':
+        return None
+    if tag == 'BOOL':
+        return raw
+    if tag == 'SS':
+        return list(raw)
+    if tag == 'NS':
+        return [float(v) for v in raw]
+    if tag == 'B':
+        return base64.b64encode(raw).decode('ascii')
+    if tag == 'BS':
+        return [base64.b64encode(v).decode('ascii') for v in raw]
+    raise TypeError(f'Unknown DynamoDB type: {tag}')
+
+
+def item_from_wire(item):
+    return {name: from_wire(value) for name, value in item.items()}
+
+
+def build_request(table_name, kwargs):
+    """
+    Translate Table.query/scan arguments (Key/Attr conditions, Python-typed
+    ExclusiveStartKey) into low-level client arguments, as the resource layer does.
+    """
+    request = {'TableName': table_name}
+    names = dict(kwargs.get('ExpressionAttributeNames') or {})
+    values = {
+        placeholder: _serializer.serialize(value)
+        for placeholder, value in (kwargs.get('ExpressionAttributeValues') or {}).items()
+    }
+    builder = ConditionExpressionBuilder()
+
+    for name, value in kwargs.items():
+        if name in ('ExpressionAttributeNames', 'ExpressionAttributeValues'):
+            continue
+        if name in _CONDITION_PARAMS and isinstance(value, ConditionBase):
+            built = builder.build_expression(value, is_key_condition=_CONDITION_PARAMS[name])
+            request[name] = built.condition_expression
+            names.update(built.attribute_name_placeholders)
+            for placeholder, v in built.attribute_value_placeholders.items():
+                values[placeholder] = _serializer.serialize(v)
+        elif name == 'ExclusiveStartKey':
+            request[name] = {k: _serializer.serialize(v) for k, v in value.items()}
+        else:
+            request[name] = value
+
+    if names:
+        request['ExpressionAttributeNames'] = names
+    if values:
+        request['ExpressionAttributeValues'] = values
+    return request
+
+
+class RawTable:
+    """
+    Drop-in for the query/scan side of a boto3 Table. Items come back
+    JSON-ready (numbers as float) rather than Decimal-typed; LastEvaluatedKey
+    keeps the resource layer's types so continuation tokens are unchanged.
+    """
+
+    def __init__(self, client, table_name):
+        self.client = client
+        self.table_name = table_name
+
+    def _call(self, operation, kwargs):
+        response = operation(**build_request(self.table_name, kwargs))
+        response['Items'] = [item_from_wire(item) for item in response.get('Items', [])]
+        if 'LastEvaluatedKey' in response:
+            response['LastEvaluatedKey'] = {
+                k: _deserializer.deserialize(v) for k, v in response['LastEvaluatedKey'].items()
+            }
+        return response
+
+    def query(self, **kwargs):
+        return self._call(self.client.query, kwargs)
+
+    def scan(self, **kwargs):
+        return self._call(self.client.scan, kwargs)
+
+
+def dumps(payload):
+    """Serialize a response body of JSON-ready values (orjson when enabled, else the C encoder)"""
+    if USE_ORJSON:
+        return orjson.dumps(payload).decode('utf-8')
+    return json.dumps(payload)
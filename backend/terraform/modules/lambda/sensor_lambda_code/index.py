@@ -6,14 +6,30 @@ import os
 import time
 import random
 import boto3
-from decimal import Decimal
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
+
+import synthetic
 
-dynamodb = boto3.resource('dynamodb')
 table_name = os.environ['DYNAMODB_TABLE_SENSORS']
 farm_id = os.environ['FARM_ID']
+farm_count = int(os.environ.get('FARM_COUNT', 1))
 sensor_count = int(os.environ.get('SENSOR_COUNT', 10))
+write_concurrency = int(os.environ.get('WRITE_CONCURRENCY', 4))
+
+# Low-level client (thread-safe, unlike resources) sized for the writer pool;
+# retries are handled here so throttling can be counted
+dynamodb_client = boto3.client(
+    'dynamodb',
+    config=Config(max_pool_connections=32, retries={'max_attempts': 1, 'mode': 'standard'})
+)
+# Seeded runs (SYNTHETIC_SEED) give every sensor a stable profile across invocations
+synthetic_seed = int(os.environ.get('SYNTHETIC_SEED', 0))
 
-table = dynamodb.Table(table_name)
+BATCH_SIZE = 25  # BatchWriteItem maximum
+MAX_BATCH_ATTEMPTS = 8
+THROTTLE_ERRORS = ('ProvisionedThroughputExceededException', 'ThrottlingException', 'RequestLimitExceeded')
 
 # Sensor definitions
 SENSORS = [
@@ -29,87 +45,111 @@ SENSORS = [
     {"sensor_id": "weather_station_main", "field_zone": "Central"},
 ]
 
-def generate_sensor_reading(sensor):
-    """Generate realistic sensor data with slight variations"""
-    timestamp = int(time.time())
-    
-    # Determine sensor type
-    if sensor["sensor_id"] == "weather_station_main":
-        sensor_type = "weather"
-    else:
-        sensor_type = "soil"
-    
-    # Base values with realistic ranges for Netherlands agriculture
-    if sensor["field_zone"] == "Zone_3":
-        # Zone 3 has higher moisture (correlates with fungal disease)
-        moisture = round(random.uniform(65, 85), 1)
-    else:
-        moisture = round(random.uniform(45, 70), 1)
+ZONES = ["Zone_1", "Zone_2", "Zone_3"]
+
+def build_sensors(farm, count, qualify):
+    """
+    Sensor definitions for one farm. The first 10 are the demo sensors; larger
+    counts add soil sensors spread over the zones. sensor_id is the table's
+    partition key, so simulated farms get farm-qualified ids.
+    """
+    sensors = list(SENSORS[:count])
+    for n in range(len(sensors), count):
+        zone = ZONES[n % len(ZONES)]
+        sensors.append({
+            "sensor_id": f"soil_sensor_zone{zone[-1]}_{n // len(ZONES) + 1:04d}",
+            "field_zone": zone
+        })
+    if qualify:
+        sensors = [{**s, "sensor_id": f"{farm}_{s['sensor_id']}"} for s in sensors]
+    return sensors
+
+def write_batch(requests):
+    """
+    Write up to 25 put requests, retrying UnprocessedItems and throttling
+    errors with exponential backoff and jitter.
+    Returns (written, throttled_retries, failed).
+    """
+    pending = requests
+    throttled = 0
     
-    # Occasional anomaly injection (5% chance)
-    if random.random() < 0.05:
-        moisture = round(random.uniform(85, 95), 1)  # Anomaly: very high moisture
+    for attempt in range(MAX_BATCH_ATTEMPTS):
+        try:
+            response = dynamodb_client.batch_write_item(RequestItems={table_name: pending})
+            pending = response.get('UnprocessedItems', {}).get(table_name, [])
+        except ClientError as e:
+            if e.response['Error']['Code'] not in THROTTLE_ERRORS:
+                raise
+        
+        if not pending:
+            return len(requests), throttled, 0
+        
+        throttled += 1
+        time.sleep(min(2.0, 0.05 * (2 ** attempt)) * random.uniform(0.5, 1.0))
     
-    # Generate battery level (70-100% for healthy sensors)
-    battery_level = random.randint(70, 100)
+    return len(requests) - len(pending), throttled, len(pending)
+
+def load_config(event):
+    """Generator settings: event payload (or API query string) overrides environment"""
+    event = event or {}
+    overrides = {**event, **(event.get('queryStringParameters') or {})}
     
-    # Status: mostly online, occasionally calibrating
-    status_roll = random.random()
-    if status_roll < 0.95:
-        status = "online"
-    elif status_roll < 0.99:
-        status = "calibrating"
-    else:
-        status = "offline"
+    count = int(overrides.get('farm_count', farm_count))
+    farm_ids = overrides.get('farm_ids') or (
+        [overrides.get('farm_id', farm_id)] + [f"SIM_Farm_{n:04d}" for n in range(1, count)]
+    )
+    if isinstance(farm_ids, str):
+        farm_ids = [f for f in farm_ids.split(',') if f]
     
-    reading = {
-        "sensor_id": sensor["sensor_id"],
-        "timestamp": timestamp,
-        "farm_id": farm_id,
-        "field_zone": sensor["field_zone"],
-        "sensor_type": sensor_type,
-        "moisture_percentage": Decimal(str(moisture)),
-        "pH_level": Decimal(str(round(random.uniform(6.5, 7.2), 2))),
-        "temperature_celsius": Decimal(str(round(random.uniform(5, 15), 1))),
-        "NPK_values": {
-            "nitrogen": random.randint(35, 55),
-            "phosphorus": random.randint(18, 28),
-            "potassium": random.randint(30, 45)
-        },
-        "battery_level": battery_level,
-        "status": status
+    return {
+        'farm_ids': farm_ids,
+        'sensor_count': int(overrides.get('sensor_count', sensor_count)),
+        'concurrency': max(1, int(overrides.get('concurrency', write_concurrency)))
     }
-    
-    # Weather station has different data
-    if sensor_type == "weather":
-        reading["wind_speed_kmh"] = Decimal(str(round(random.uniform(5, 25), 1)))
-        reading["humidity_percentage"] = Decimal(str(round(random.uniform(60, 90), 1)))
-        reading["precipitation_mm"] = Decimal(str(round(random.uniform(0, 5), 2)))
-    else:
-        reading["leaf_wetness_duration_hours"] = Decimal(str(round(random.uniform(0, 8), 1)))
-    
-    return reading
 
 def handler(event, context):
-    """Lambda handler to generate sensor data for all sensors"""
+    """
+    Lambda handler to generate one reading per sensor for every configured farm
+    Configuration (environment, overridable from the event payload):
+    - FARM_ID / farm_id, FARM_COUNT / farm_count, or farm_ids (list or comma-separated)
+    - SENSOR_COUNT / sensor_count: sensors per farm
+    - WRITE_CONCURRENCY / concurrency: parallel BatchWriteItem calls
+    """
     
     try:
-        generated_count = 0
+        config = load_config(event)
+        timestamp = int(time.time())
+        started = time.perf_counter()
+        
+        # Build all readings up front, one vectorized batch per farm, already in DynamoDB wire format
+        rng = synthetic.make_rng()
+        requests = []
+        for index, farm in enumerate(config['farm_ids']):
+            sensors = build_sensors(farm, config['sensor_count'], qualify=index > 0)
+            for item in synthetic.sensor_readings(rng, farm, sensors, [timestamp], profile_seed=synthetic_seed):
+                requests.append({'PutRequest': {'Item': item}})
+        
+        batches = [requests[i:i + BATCH_SIZE] for i in range(0, len(requests), BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=config['concurrency']) as pool:
+            results = list(pool.map(write_batch, batches))
         
-        # Generate readings for all sensors
-        for sensor in SENSORS[:sensor_count]:
-            reading = generate_sensor_reading(sensor)
-            
-            # Write to DynamoDB
-            table.put_item(Item=reading)
-            generated_count += 1
+        elapsed = time.perf_counter() - started
+        generated_count = sum(r[0] for r in results)
+        throttle_count = sum(r[1] for r in results)
+        failed_count = sum(r[2] for r in results)
         
         return {
-            'statusCode': 200,
+            'statusCode': 200 if not failed_count else 207,
             'body': json.dumps({
                 'message': f'Generated {generated_count} sensor readings',
-                'timestamp': int(time.time()),
-                'farm_id': farm_id
+                'timestamp': timestamp,
+                'farm_id': config['farm_ids'][0],
+                'farm_count': len(config['farm_ids']),
+                'sensor_count': config['sensor_count'],
+                'failed_count': failed_count,
+                'throttle_count': throttle_count,
+                'elapsed_seconds': round(elapsed, 3),
+                'items_per_second': round(generated_count / elapsed, 1) if elapsed > 0 else None
             })
         }
     
@@ -0,0 +1,311 @@
+# terraform/modules/lambda/sensor_lambda_code/synthetic.py
+# Vectorized, seeded synthetic data engine for sensor readings, CV results and flight logs
+#
+# Shared by the mock sensor Lambda (index.py) and scripts/data_population. Every
+# generator takes a numpy Generator and returns items already in DynamoDB wire
+# format ({'N': '57.3'}, {'S': ...}), ready for BatchWriteItem.
+
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+HOUR = 3600
+DAY = 86400
+UTC_OFFSET = HOUR  # Netherlands (CET); drives the diurnal cycle
+
+ZONES = ['Zone_1', 'Zone_2', 'Zone_3']
+
+# Slow moisture drift: (period seconds, amplitude %) per component
+MOISTURE_DRIFT = [(2 * DAY, 3.0), (5 * DAY, 2.5), (11 * DAY, 2.0)]
+
+CLASSIFICATIONS = np.array(['healthy', 'diseased', 'pest', 'weed'])
+# Zone_3's wetter soil makes disease more likely; the zone mix averages to the
+# farm-wide 70/20/5/5 split
+CLASSIFICATION_WEIGHTS = {
+    'Zone_1': [0.75, 0.15, 0.05, 0.05],
+    'Zone_2': [0.75, 0.15, 0.05, 0.05],
+    'Zone_3': [0.60, 0.30, 0.05, 0.05],
+}
+DISEASES = np.array(['late_blight', 'early_blight', 'leaf_curl'])
+CLOUD_COVER = np.array(['clear', 'partly_cloudy', 'overcast'])
+
+NULL = {'NULL': True}
+
+
+def make_rng(seed=None, *keys):
+    """
+    numpy Generator for one unit of work. With a seed, the stream depends only
+    on (seed, keys), so a partition regenerates identically in any process or
+    order; without one it is freshly seeded from OS entropy.
+    """
+    if seed is None:
+        return np.random.default_rng()
+    return np.random.default_rng([seed] + [zlib.crc32(str(key).encode()) for key in keys])
+
+
+# ---------------------------------------------------------------------------
+# DynamoDB wire-format helpers (whole columns at a time)
+# ---------------------------------------------------------------------------
+
+def _numbers(values, decimals=0):
+    values = np.asarray(values)
+    # str.format over a plain list beats np.char.mod by ~2x
+    if decimals:
+        strings = map(f'{{:.{decimals}f}}'.format, values.tolist())
+    else:
+        strings = map(str, values.astype(np.int64).tolist())
+    return [{'N': s} for s in strings]
+
+
+def _strings(values):
+    return [{'S': s} for s in np.asarray(values).tolist()]
+
+
+def _constant(attribute, n):
+    return [attribute] * n
+
+
+def _nullable(attributes, present):
+    return [a if p else NULL for a, p in zip(attributes, present.tolist())]
+
+
+def _maps(**columns):
+    return [{'M': dict(zip(columns, values))} for values in zip(*columns.values())]
+
+
+def _items(**columns):
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+def _dates(timestamps):
+    """'YYYY-MM-DD' (UTC) for each epoch timestamp"""
+    return np.asarray(timestamps, dtype='datetime64[s]').astype('datetime64[D]').astype(str)
+
+
+# ---------------------------------------------------------------------------
+# Sensor readings
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=4096)
+def _sensor_profile(sensor_id, seed):
+    """Per-sensor constants (drift phases, calibration offsets); stable across invocations"""
+    rng = make_rng(seed, 'profile', sensor_id)
+    return (
+        rng.uniform(0, 2 * np.pi, len(MOISTURE_DRIFT)),
+        rng.normal(0, 0.6),
+        rng.uniform(6.65, 7.05),
+        rng.uniform([40, 21, 34], [50, 25, 41]),
+    )
+
+
+def sensor_columns(rng, sensors, timestamps, profile_seed=0):
+    """
+    Readings for every (sensor, timestamp) pair as flat arrays, sensor-major.
+    Moisture is a smooth per-sensor drift (deterministic in time, so readings
+    from consecutive Lambda invocations join up) plus noise, wetter in Zone_3,
+    with 5% of readings replaced by high-moisture anomalies. Temperature
+    follows a diurnal cycle peaking mid-afternoon; humidity and leaf wetness
+    track temperature and moisture.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    n_sensors, n_times = len(sensors), len(timestamps)
+    shape = (n_sensors, n_times)
+
+    profiles = [_sensor_profile(s['sensor_id'], profile_seed) for s in sensors]
+    phases = np.array([p[0] for p in profiles])
+    temp_offsets = np.array([p[1] for p in profiles])[:, None]
+    ph_bases = np.array([p[2] for p in profiles])[:, None]
+    npk_bases = np.array([p[3] for p in profiles])
+    zones = np.array([s['field_zone'] for s in sensors])
+    wet = (zones == 'Zone_3')[:, None]
+
+    # Diurnal phase, peaking at 15:00 local time
+    local_hour = ((timestamps + UTC_OFFSET) % DAY) / HOUR
+    diurnal = np.sin(2 * np.pi * (local_hour - 9) / 24)[None, :]
+
+    drift = np.zeros(shape)
+    for k, (period, amplitude) in enumerate(MOISTURE_DRIFT):
+        drift += amplitude * np.sin(2 * np.pi * timestamps[None, :] / period + phases[:, k:k + 1])
+    moisture = np.where(wet, 75.0, 57.5) + drift - 1.5 * diurnal + rng.normal(0, 1.0, shape)
+    moisture = np.clip(moisture, np.where(wet, 65.0, 45.0), np.where(wet, 85.0, 70.0))
+    anomalies = rng.random(shape) < 0.05
+    moisture = np.where(anomalies, rng.uniform(85, 95, shape), moisture)
+
+    temperature = np.clip(10 + 4 * diurnal + temp_offsets + rng.normal(0, 0.7, shape), 5, 15)
+    ph = np.clip(ph_bases + rng.normal(0, 0.05, shape), 6.5, 7.2)
+    npk = np.clip(
+        np.rint(npk_bases[:, None, :] + rng.normal(0, [2.5, 1.2, 2.0], shape + (3,))),
+        [35, 18, 30], [55, 28, 45]
+    )
+
+    status_roll = rng.random(shape)
+    status = np.select([status_roll < 0.95, status_roll < 0.99], ['online', 'calibrating'], 'offline')
+
+    humidity = np.clip(75 - 2.5 * (temperature - 10) + rng.normal(0, 3, shape), 60, 90)
+    leaf_wetness = np.clip((moisture - 45) / 40 * 8 + rng.normal(0, 0.8, shape), 0, 8)
+
+    weather = np.array([s['sensor_id'].endswith('weather_station_main') for s in sensors])
+
+    return {
+        'sensor_id': np.repeat([s['sensor_id'] for s in sensors], n_times),
+        'timestamp': np.tile(timestamps, n_sensors),
+        'field_zone': np.repeat(zones, n_times),
+        'weather': np.repeat(weather, n_times),
+        'moisture_percentage': moisture.ravel(),
+        'pH_level': ph.ravel(),
+        'temperature_celsius': temperature.ravel(),
+        'NPK_values': npk.reshape(-1, 3),
+        'battery_level': rng.integers(70, 101, n_sensors * n_times),
+        'status': status.ravel(),
+        'wind_speed_kmh': rng.uniform(5, 25, n_sensors * n_times),
+        'humidity_percentage': humidity.ravel(),
+        'precipitation_mm': rng.uniform(0, 5, n_sensors * n_times),
+        'leaf_wetness_duration_hours': leaf_wetness.ravel(),
+    }
+
+
+def sensor_items(farm_id, columns):
+    """Sensor columns to sensor_data items (weather stations carry weather fields, soil sensors leaf wetness)"""
+    n = len(columns['timestamp'])
+    npk = columns['NPK_values']
+    weather = columns['weather']
+
+    items = _items(
+        sensor_id=_strings(columns['sensor_id']),
+        timestamp=_numbers(columns['timestamp']),
+        farm_id=_constant({'S': farm_id}, n),
+        field_zone=_strings(columns['field_zone']),
+        farm_zone=_strings(np.char.add(f"{farm_id}#", columns['field_zone'])),
+        sensor_type=_strings(np.where(weather, 'weather', 'soil')),
+        moisture_percentage=_numbers(columns['moisture_percentage'], 1),
+        pH_level=_numbers(columns['pH_level'], 2),
+        temperature_celsius=_numbers(columns['temperature_celsius'], 1),
+        NPK_values=_maps(
+            nitrogen=_numbers(npk[:, 0]),
+            phosphorus=_numbers(npk[:, 1]),
+            potassium=_numbers(npk[:, 2]),
+        ),
+        battery_level=_numbers(columns['battery_level']),
+        status=_strings(columns['status']),
+    )
+
+    extras = zip(
+        _numbers(columns['wind_speed_kmh'], 1),
+        _numbers(columns['humidity_percentage'], 1),
+        _numbers(columns['precipitation_mm'], 2),
+        _numbers(columns['leaf_wetness_duration_hours'], 1),
+    )
+    for item, is_weather, (wind, humidity, precipitation, leaf_wetness) in zip(items, weather.tolist(), extras):
+        if is_weather:
+            item['wind_speed_kmh'] = wind
+            item['humidity_percentage'] = humidity
+            item['precipitation_mm'] = precipitation
+        else:
+            item['leaf_wetness_duration_hours'] = leaf_wetness
+    return items
+
+
+def sensor_readings(rng, farm_id, sensors, timestamps, profile_seed=0):
+    """sensor_data items for every sensor at every timestamp"""
+    return sensor_items(farm_id, sensor_columns(rng, sensors, timestamps, profile_seed))
+
+
+# ---------------------------------------------------------------------------
+# CV classification results
+# ---------------------------------------------------------------------------
+
+def cv_results(rng, farm_id, day_offset, day_start, count, qualify=False):
+    """count results of one farm-day, one image every 5 minutes from day_start"""
+    index = np.arange(count)
+    timestamps = day_start + index * 300
+
+    zone_index = rng.integers(0, len(ZONES), count)
+    zones = np.array(ZONES)[zone_index]
+    cumulative = np.cumsum([CLASSIFICATION_WEIGHTS[z] for z in ZONES], axis=1)
+    cumulative[:, -1] = 1.0
+    cumulative = cumulative[zone_index]
+    classes = CLASSIFICATIONS[(rng.random((count, 1)) > cumulative).sum(axis=1)]
+    diseased = classes == 'diseased'
+
+    image_ids = np.char.add(
+        np.char.add(f"img_day{day_offset}_idx", np.char.zfill(index.astype(str), 4)),
+        np.char.add('_', zones)
+    )
+    if qualify:
+        image_ids = np.char.add(f"{farm_id}_", image_ids)
+
+    s3_uris = np.char.add(
+        np.char.add(f"s3://agridrone-demo-images/{farm_id}/", _dates(timestamps)),
+        np.char.add(np.char.add('/', classes), np.char.add('/img_', np.char.zfill(index.astype(str), 4)))
+    )
+
+    return _items(
+        image_id=_strings(image_ids),
+        timestamp=_numbers(timestamps),
+        farm_id=_constant({'S': farm_id}, count),
+        field_zone=_strings(zones),
+        s3_uri=_strings(np.char.add(s3_uris, '.jpg')),
+        classification=_strings(classes),
+        disease_type=_nullable(_strings(DISEASES[rng.integers(0, len(DISEASES), count)]), diseased),
+        confidence=_numbers(rng.uniform(0.75, 0.98, count), 2),
+        bbox_coords=_maps(
+            x=_numbers(rng.integers(50, 301, count)),
+            y=_numbers(rng.integers(50, 301, count)),
+            width=_numbers(rng.integers(100, 251, count)),
+            height=_numbers(rng.integers(100, 251, count)),
+        ),
+        severity_score=_nullable(_numbers(rng.uniform(3, 9, count), 1), diseased),
+        affected_area_percentage=_nullable(_numbers(rng.uniform(5, 40, count), 1), diseased),
+        model_version=_constant({'S': 'yolov8-nano-v1.0'}, count),
+        processed_by=_constant({'S': 'cv_inference_lambda'}, count),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Flight logs
+# ---------------------------------------------------------------------------
+
+def flight_logs(rng, farm_id, drone_ids, flight_start, session):
+    """One completed flight per drone starting at flight_start; session is 'morning' or 'afternoon'"""
+    n = len(drone_ids)
+    drones = np.asarray(drone_ids)
+    date_str = str(_dates([flight_start])[0])
+
+    # Each flight covers a random 2 or 3 of the zones
+    zone_order = np.argsort(rng.random((n, len(ZONES))), axis=1)
+    zone_counts = rng.integers(2, len(ZONES) + 1, n)
+    zones_covered = [
+        {'L': [{'S': ZONES[z]} for z in order[:k]]}
+        for order, k in zip(zone_order.tolist(), zone_counts.tolist())
+    ]
+
+    temperature = rng.uniform(8, 16, n)
+    alerts = rng.random(n) < 0.2
+
+    return _items(
+        flight_id=_strings(np.char.add(np.char.add('flight_', drones), f"_{date_str}_{session}")),
+        flight_date=_constant({'S': date_str}, n),
+        drone_id=_strings(drones),
+        farm_id=_constant({'S': farm_id}, n),
+        flight_start=_constant({'N': str(flight_start)}, n),
+        flight_end=_constant({'N': str(flight_start + HOUR)}, n),
+        battery_start_percentage=_constant({'N': '100'}, n),
+        battery_end_percentage=_numbers(rng.integers(20, 36, n)),
+        battery_cycles=_numbers(rng.integers(40, 61, n)),
+        field_zones_covered=zones_covered,
+        coverage_percentage=_numbers(rng.uniform(95, 100, n), 1),
+        images_captured=_numbers(rng.integers(2400, 3001, n)),
+        coverage_map_s3_uri=_strings(
+            np.char.add(np.char.add(f"s3://agridrone-demo-images/coverage/{date_str}/", drones), '_coverage.geojson')
+        ),
+        weather_conditions=_maps(
+            temperature_c=_numbers(temperature, 1),
+            wind_speed_kmh=_numbers(rng.uniform(5, 15, n), 1),
+            # Cooler days are more humid
+            humidity_percentage=_numbers(np.clip(85 - 2.5 * (temperature - 8) + rng.normal(0, 3, n), 60, 85), 1),
+            cloud_cover=_strings(CLOUD_COVER[rng.integers(0, len(CLOUD_COVER), n)]),
+        ),
+        maintenance_alert=_nullable(_constant({'S': 'Battery replacement recommended'}, n), alerts),
+        status=_constant({'S': 'completed'}, n),
+    )
@@ -0,0 +1,296 @@
+# terraform/modules/lambda/stream_lambda_code/anomaly_detector.py
+# DynamoDB Stream consumer flagging sensor anomalies and publishing disease alerts
+#
+# Per batch: readings are decoded straight from the stream's wire format and
+# grouped by sensor, every sensor's state is read with BatchGetItem, the
+# readings are applied in time order (sensor_stats), one SNS message per farm
+# summarizes the new anomalies, and the states go back with BatchWriteItem.
+# DynamoDB I/O is per sensor per batch, not per reading.
+#
+# sensor_id is sensor_data's partition key, so all of a sensor's records sit
+# on one stream shard and are delivered in order to a single invocation at a
+# time: states need no conditional writes. A reading not newer than the
+# stored state is skipped, so retried and replayed batches are idempotent.
+#
+# Alerts are deduplicated per sensor and metric (ANOMALY_ALERT_COOLDOWN_SECONDS
+# in the state) and rate-limited per farm (ANOMALY_MAX_ALERTS_PER_HOUR SNS
+# messages, an atomic counter in the state table); suppressed anomalies are
+# still counted in the log line.
+
+import json
+import os
+import time
+import boto3
+from botocore.exceptions import ClientError
+
+from sensor_stats import METRICS, SensorState, update
+
+# DYNAMODB_ENDPOINT_URL / SNS_ENDPOINT_URL point the function at local stand-ins when replaying events
+dynamodb = boto3.client('dynamodb', endpoint_url=os.environ.get('DYNAMODB_ENDPOINT_URL'))
+sns = boto3.client('sns', endpoint_url=os.environ.get('SNS_ENDPOINT_URL'))
+state_table = os.environ['DYNAMODB_TABLE_SENSOR_ANOMALY_STATE']
+# Without a topic, anomalies are only logged
+topic_arn = os.environ.get('SNS_TOPIC_DISEASE_ALERTS')
+
+ALERT_COOLDOWN_SECONDS = int(os.environ.get('ANOMALY_ALERT_COOLDOWN_SECONDS', 3600))
+MAX_ALERTS_PER_HOUR = int(os.environ.get('ANOMALY_MAX_ALERTS_PER_HOUR', 6))
+# Sensors that stop reporting drop out of the state table after this long
+STATE_TTL_SECONDS = 30 * 86400
+# Anomalies listed in one alert message (the rest are counted)
+MAX_LISTED_ANOMALIES = 20
+
+GET_BATCH_SIZE = 100  # BatchGetItem maximum
+WRITE_BATCH_SIZE = 25  # BatchWriteItem maximum
+MAX_BATCH_ATTEMPTS = 5
+
+
+def state_key(sensor_id):
+    return f"sensor#{sensor_id}"
+
+
+def rate_key(farm_id, hour):
+    return f"alerts#{farm_id}#{hour}"
+
+
+def decode_reading(record):
+    """
+    (farm_id, sensor_id, field_zone, timestamp, {metric: float}) from a stream
+    record's NewImage in wire format, or None for deletes and foreign items.
+    Only the attributes the detector reads are converted.
+    """
+    image = record.get('dynamodb', {}).get('NewImage')
+    if not image or 'farm_id' not in image or 'sensor_id' not in image or 'timestamp' not in image:
+        return None
+    values = {}
+    for metric in METRICS:
+        attribute = image.get(metric)
+        if attribute and 'N' in attribute:
+            values[metric] = float(attribute['N'])
+    return (
+        image['farm_id']['S'],
+        image['sensor_id']['S'],
+        image.get('field_zone', {}).get('S'),
+        int(image['timestamp']['N']),
+        values,
+    )
+
+
+def group_readings(records):
+    """
+    {sensor_id: {'farm_id', 'field_zone', 'readings': [(timestamp, values)],
+    'sequence_number': first record's}} for INSERT/MODIFY records
+    """
+    sensors = {}
+    for record in records:
+        if record.get('eventName') not in ('INSERT', 'MODIFY'):
+            continue
+        reading = decode_reading(record)
+        if reading is None:
+            continue
+        farm_id, sensor_id, field_zone, timestamp, values = reading
+        sensor = sensors.get(sensor_id)
+        if sensor is None:
+            sensor = sensors[sensor_id] = {
+                'farm_id': farm_id,
+                'field_zone': field_zone,
+                'readings': [],
+                'sequence_number': record['dynamodb'].get('SequenceNumber'),
+            }
+        sensor['readings'].append((timestamp, values))
+    return sensors
+
+
+def load_states(sensor_ids):
+    """{sensor_id: SensorState} for the given sensors (fresh state for unknown ones)"""
+    states = {sensor_id: SensorState() for sensor_id in sensor_ids}
+    ids = list(sensor_ids)
+    for offset in range(0, len(ids), GET_BATCH_SIZE):
+        keys = [{'state_key': {'S': state_key(sensor_id)}} for sensor_id in ids[offset:offset + GET_BATCH_SIZE]]
+        request = {state_table: {
+            'Keys': keys,
+            'ProjectionExpression': 'state_key, #state',
+            'ExpressionAttributeNames': {'#state': 'state'},
+        }}
+        for attempt in range(MAX_BATCH_ATTEMPTS):
+            response = dynamodb.batch_get_item(RequestItems=request)
+            for item in response.get('Responses', {}).get(state_table, []):
+                sensor_id = item['state_key']['S'].split('#', 1)[1]
+                states[sensor_id] = SensorState.unpack(item['state']['B'])
+            request = response.get('UnprocessedKeys') or {}
+            if not request:
+                break
+            time.sleep(0.05 * (2 ** attempt))
+        else:
+            raise RuntimeError(f"State read still unprocessed after {MAX_BATCH_ATTEMPTS} attempts")
+    return states
+
+
+def save_states(states):
+    """Write states with BatchWriteItem; returns the sensor_ids whose write did not go through"""
+    items = [
+        {'PutRequest': {'Item': {
+            'state_key': {'S': state_key(sensor_id)},
+            'state': {'B': state.pack()},
+            'timestamp': {'N': str(state.timestamp)},
+            'expires_at': {'N': str(state.timestamp + STATE_TTL_SECONDS)},
+        }}}
+        for sensor_id, state in states.items()
+    ]
+    failed = set()
+    for offset in range(0, len(items), WRITE_BATCH_SIZE):
+        pending = items[offset:offset + WRITE_BATCH_SIZE]
+        try:
+            for attempt in range(MAX_BATCH_ATTEMPTS):
+                response = dynamodb.batch_write_item(RequestItems={state_table: pending})
+                pending = response.get('UnprocessedItems', {}).get(state_table, [])
+                if not pending:
+                    break
+                time.sleep(0.05 * (2 ** attempt))
+        except ClientError as e:
+            print(f"Error writing anomaly state: {str(e)}")
+        failed.update(request['PutRequest']['Item']['state_key']['S'].split('#', 1)[1] for request in pending)
+    return failed
+
+
+def take_alert_slot(farm_id, now):
+    """Count one alert message against the farm's hourly budget; False once the budget is spent"""
+    hour = int(now // 3600)
+    try:
+        dynamodb.update_item(
+            TableName=state_table,
+            Key={'state_key': {'S': rate_key(farm_id, hour)}},
+            UpdateExpression='ADD sent :one SET expires_at = :expires',
+            ConditionExpression='attribute_not_exists(sent) OR sent < :limit',
+            ExpressionAttributeValues={
+                ':one': {'N': '1'},
+                ':limit': {'N': str(MAX_ALERTS_PER_HOUR)},
+                ':expires': {'N': str((hour + 2) * 3600)},
+            }
+        )
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return False
+        raise
+
+
+def severity(anomaly):
+    """Sort key: fungal risk and range breaches first, then by |z|"""
+    return (
+        'fungal_risk' not in anomaly['kinds'],
+        'out_of_range' not in anomaly['kinds'],
+        -abs(anomaly.get('z_score', 0.0)),
+    )
+
+
+def alert_message(farm_id, anomalies):
+    """(subject, message) of one farm's alert"""
+    anomalies = sorted(anomalies, key=severity)
+    sensors = len({anomaly['sensor_id'] for anomaly in anomalies})
+    fungal = sum(1 for anomaly in anomalies if anomaly['metric'] == 'fungal_risk')
+    subject = f"AgriDrone {farm_id}: {len(anomalies)} sensor anomalies on {sensors} sensors"
+    if fungal:
+        subject = f"AgriDrone {farm_id}: fungal disease risk in {fungal} sensor areas"
+    message = {
+        'alert_type': 'sensor_anomaly',
+        'farm_id': farm_id,
+        'anomalies': len(anomalies),
+        'sensors': sensors,
+        'fungal_risk_sensors': fungal,
+        'items': anomalies[:MAX_LISTED_ANOMALIES],
+        'not_listed': max(0, len(anomalies) - MAX_LISTED_ANOMALIES),
+    }
+    # SNS subjects are limited to 100 characters
+    return subject[:100], json.dumps(message, indent=2)
+
+
+def publish(farm_id, anomalies, now):
+    """Publish one farm's alert within its hourly budget; returns True if sent, False if rate-limited"""
+    if not take_alert_slot(farm_id, now):
+        return False
+    subject, message = alert_message(farm_id, anomalies)
+    sns.publish(
+        TopicArn=topic_arn,
+        Subject=subject,
+        Message=message,
+        MessageAttributes={
+            'alert_type': {'DataType': 'String', 'StringValue': 'sensor_anomaly'},
+            'farm_id': {'DataType': 'String', 'StringValue': farm_id},
+        }
+    )
+    return True
+
+
+def handler(event, context):
+    """
+    Lambda handler for sensor_data stream batches.
+    A failed state read fails the whole batch; a failed alert or state write
+    reports only the affected sensors' records for retry.
+    """
+    records = event.get('Records', [])
+    sensors = group_readings(records)
+    states = load_states(sensors)
+
+    readings = 0
+    stale = 0
+    changed = set()
+    anomalies_by_farm = {}
+    for sensor_id, sensor in sensors.items():
+        state = states[sensor_id]
+        for timestamp, values in sorted(sensor['readings'], key=lambda reading: reading[0]):
+            anomalies = update(state, timestamp, values, ALERT_COOLDOWN_SECONDS)
+            if anomalies is None:
+                stale += 1
+                continue
+            readings += 1
+            changed.add(sensor_id)
+            for anomaly in anomalies:
+                anomalies_by_farm.setdefault(sensor['farm_id'], []).append({
+                    'sensor_id': sensor_id,
+                    'field_zone': sensor['field_zone'],
+                    'timestamp': timestamp,
+                    **anomaly,
+                })
+
+    published = 0
+    rate_limited = 0
+    failed_farms = set()
+    now = time.time()
+    for farm_id, anomalies in anomalies_by_farm.items():
+        if topic_arn is None:
+            print(json.dumps({'farm_id': farm_id, 'anomalies': anomalies}))
+            continue
+        try:
+            if publish(farm_id, anomalies, now):
+                published += 1
+            else:
+                rate_limited += 1
+        except Exception as e:
+            print(f"Error publishing alert for {farm_id}: {str(e)}")
+            failed_farms.add(farm_id)
+
+    # A farm whose alert failed keeps its old states, so the retry detects (and alerts) again
+    to_save = {
+        sensor_id: states[sensor_id] for sensor_id in changed
+        if sensors[sensor_id]['farm_id'] not in failed_farms
+    }
+    failed_sensors = save_states(to_save) if to_save else set()
+    failures = [
+        {'itemIdentifier': sensor['sequence_number']}
+        for sensor_id, sensor in sensors.items()
+        if sensor['sequence_number'] and (sensor['farm_id'] in failed_farms or sensor_id in failed_sensors)
+    ]
+
+    print(json.dumps({
+        'records': len(records),
+        'sensors': len(sensors),
+        'readings': readings,
+        'stale': stale,
+        'anomalies': sum(len(anomalies) for anomalies in anomalies_by_farm.values()),
+        'alerts_published': published,
+        'alerts_rate_limited': rate_limited,
+        'failed': len(failures)
+    }))
+
+    # Partial batch response: only failed sensors are retried
+    return {'batchItemFailures': failures}
@@ -0,0 +1,141 @@
+# terraform/modules/lambda/stream_lambda_code/latest_state.py
+# DynamoDB Stream consumer maintaining the "latest reading per sensor" view
+
+import json
+import os
+import boto3
+from boto3.dynamodb.conditions import Attr
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.exceptions import ClientError
+
+# DYNAMODB_ENDPOINT_URL points the function at DynamoDB Local when replaying events
+dynamodb = boto3.resource('dynamodb', endpoint_url=os.environ.get('DYNAMODB_ENDPOINT_URL'))
+table_name = os.environ['DYNAMODB_TABLE_SENSOR_LATEST']
+table = dynamodb.Table(table_name)
+
+# Optional: per-farm version counters the query Lambdas' caches validate against
+versions_table_name = os.environ.get('DYNAMODB_TABLE_CACHE_VERSIONS')
+versions_table = dynamodb.Table(versions_table_name) if versions_table_name else None
+
+deserializer = TypeDeserializer()
+
+
+def decode_new_image(record):
+    """Convert a stream record's NewImage into a plain item (None for deletes)"""
+    new_image = record.get('dynamodb', {}).get('NewImage')
+    if not new_image:
+        return None
+    return {name: deserializer.deserialize(value) for name, value in new_image.items()}
+
+
+def collapse_batch(records):
+    """
+    Keep only the newest reading per (farm_id, sensor_id) in this batch.
+    Returns {key: (item, first_sequence_number)}; the first sequence number is
+    what gets reported back if the write for that sensor fails.
+    """
+    latest = {}
+    for record in records:
+        if record.get('eventName') not in ('INSERT', 'MODIFY'):
+            continue
+
+        item = decode_new_image(record)
+        if not item or 'farm_id' not in item:
+            continue
+
+        key = (item['farm_id'], item['sensor_id'])
+        sequence_number = record['dynamodb'].get('SequenceNumber')
+
+        if key not in latest:
+            latest[key] = (item, sequence_number)
+        elif item['timestamp'] > latest[key][0]['timestamp']:
+            latest[key] = (item, latest[key][1])
+
+    return latest
+
+
+def apply_reading(item):
+    """
+    Upsert the latest-state row unless a newer (or identical) reading is already stored.
+    Returns True if the row was written, False if it was stale.
+    """
+    try:
+        table.put_item(
+            Item=item,
+            ConditionExpression=Attr('timestamp').not_exists() | Attr('timestamp').lt(item['timestamp'])
+        )
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return False
+        raise
+
+
+def cache_partition(farm_id):
+    """Version key of a farm's sensor_data (same format as query_lambda_code/cache.py)"""
+    return f"sensor_data#{farm_id}"
+
+
+def bump_cache_versions(farm_ids):
+    """
+    Invalidate cached query responses for farms that received new readings.
+    Returns the farm_ids whose bump failed (their records are retried).
+    """
+    failed = set()
+    if versions_table is None:
+        return failed
+    for farm_id in farm_ids:
+        try:
+            versions_table.update_item(
+                Key={'partition': cache_partition(farm_id)},
+                UpdateExpression='ADD version :one',
+                ExpressionAttributeValues={':one': 1}
+            )
+        except Exception as e:
+            print(f"Error bumping cache version for {farm_id}: {str(e)}")
+            failed.add(farm_id)
+    return failed
+
+
+def handler(event, context):
+    """
+    Lambda handler for sensor_data stream batches.
+    Writes are idempotent: replaying or reordering records never moves a
+    sensor's state backwards in time.
+    """
+    records = event.get('Records', [])
+    latest = collapse_batch(records)
+
+    updated = 0
+    stale = 0
+    failures = []
+
+    for (farm_id, sensor_id), (item, sequence_number) in latest.items():
+        try:
+            if apply_reading(item):
+                updated += 1
+            else:
+                stale += 1
+        except Exception as e:
+            print(f"Error updating latest state for {farm_id}/{sensor_id}: {str(e)}")
+            if sequence_number:
+                failures.append({'itemIdentifier': sequence_number})
+
+    # One bump per farm per batch, after the batch's writes
+    failed_farms = bump_cache_versions({farm_id for farm_id, _ in latest})
+    reported = {failure['itemIdentifier'] for failure in failures}
+    for (farm_id, _), (_, sequence_number) in latest.items():
+        if farm_id in failed_farms and sequence_number and sequence_number not in reported:
+            failures.append({'itemIdentifier': sequence_number})
+
+    print(json.dumps({
+        'records': len(records),
+        'sensors': len(latest),
+        'updated': updated,
+        'stale': stale,
+        'cache_versions_failed': len(failed_farms),
+        'failed': len(failures)
+    }))
+
+    # Partial batch response: only failed sensors are retried
+    return {'batchItemFailures': failures}
@@ -0,0 +1,203 @@
+# terraform/modules/lambda/stream_lambda_code/sensor_stats.py
+# Per-sensor rolling statistics and anomaly rules for the sensor_data stream
+#
+# A sensor's state is a fixed-size record: per metric an EWMA mean and
+# variance, a sample count, the mean at the start of the current rate window
+# and the time of the last alert, plus the fungal-risk flag. Each reading
+# costs one constant-time update per metric, whatever the sensor's history,
+# and the state packs into a 257-byte binary attribute.
+#
+# A reading is flagged per metric when it is
+# - out_of_range: outside fixed agronomic bounds (moisture above 85% is the
+#   generator's injected spike; the same bounds as the sensor rollups),
+# - z_score: |x - EWMA mean| / EWMA std above ANOMALY_Z_THRESHOLD once the
+#   sensor has ANOMALY_WARMUP_READINGS readings,
+# - rate_of_change: the EWMA mean moved faster per hour than the metric's
+#   MAX_RATE_PER_HOUR over the last RATE_WINDOW_SECONDS (a sustained trend;
+#   single spikes are the two rules above, and are clipped out of the mean).
+# fungal_risk is raised when smoothed moisture and leaf wetness both stay high
+# (the Zone_3 conditions that go with disease), with hysteresis so a sensor
+# hovering at the threshold does not flap.
+
+import math
+import os
+import struct
+
+METRICS = (
+    'moisture_percentage',
+    'temperature_celsius',
+    'pH_level',
+    'humidity_percentage',
+    'leaf_wetness_duration_hours',
+)
+MOISTURE = METRICS.index('moisture_percentage')
+LEAF_WETNESS = METRICS.index('leaf_wetness_duration_hours')
+
+BOUNDS = {
+    'moisture_percentage': (0.0, 85.0),
+    'pH_level': (5.5, 8.0),
+    'temperature_celsius': (-5.0, 35.0),
+}
+MAX_RATE_PER_HOUR = {
+    'moisture_percentage': 20.0,
+    'temperature_celsius': 8.0,
+    'pH_level': 1.0,
+    'humidity_percentage': 30.0,
+    'leaf_wetness_duration_hours': 4.0,
+}
+# Standard deviation floor, so a very steady sensor does not alert on sensor resolution
+MIN_STD = {
+    'moisture_percentage': 1.0,
+    'temperature_celsius': 0.5,
+    'pH_level': 0.05,
+    'humidity_percentage': 2.0,
+    'leaf_wetness_duration_hours': 0.5,
+}
+
+EWMA_ALPHA = float(os.environ.get('ANOMALY_EWMA_ALPHA', 0.1))
+Z_THRESHOLD = float(os.environ.get('ANOMALY_Z_THRESHOLD', 4.0))
+WARMUP_READINGS = int(os.environ.get('ANOMALY_WARMUP_READINGS', 10))
+# The rate is measured between smoothed means at least this far apart, so
+# per-minute sensor noise does not read as a fast trend
+RATE_WINDOW_SECONDS = 900
+
+# Fungal risk: smoothed moisture and leaf wetness at or above these; cleared below FUNGAL_CLEAR_MOISTURE
+FUNGAL_MOISTURE = 78.0
+FUNGAL_LEAF_WETNESS = 6.0
+FUNGAL_CLEAR_MOISTURE = 75.0
+
+# Header (last reading time, fungal-risk flag, last fungal-risk alert), then
+# (count, mean, variance, window-start mean, window-start time, last alert time) per metric
+_HEADER = struct.Struct('<q?d')
+_METRIC = struct.Struct('<6d')
+STATE_BYTES = _HEADER.size + _METRIC.size * len(METRICS)
+
+
+class SensorState:
+    """Rolling statistics of one sensor; timestamp is the newest reading applied (0 before any)"""
+    __slots__ = (
+        'timestamp', 'fungal_risk', 'fungal_alerted', 'count', 'mean', 'var', 'anchor', 'anchor_time', 'alerted'
+    )
+
+    def __init__(self):
+        self.timestamp = 0
+        self.fungal_risk = False
+        self.fungal_alerted = 0.0
+        size = len(METRICS)
+        self.count = [0.0] * size
+        self.mean = [0.0] * size
+        self.var = [0.0] * size
+        self.anchor = [0.0] * size
+        self.anchor_time = [0.0] * size
+        self.alerted = [0.0] * size
+
+    def pack(self):
+        parts = [_HEADER.pack(self.timestamp, self.fungal_risk, self.fungal_alerted)]
+        for i in range(len(METRICS)):
+            parts.append(_METRIC.pack(
+                self.count[i], self.mean[i], self.var[i], self.anchor[i], self.anchor_time[i], self.alerted[i]
+            ))
+        return b''.join(parts)
+
+    @classmethod
+    def unpack(cls, data):
+        """State from pack() output; a record of another size (older layout) starts the sensor over"""
+        state = cls()
+        if len(data) != STATE_BYTES:
+            return state
+        state.timestamp, state.fungal_risk, state.fungal_alerted = _HEADER.unpack_from(data, 0)
+        for i in range(len(METRICS)):
+            (state.count[i], state.mean[i], state.var[i], state.anchor[i], state.anchor_time[i],
+             state.alerted[i]) = _METRIC.unpack_from(data, _HEADER.size + i * _METRIC.size)
+        return state
+
+
+def update(state, timestamp, values, cooldown):
+    """
+    Apply one reading ({metric: float}, metrics may be missing) to state.
+    Returns the anomalies to alert on, each {'metric', 'kinds', 'value',
+    'expected', 'z_score', 'rate_per_hour'}, or None for a reading not newer
+    than the state (a replay or out-of-order record), which is ignored.
+    Anomalies on a metric alerted within cooldown seconds are applied to the
+    statistics but not returned.
+    """
+    if timestamp <= state.timestamp:
+        return None
+    anomalies = []
+
+    for i, metric in enumerate(METRICS):
+        x = values.get(metric)
+        if x is None:
+            continue
+        count, mean, var = state.count[i], state.mean[i], state.var[i]
+        std = math.sqrt(max(var, MIN_STD[metric] ** 2))
+        z = (x - mean) / std if count else 0.0
+
+        kinds = []
+        low, high = BOUNDS.get(metric, (-math.inf, math.inf))
+        if x < low or x > high:
+            kinds.append('out_of_range')
+        if count >= WARMUP_READINGS and abs(z) >= Z_THRESHOLD:
+            kinds.append('z_score')
+
+        if not count:
+            state.mean[i], state.var[i] = x, 0.0
+            state.anchor[i], state.anchor_time[i] = x, timestamp
+        else:
+            # Outliers are clipped before they enter the statistics, so a spike does not widen the band it broke
+            if count >= WARMUP_READINGS:
+                x_update = min(max(x, mean - Z_THRESHOLD * std), mean + Z_THRESHOLD * std)
+            else:
+                x_update = x
+            delta = x_update - mean
+            state.mean[i] = mean + EWMA_ALPHA * delta
+            state.var[i] = (1 - EWMA_ALPHA) * (var + EWMA_ALPHA * delta * delta)
+        state.count[i] = count + 1
+
+        rate = 0.0
+        window = timestamp - state.anchor_time[i]
+        if count and window >= RATE_WINDOW_SECONDS:
+            rate = (state.mean[i] - state.anchor[i]) * 3600 / window
+            state.anchor[i], state.anchor_time[i] = state.mean[i], timestamp
+            if count >= WARMUP_READINGS and abs(rate) > MAX_RATE_PER_HOUR[metric]:
+                kinds.append('rate_of_change')
+
+        if kinds and timestamp - state.alerted[i] >= cooldown:
+            state.alerted[i] = timestamp
+            anomalies.append({
+                'metric': metric,
+                'kinds': kinds,
+                'value': round(x, 2),
+                'expected': round(mean, 2) if count else None,
+                'z_score': round(z, 1),
+                'rate_per_hour': round(rate, 1),
+            })
+
+    state.timestamp = timestamp
+    anomaly = fungal_transition(state, timestamp, cooldown)
+    if anomaly:
+        anomalies.append(anomaly)
+    return anomalies
+
+
+def fungal_transition(state, timestamp, cooldown):
+    """Update the fungal-risk flag; the anomaly to alert on when it is newly raised"""
+    if state.count[MOISTURE] < WARMUP_READINGS or not state.count[LEAF_WETNESS]:
+        return None
+    moisture, leaf_wetness = state.mean[MOISTURE], state.mean[LEAF_WETNESS]
+    if state.fungal_risk:
+        state.fungal_risk = moisture >= FUNGAL_CLEAR_MOISTURE
+        return None
+    if moisture < FUNGAL_MOISTURE or leaf_wetness < FUNGAL_LEAF_WETNESS:
+        return None
+    state.fungal_risk = True
+    if timestamp - state.fungal_alerted < cooldown:
+        return None
+    state.fungal_alerted = timestamp
+    return {
+        'metric': 'fungal_risk',
+        'kinds': ['fungal_risk'],
+        'value': round(moisture, 2),
+        'expected': FUNGAL_MOISTURE,
+        'leaf_wetness_hours': round(leaf_wetness, 1),
+    }
@@ -73,6 +73,65 @@ resource "aws_s3_bucket_versioning" "reports" {
   }
 }
 
+# Oversized multi-day bundles are parked under bundles/ only long enough for
+# their presigned URL to be used; fleet-analytics/ holds per-day result caches
+# that are never read after their day; coverage/ layers are rebuilt on demand
+# by GET /coverage, so a month-old layer is dropped and rebuilt when next asked for
+resource "aws_s3_bucket_lifecycle_configuration" "reports" {
+  bucket = aws_s3_bucket.reports.id
+
+  rule {
+    id     = "expire_bundles"
+    status = "Enabled"
+
+    filter {
+      prefix = "bundles/"
+    }
+
+    expiration {
+      days = 1
+    }
+
+    noncurrent_version_expiration {
+      noncurrent_days = 1
+    }
+  }
+
+  rule {
+    id     = "expire_fleet_analytics"
+    status = "Enabled"
+
+    filter {
+      prefix = "fleet-analytics/"
+    }
+
+    expiration {
+      days = 2
+    }
+
+    noncurrent_version_expiration {
+      noncurrent_days = 1
+    }
+  }
+
+  rule {
+    id     = "expire_coverage_layers"
+    status = "Enabled"
+
+    filter {
+      prefix = "coverage/"
+    }
+
+    expiration {
+      days = 30
+    }
+
+    noncurrent_version_expiration {
+      noncurrent_days = 1
+    }
+  }
+}
+
 resource "aws_s3_bucket_public_access_block" "reports" {
   bucket = aws_s3_bucket.reports.id
 
@@ -74,6 +74,24 @@ export interface FlightLog {
     status: 'completed' | 'failed' | 'in_progress';
 }
 
+export interface DiseaseRisk {
+    field_zone: string;
+    hour_start: number;
+    risk_index: number;
+    risk_level: 'low' | 'moderate' | 'high';
+    weather_score: number;
+    detection_score: number;
+    blight_units: number;
+    blight_pressure: number;
+    wet: boolean;
+    temperature_celsius?: number;
+    humidity_percentage?: number;
+    leaf_wetness_duration_hours?: number;
+    images: number;
+    diseased_images: number;
+    diseased_share: number;
+}
+
 // API Functions
 
 export async function getSensorData(params: {
@@ -82,6 +100,7 @@ export async function getSensorData(params: {
     start_timestamp?: number;
     end_timestamp?: number;
     limit?: number;
+    next_token?: string;
 }) {
     const searchParams = new URLSearchParams();
 
@@ -90,11 +109,12 @@ export async function getSensorData(params: {
     if (params.start_timestamp) searchParams.append('start_timestamp', params.start_timestamp.toString());
     if (params.end_timestamp) searchParams.append('end_timestamp', params.end_timestamp.toString());
     if (params.limit) searchParams.append('limit', params.limit.toString());
+    if (params.next_token) searchParams.append('next_token', params.next_token);
 
     const response = await fetch(`${API_BASE_URL}/sensor-data?${searchParams}`);
     if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
 
-    const data: { items: SensorReading[]; count: number } = await response.json();
+    const data: { items: SensorReading[]; count: number; next_token: string | null } = await response.json();
     return data;
 }
 
@@ -138,6 +158,54 @@ export async function getFlights(params: {
     return data;
 }
 
+// Hourly late-blight risk per zone (precomputed from sensor conditions and diseased detections), oldest first
+export async function getDiseaseRisk(params: {
+    farm_id?: string;
+    field_zone?: string;
+    start_timestamp?: number;
+    end_timestamp?: number;
+    limit?: number;
+}) {
+    const searchParams = new URLSearchParams();
+    searchParams.append('farm_id', params.farm_id || FARM_ID);
+    if (params.field_zone) searchParams.append('field_zone', params.field_zone);
+    if (params.start_timestamp) searchParams.append('start_timestamp', params.start_timestamp.toString());
+    if (params.end_timestamp) searchParams.append('end_timestamp', params.end_timestamp.toString());
+    if (params.limit) searchParams.append('limit', params.limit.toString());
+
+    const response = await fetch(`${API_BASE_URL}/disease-risk?${searchParams}`);
+    if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+
+    const data: { items: DiseaseRisk[]; count: number; next_token: string | null } = await response.json();
+    return data;
+}
+
+// Merged coverage of a farm's flights over a date range, simplified for the map zoom
+export async function getCoverageLayer(params: {
+    farm_id?: string;
+    from: string;
+    to: string;
+    zoom?: number;
+}) {
+    const searchParams = new URLSearchParams();
+    searchParams.append('farm_id', params.farm_id || FARM_ID);
+    searchParams.append('from', params.from);
+    searchParams.append('to', params.to);
+    if (params.zoom) searchParams.append('zoom', Math.round(params.zoom).toString());
+
+    const response = await fetch(`${API_BASE_URL}/coverage?${searchParams}`);
+    if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+
+    const data = await response.json();
+    // Layers too large for an inline response come back as a presigned S3 URL
+    if (data.url) {
+        const layer = await fetch(data.url);
+        if (!layer.ok) throw new Error(`HTTP error! status: ${layer.status}`);
+        return (await layer.json()) as GeoJSON.FeatureCollection;
+    }
+    return data as GeoJSON.FeatureCollection;
+}
+
 export async function getReport(date: string, format: 'markdown' | 'json' | 'pdf' = 'markdown') {
     const searchParams = new URLSearchParams();
     searchParams.append('farm_id', FARM_ID);
@@ -158,12 +226,17 @@ export async function getReport(date: string, format: 'markdown' | 'json' | 'pdf
     }
 }
 
-// Helper function to get latest sensor readings for dashboard
+// Helper function to get latest sensor readings for dashboard (one row per sensor)
 export async function getLatestSensorReadings(limit: number = 10) {
-    return getSensorData({
-        farm_id: FARM_ID,
-        limit
-    });
+    const searchParams = new URLSearchParams();
+    searchParams.append('farm_id', FARM_ID);
+    searchParams.append('limit', limit.toString());
+
+    const response = await fetch(`${API_BASE_URL}/sensor-data/latest?${searchParams}`);
+    if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+
+    const data: { items: SensorReading[]; count: number; next_token: string | null } = await response.json();
+    return data;
 }
 
 // Helper function to get recent CV results for dashboard